@@ -0,0 +1,205 @@
+import json
+import asyncio
+import logging
+from urllib.parse import urlencode
+from command_driver import canResend
+from command_driver import connectionDropped
+from metrics import metrics
+
+"""Sends commands to the gameplay server from an asyncio event loop.  Commands and results are encoded the same
+way as HttpCommandDriver does and are sent over a single HTTP/1.1 keep-alive connection per driver, so hundreds of
+drivers can share one event loop.  Commands are only sent again when HttpCommandDriver would send them again.
+
+Public interface
+start(playerBoard)
+join(playerBoard, gameId)
+status(gameId)
+fire(gameId, shot)
+close()
+"""
+
+"""Raised when the gameplay server sends back a response that can't be read."""
+class AsyncHttpError(Exception):
+    pass
+
+class AsyncHttpCommandDriver:
+    def __init__(self, host, port, player):
+        """Constructor.
+
+        Arguments
+        host - Gameplay server host name.
+        port - Gameplay server port.
+        player - name of the person playing the game.
+        """
+        self.host = host
+        self.port = port
+        self.player = player
+        self.headers = { "Content-Type" : "application/json", "Accept" : "application/json" }
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+
+    async def close(self):
+        """Closes the connection to the gameplay server."""
+        if self.writer is not None:
+            writer = self.writer
+            self.reader = self.writer = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def encodeRequest(self, method, url, body):
+        lines = ["%s %s HTTP/1.1" % (method, url), "Host: %s:%d" % (self.host, self.port)]
+        lines.extend("%s: %s" % header for header in self.headers.items())
+        body = b"" if body is None else body.encode("UTF-8")
+        lines.append("Content-Length: %d" % len(body))
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("ISO-8859-1") + body
+
+    async def readResponse(self):
+        """Reads a response from the connection.
+
+        Returns
+        status - HTTP status.
+        headers - Response headers, with lower case names.
+        body - Response body.
+        """
+        statusLine = await self.reader.readline()
+        if not statusLine:
+            raise ConnectionResetError("connection closed by server")
+        toks = statusLine.decode("ISO-8859-1").split(None, 2)
+        if len(toks) < 2 or not toks[0].startswith("HTTP/"):
+            raise AsyncHttpError("bad status line: %r" % statusLine)
+        headers = {}
+        while True:
+            line = (await self.reader.readline()).decode("ISO-8859-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            headers["connection"] = "close"
+        return int(toks[1]), headers, body
+
+    def dropped(self):
+        """Returns True if the server closed the connection while it was idle."""
+        if self.writer.is_closing() or self.reader.at_eof():
+            return True
+        return connectionDropped(self.writer.get_extra_info("socket"))
+
+    async def request(self, method, url, body = None):
+        """Sends a request and returns the decoded response.  A server is free to close a keep-alive connection
+        while it's idle, a connection that's been closed is replaced before the request is sent.  If it's closed
+        while the request is being sent, the request is sent again on a new connection if canResend allows it.
+
+        Arguments
+        method - HTTP method.
+        url - URL of the command.
+        body - Body of the request, if it has one.
+
+        Returns
+        The decoded response.
+        """
+        request = self.encodeRequest(method, url, body)
+        with metrics.timer("http." + url.split("?")[0].rsplit("/", 1)[-1]):
+            async with self.lock:
+                while True:
+                    reused = self.writer is not None
+                    if reused and self.dropped():
+                        logging.debug("idle connection dropped by server, reconnecting")
+                        metrics.count("http.reconnects")
+                        await self.close()
+                        reused = False
+                    metrics.count("http.reusedConnections" if reused else "http.newConnections")
+                    if not reused:
+                        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+                    sent = False
+                    try:
+                        self.writer.write(request)
+                        await self.writer.drain()
+                        sent = True
+                        status, headers, response = await self.readResponse()
+                        break
+                    except (ConnectionError, asyncio.IncompleteReadError):
+                        await self.close()
+                        if not reused or not canResend(method, sent):
+                            raise
+                        logging.debug("connection dropped by server, reconnecting")
+                        metrics.count("http.reconnects")
+                if headers.get("connection", "").lower() == "close":
+                    await self.close()
+        logging.debug("HTTP response status: %d, body: %s" % (status, response))
+        return json.loads(response.decode(encoding = "UTF-8"))
+
+    async def start(self, playerBoard):
+        """Starts a new game.
+
+        Returns
+        gameId - The id of the game that was just started.
+        """
+        logging.debug("cmd: start")
+        body = json.dumps({"player" : self.player, "board" : playerBoard})
+        response = await self.request("POST", "/games/start", body)
+        return response["game_id"]
+
+    async def join(self, playerBoard, gameId):
+        """Joins the game.
+
+        Arguments
+        playerBoard - Player board with ship placements.
+        gameId - The id of the game to join.
+
+        Returns
+        gameId - The id of the game that was just joined.
+        """
+        logging.debug("cmd: join")
+        body = json.dumps({"player" : self.player, "game_id" : gameId, "board" : playerBoard})
+        response = await self.request("POST", "/games/join", body)
+        return response["game_id"]
+
+    async def status(self, gameId, wait = None):
+        """Returns the status of the game.
+
+        Arguments
+        gameId - The id of the current game.
+        wait - If set, asks the server to hold the response for up to this many seconds until it's my turn.
+
+        Returns
+        state - "waiting", "playing", "won" or "lost".
+        myTurn - True if it's my turn, False if it's the enemy's turn.
+        """
+        logging.debug("cmd: status, game id: %d" % gameId)
+        query = {"player" : self.player, "game_id" : gameId}
+        if wait is not None:
+            query["wait"] = wait
+        response = await self.request("GET", "/games/status?" + urlencode(query))
+        return response["state"], response["my_turn"]
+
+    async def fire(self, gameId, shot):
+        """Fires a shot at the enemy.
+
+        Arguments
+        gameId - The id of the current game.
+        shot - Shot to fire of the form LetterNumber.
+
+        Returns
+        hit - True if an enemy's ship was hit.
+        sunk - Size of the sunk ship, if the shot sunk it.
+        """
+        logging.debug("cmd: fire, game id: %d, shot: %s" % (gameId, shot))
+        body = json.dumps({"player" : self.player, "game_id" : gameId, "shot" : shot})
+        response = await self.request("POST", "/games/fire", body)
+        return response["hit"], response["sunk"]
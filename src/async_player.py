@@ -0,0 +1,143 @@
+import time
+import asyncio
+import logging
+from poll_scheduler import PollScheduler
+from turn_tracker import TurnTracker
+from metrics import metrics
+
+"""Plays the game of battleship on an asyncio event loop, so many games can be played at once in one process.
+The shot selectors are the same ones Player uses.  Selecting a shot can take a while with the mapping strategy, so
+shots can be selected on an executor to keep the event loop free for the other games.
+
+Public interface
+start()
+join(gameId)
+play()
+
+playGames(players)
+"""
+class AsyncPlayer:
+    def __init__(self, playerBoard, commandDriver, shotSelector, pauseTime, executor = None, pollScheduler = None,
+                 longPoll = None, recorder = None, turnTracker = None):
+        """Constructor.
+
+        Arguments
+        playerBoard - Player board with ship placements.
+        commandDriver - Asynchronous command driver to issue commands.
+        shotSelector -  Shot selector to select shots to take.
+        pauseTime - Time to wait between turns.
+        executor - concurrent.futures executor to select shots on, None to select them on the event loop.
+        pollScheduler - PollScheduler deciding how long to wait between status polls, by default always pauseTime.
+        longPoll - If set, the number of seconds the server is asked to hold a status poll until it's my turn.
+        recorder - TraceRecorder to record the game to once it's over, None not to record it.
+        turnTracker - TurnTracker working out whose turn it is from my shots, by default every turn is polled for.
+        """
+        self.playerBoard = playerBoard
+        self.commandDriver = commandDriver
+        self.shotSelector = shotSelector
+        self.pauseTime = pauseTime
+        self.executor = executor
+        self.pollScheduler = PollScheduler.fixed(pauseTime) if pollScheduler is None else pollScheduler
+        self.longPoll = longPoll
+        self.recorder = recorder
+        self.turnTracker = TurnTracker() if turnTracker is None else turnTracker
+        self.shots = []
+
+    async def start(self):
+        """Starts a new game.
+
+        Returns
+        gameId - The id of the game that was just started.
+        """
+        self.gameId = await self.commandDriver.start(self.playerBoard)
+        return self.gameId
+
+    async def join(self, gameId):
+        """Joins an existing game.
+
+        Arguments
+        gameId - The id of the game to join.
+        """
+        self.gameId = await self.commandDriver.join(self.playerBoard, gameId)
+
+    async def play(self):
+        """The gameplay loop, the same as Player.play.
+
+        Returns
+        gameState - "won" or "lost".
+        """
+        while True:
+            gameState = await self.playTurn()
+            if gameState is not None:
+                return gameState
+
+    async def playTurn(self):
+        """A single pass through the gameplay loop.
+
+        Returns
+        gameState - "won" or "lost" if the game is over, None if it isn't.
+        """
+        pollTime = time.perf_counter()
+        if self.turnTracker.knownTurn:
+            metrics.count("player.statusSkipped")
+            gameState, myTurn = "playing", True
+            polled = False
+        else:
+            polled = True
+            with metrics.timer("player.status"):
+                if self.longPoll is None:
+                    gameState, myTurn = await self.commandDriver.status(self.gameId)
+                else:
+                    gameState, myTurn = await self.commandDriver.status(self.gameId, self.longPoll)
+            self.turnTracker.polled()
+        if gameState == "won" or gameState == "lost":
+            logging.info("game %d: I %s!" % (self.gameId, gameState))
+            if self.recorder is not None:
+                self.recorder.record(self.gameId, self.shots, gameState)
+            return gameState
+        if gameState == "playing" and myTurn:
+            polls = self.pollScheduler.turnStarted(polled)
+            metrics.count("player.turns")
+            if polled:
+                metrics.observe("player.pollsPerTurn", polls)
+            with metrics.timer("player.select"):
+                shot = await self.selectShot()
+            with metrics.timer("player.fire"):
+                hit, sunk = await self.commandDriver.fire(self.gameId, shot)
+            with metrics.timer("player.shotResult"):
+                self.shotSelector.shotResult(shot, hit, sunk)
+            self.shots.append((shot, hit, sunk))
+            metrics.observe("player.turn", time.perf_counter() - pollTime)
+            self.turnTracker.fired(hit, sunk, bool(self.shotSelector.shipsAfloat))
+            if self.turnTracker.knownTurn is False and self.longPoll is None:
+                # It's the enemy's turn, wait as if a poll had said so.
+                metrics.count("player.statusSkipped")
+                await self.wait(pollTime, False)
+        else:
+            await self.wait(pollTime)
+        return None
+
+    async def wait(self, pollTime, polled = True):
+        delay = self.pollScheduler.nextDelay() if polled else self.pollScheduler.skippedDelay()
+        if self.longPoll is not None:
+            # The server already held the poll, only wait out whatever's left.
+            delay -= time.perf_counter() - pollTime
+        metrics.observe("player.wait", max(delay, 0))
+        await asyncio.sleep(max(delay, 0))
+
+    async def selectShot(self):
+        if self.executor is None:
+            return self.shotSelector.selectShot()
+        # The selector is only ever used by this player, one call at a time, so it's safe to run elsewhere.
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.shotSelector.selectShot)
+
+async def playGames(players):
+    """Plays the games of several players at once, the players have to have started or joined their games.
+
+    Arguments
+    players - The players.
+
+    Returns
+    The final game state of each player, or the exception that stopped it from finishing.
+    """
+    return await asyncio.gather(*(player.play() for player in players), return_exceptions = True)
@@ -1,12 +1,32 @@
+import os
 import sys
 import argparse
 import json
 import logging
+import asyncio
+import threading
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from command_driver import HttpCommandDriver
-from shot_selector import RandomShotSelector
-from shot_selector import MappingShotSelector
+from async_command_driver import AsyncHttpCommandDriver
+from async_player import AsyncPlayer
+from async_player import playGames
+from selector_factory import STRATEGIES
+from selector_factory import MAPPING_ENGINES
+from monte_carlo_shot_selector import TIME_BUDGET
+from monte_carlo_shot_selector import SAMPLE_BUDGET
+from exact_shot_selector import MEMORY_BUDGET
+from selector_factory import createShotSelector as createStrategyShotSelector
 from player import Player
+from poll_scheduler import PollScheduler
+from turn_tracker import TURN_RULES
+from turn_tracker import TurnTracker
+from speculative_shot_selector import SpeculativeShotSelector
+from opening_book import openingBook
+from opening_book import OpeningBookShotSelector
+from bounded_cache import weightCache
+from game_trace import TraceRecorder
+from metrics import metrics
 
 def setupLogging(logLevel):
         numericLevel = getattr(logging, logLevel.upper(), None)
@@ -14,41 +34,223 @@ def setupLogging(logLevel):
             raise ValueError("Invalid log level: %s" % logLevel)
         logging.basicConfig(level=numericLevel)
     
-def main(argv = None):
-    if argv is None:
-        argv = sys.argv[1:]
+"""Parsed json files, keyed by path and modification time, so a player that plays game after game reads them once."""
+jsonFiles = {}
+
+def loadJson(path):
+    """Returns the parsed contents of a json file, which mustn't be modified."""
+    key = (path, os.path.getmtime(path))
+    if key not in jsonFiles:
+        with open(path) as jsonFile:
+            jsonFiles[key] = json.load(jsonFile)
+    return jsonFiles[key]
+
+"""Opening books opened so far, keyed by directory, board dimensions and fleet."""
+openingBooks = {}
+openingBooksLock = threading.Lock()
+
+def cachedOpeningBook(directory, boardDimensions, fleet):
+    """Returns the opening book for a board and fleet, checking and opening it the first time it's asked for.  Games
+    played on other threads wait for a book being built rather than building it again.
+    """
+    key = (directory, boardDimensions, tuple(sorted(fleet.items())))
+    with openingBooksLock:
+        if key not in openingBooks:
+            openingBooks[key] = openingBook(directory, boardDimensions, fleet)
+        return openingBooks[key]
+
+def createShotSelector(args, boardDimensions, initialFleet):
+    """Builds the shot selector for a game, sharing the weight cache if --weightcache is set, opening from the book in
+    --openingbook and selecting shots in the background if --speculate is set.
+    """
+    book = None
+    if args.openingbook is not None and args.strategy == "mapping":
+        book = cachedOpeningBook(args.openingbook, boardDimensions, initialFleet)
+    shotSelector = createStrategyShotSelector(args.strategy, args.engine, boardDimensions, initialFleet, args.timebudget,
+                                              args.samplebudget, args.memorybudget)
+    if args.weightcache is not None and args.strategy == "mapping":
+        shotSelector.weightCache = weightCache(args.weightcache)
+    if book is not None:
+        shotSelector = OpeningBookShotSelector(shotSelector, book)
+    if args.speculate != "off":
+        shotSelector = SpeculativeShotSelector(shotSelector, args.speculate == "branches")
+    return shotSelector
+
+def logWeightCache(args):
+    if args.weightcache is not None and args.strategy == "mapping":
+        cache = weightCache(args.weightcache)
+        logging.info("weight cache hits: %d, misses: %d" % (cache.hits, cache.misses))
+
+def dumpMetrics(args):
+    if args.metrics is not None:
+        metrics.dump(args.metrics)
+
+def createPollScheduler(args):
+    """Polls back off from --pollinitial up to --pause, or always wait --pause if --pollinitial isn't smaller."""
+    if args.pollinitial >= args.pause:
+        return PollScheduler.fixed(args.pause)
+    return PollScheduler(args.pollinitial, args.pause)
+
+"""Trace recorders opened so far, keyed by path, board dimensions and fleet, so every game a process plays appends to
+a trace file through the same recorder."""
+traceRecorders = {}
+traceRecordersLock = threading.Lock()
+
+def createRecorder(args, boardDimensions, initialFleet):
+    if args.trace is None:
+        return None
+    key = (args.trace, boardDimensions, tuple(sorted(initialFleet.items())))
+    with traceRecordersLock:
+        if key not in traceRecorders:
+            traceRecorders[key] = TraceRecorder(args.trace, boardDimensions, initialFleet)
+        return traceRecorders[key]
+
+def closeRecorders():
+    """Closes the trace recorders once no more games are being played."""
+    with traceRecordersLock:
+        for recorder in traceRecorders.values():
+            recorder.close()
+        traceRecorders.clear()
+
+async def playConcurrentGames(args, playerBoard, initialFleet):
+    """Starts several new games and plays them all at once on one event loop.  Shots other than random ones are
+    selected on a thread pool so a slow selection doesn't hold up the other games.
+    """
+    executor = ThreadPoolExecutor(args.selectthreads) if args.strategy != "random" else None
+    recorder = createRecorder(args, len(playerBoard), initialFleet)
+    players = []
+    for i in range(args.games):
+        shotSelector = createShotSelector(args, len(playerBoard), Counter(initialFleet))
+        commandDriver = AsyncHttpCommandDriver(args.host, args.port, args.player)
+        players.append(AsyncPlayer(playerBoard, commandDriver, shotSelector, args.pause, executor,
+                                   createPollScheduler(args), args.longpoll, recorder, TurnTracker(args.turnrules)))
+    for player in players:
+        print("Starting new game, id: ", await player.start())
+    try:
+        for player, gameState in zip(players, await playGames(players)):
+            if isinstance(gameState, Exception):
+                logging.error("game %d failed: %s" % (player.gameId, gameState))
+        logWeightCache(args)
+    finally:
+        for player in players:
+            await player.commandDriver.close()
+            player.shotSelector.close()
+        if executor is not None:
+            executor.shutdown()
+
+def createParser():
     parser = argparse.ArgumentParser(description = "plays a game of battleship")
     parser.add_argument("host", help = "host name of the gameplay server")
     parser.add_argument("port", type = int, help = "port to connect to the gameplay server")
     parser.add_argument("player", help = "name of the player playing the game")
     parser.add_argument("playerboard", help = "json file containing the player board")
     parser.add_argument("fleet", help = "json file containing the number and size of the initial fleet of ships")
-    parser.add_argument("--pause", help = "number of seconds to pause between turns (0.5 is 1/2 second)",
+    parser.add_argument("--pause", help = "most seconds to pause between status polls while waiting for a turn (0.5 is 1/2 second)",
                         type = float, default = 1)
-    parser.add_argument("--strategy", choices = ["mapping", "random"], default = "random",
+    parser.add_argument("--pollinitial", type = float, default = 0.05,
+                        help = "seconds to pause before the second status poll of a turn, pauses then double up to --pause (default is 0.05)")
+    parser.add_argument("--longpoll", type = float,
+                        help = "seconds to ask the server to hold each status poll until it's my turn (default is not to long poll)")
+    parser.add_argument("--turnrules", choices = TURN_RULES, default = "unknown",
+                        help = "turn rules of the server, used to skip status polls whose answer is known: players always take "
+                        "turns (alternate), a player that hits fires again (hitagain) or poll every turn (unknown) (default is unknown)")
+    parser.add_argument("--strategy", choices = STRATEGIES, default = "random",
                         help = "shot selection strategy (default is random)")
+    parser.add_argument("--engine", choices = sorted(MAPPING_ENGINES), default = "python",
+                        help = "weighting engine used by the mapping strategy (default is python)")
+    parser.add_argument("--timebudget", type = float, default = TIME_BUDGET,
+                        help = "most seconds the montecarlo strategy spends sampling per shot (default is %s)" % TIME_BUDGET)
+    parser.add_argument("--samplebudget", type = int, default = SAMPLE_BUDGET,
+                        help = "most fleet layouts the montecarlo strategy samples per shot (default is %s)" % SAMPLE_BUDGET)
+    parser.add_argument("--memorybudget", type = int, default = MEMORY_BUDGET,
+                        help = "megabytes of counted board states the exact strategy keeps, it samples like montecarlo when "
+                        "counting would take more (default is %s)" % MEMORY_BUDGET)
+    parser.add_argument("--openingbook",
+                        help = "directory of opening books for the mapping strategy, the book for the board and fleet is built "
+                        "there if it isn't already (default is not to use a book)")
+    parser.add_argument("--weightcache", type = int,
+                        help = "megabytes of weighted boards the mapping strategy keeps and shares between games (default is "
+                        "not to keep any)")
+    parser.add_argument("--metrics",
+                        help = "json file to write timings of each part of a turn and other metrics to at the end of the game "
+                        "(default is not to record any)")
+    parser.add_argument("--trace",
+                        help = "trace file to append every game played to, for replaying with replay.py (default is not to "
+                        "record any)")
+    parser.add_argument("--speculate", choices = ["off", "next", "branches"], default = "off",
+                        help = "select the next shot in the background while the enemy takes their turn (next), and also "
+                        "for both results of the shot being fired (branches) (default is off)")
     parser.add_argument("--logging", choices = ["debug", "info"], default = "info",
                         help = "logging level (default is info)")
     parser.add_argument("--join", type = int, help = "game id of game to join (default is to start new game)")
     parser.add_argument("--manualshot", action="store_true", help = "wait for player input to take a shot (default is not to)")
+    parser.add_argument("--games", type = int, default = 1,
+                        help = "number of new games to play at once (default is 1), can't be used with --join or --manualshot")
+    parser.add_argument("--selectthreads", type = int, default = 4,
+                        help = "threads to select mapping, montecarlo and exact shots on when playing more than one game (default is 4)")
+    return parser
+
+def playGame(args, pool = None, started = None):
+    """Plays a single game, starting a new one or joining --join.
+
+    Arguments
+    args - Parsed command line arguments.
+    pool - HttpConnectionPool to share with other games, by default the game has its own connection.
+    started - Called with the game id once a new game is started.
+
+    Returns
+    gameId - The id of the game.
+    gameState - "won" or "lost".
+    shots - The number of shots I fired.
+    """
+    playerBoard = loadJson(args.playerboard)["board"]
+    initialFleet = Counter(loadJson(args.fleet)["fleet"])
+    shotSelector = createShotSelector(args, len(playerBoard), initialFleet)
+    recorder = createRecorder(args, len(playerBoard), initialFleet)
+    commandDriver = HttpCommandDriver(args.host, args.port, args.player, pool)
+    player = Player(playerBoard, commandDriver, shotSelector, args.pause, args.manualshot, createPollScheduler(args),
+                    args.longpoll, recorder, TurnTracker(args.turnrules))
     try:
-        args = parser.parse_args(argv)
-        setupLogging(args.logging)
-        playerBoard = json.load(open(args.playerboard))["board"]
-        initialFleet = Counter(json.load(open(args.fleet))["fleet"])
-        if args.strategy == "mapping":
-            shotSelector = MappingShotSelector(len(playerBoard), initialFleet)
-        else:
-            shotSelector = RandomShotSelector(len(playerBoard), initialFleet)
-        player = Player(playerBoard, HttpCommandDriver(args.host, args.port, args.player), shotSelector, args.pause, args.manualshot)
         if args.join is None:
-            gameId = player.start()
-            print("Starting new game, id: ", gameId)
+            player.start()
+            if started is not None:
+                started(player.gameId)
         else:
             player.join(args.join)
-        player.play()  
+        gameState = player.play()
+        logWeightCache(args)
+        return player.gameId, gameState, len(player.shots)
+    finally:
+        shotSelector.close()
+        commandDriver.close()
+
+def main(argv = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = createParser()
+    try:
+        args = parser.parse_args(argv)
+        setupLogging(args.logging)
+        if args.metrics is not None:
+            metrics.enable()
+        if args.games > 1:
+            if args.join is not None or args.manualshot:
+                parser.error("--games can't be used with --join or --manualshot")
+            playerBoard = loadJson(args.playerboard)["board"]
+            initialFleet = Counter(loadJson(args.fleet)["fleet"])
+            try:
+                asyncio.run(playConcurrentGames(args, playerBoard, initialFleet))
+            finally:
+                closeRecorders()
+                dumpMetrics(args)
+            return
+        try:
+            playGame(args, started = lambda gameId: print("Starting new game, id: ", gameId))
+        finally:
+            closeRecorders()
+            dumpMetrics(args)
     except SystemExit:
         return 2
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,163 @@
+from shot_selector import BoardState
+from shot_selector import Coordinates
+from shot_selector import MappingShotSelector
+from metrics import metrics
+
+"""Bitboard representation of the enemy board.  Every set of coordinates is one bit of a Python int,
+bit x * boardDimensions + y, so checking whether a ship fits is a few shifts and ANDs.
+
+Public interface
+setState(coordinates, state)
+fits(size, step)
+placementMask(start, size, step)
+isOpen(index)
+"""
+class BitBoard:
+    def __init__(self, boardDimensions):
+        """Builds an empty board.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        """
+        self.boardDimensions = boardDimensions
+        self.full = (1 << (boardDimensions ** 2)) - 1
+        # Coordinates that can't hold a ship (BULLSEYE, SUNK or MISS).
+        self.blocked = 0
+        # Coordinates that were hit by a shot that didn't sink a ship.
+        self.hit = 0
+        # Coordinates that are open for shot selection.
+        self.open = self.full
+        self.startMasks = {}
+
+    def setState(self, coordinates, state):
+        """Moves a set of coordinates to the mask for its new state.
+
+        Arguments
+        coordinates - The coordinates to set.
+        state - The new BoardState of the coordinates.
+        """
+        bit = 1 << (coordinates.x * self.boardDimensions + coordinates.y)
+        self.blocked &= ~bit
+        self.hit &= ~bit
+        self.open &= ~bit
+        if state == BoardState.HIT:
+            self.hit |= bit
+        elif state < BoardState.HIT:
+            self.blocked |= bit
+        else:
+            self.open |= bit
+
+    def fits(self, size, step):
+        """Finds every position a ship can be placed at.
+
+        Arguments
+        size - The size of the ship.
+        step - 1 to place the ship East, boardDimensions to place it South.
+
+        Returns
+        A mask with a bit set at the first coordinates of every position the ship can be placed at.
+        """
+        free = self.full & ~self.blocked
+        result = free & self.startMask(size, step)
+        for i in range(1, size):
+            result &= free >> (i * step)
+        return result
+
+    def startMask(self, size, step):
+        """Returns a mask of the coordinates a ship can start at without going off the board."""
+        key = (size, step)
+        if key not in self.startMasks:
+            mask = 0
+            for x in range(self.boardDimensions):
+                for y in range(self.boardDimensions):
+                    end = x + size - 1 if step != 1 else y + size - 1
+                    if end < self.boardDimensions:
+                        mask |= 1 << (x * self.boardDimensions + y)
+            self.startMasks[key] = mask
+        return self.startMasks[key]
+
+    def placementMask(self, start, size, step):
+        """Returns the mask of a ship of the given size placed at start."""
+        mask = 0
+        for i in range(size):
+            mask |= 1 << (start + i * step)
+        return mask
+
+    def isOpen(self, index):
+        return (self.open >> index) & 1 == 1
+
+def bitCount(mask):
+    """Returns the number of set bits in mask."""
+    return bin(mask).count("1")
+
+def setBits(mask):
+    """Yields the index of every set bit in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+"""Implements the mapping strategy on a bitboard.
+The enemy board is still kept up to date for debugging, but weighting and sinking only look at the masks
+of the BitBoard.  The weights are kept in their own flat list rather than in the enemy board.
+"""
+class BitboardMappingShotSelector(MappingShotSelector):
+    def __init__(self, boardDimensions, shipsAfloat):
+        """Builds the enemy board and keeps tracks of the remaining shots.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        shipsAfloat - the size and counts of the initial enemy fleet.
+        """
+        MappingShotSelector.__init__(self, boardDimensions, shipsAfloat)
+        self.bitBoard = BitBoard(boardDimensions)
+        self.weights = [0] * (boardDimensions ** 2)
+
+    def setState(self, coordinates, state):
+        MappingShotSelector.setState(self, coordinates, state)
+        self.bitBoard.setState(coordinates, state)
+
+    def weightBoard(self):
+        """ Weights the board by placing all remaining ships in all possible positions.  The
+        more ways a ship can be placed over a particular set of coordinates, the higher the weight.
+        Positions that overlay previous hits are given extra weight.
+        """
+        metrics.count("selector.placementsTested", self.boardPlacements())
+        bitBoard = self.bitBoard
+        weights = self.weights
+        for size, count in self.shipsAfloat.items():
+            size = int(size)
+            for step in (1, self.boardDimensions):
+                window = bitBoard.placementMask(0, size, step)
+                for start in setBits(bitBoard.fits(size, step)):
+                    hits = bitCount(bitBoard.hit & (window << start))
+                    weight = count + 10 * hits
+                    for index in range(start, start + size * step, step):
+                        if hits == 0 or bitBoard.isOpen(index):
+                            weights[index] += weight
+
+    def selectBestCoordinates(self):
+        """ Selects the coordinates with the most weight, ties are broken randomly.
+
+        Return
+        bestCoordinates - The highest weighted coordinates.
+        """
+        bestWeight = max(self.weights)
+        if bestWeight <= BoardState.OPEN:
+            return self.selectOpenCoordinates()
+        bestIndex = self.selectIndex(self.weights, bestWeight, self.weights.count(bestWeight))
+        # Reset the weights so they'll be ready for another round of weighting.
+        self.weights = [0] * (self.boardDimensions ** 2)
+        return Coordinates(bestIndex // self.boardDimensions, bestIndex % self.boardDimensions)
+
+    def weightedCells(self):
+        return sum(1 for weight in self.weights if weight > 0)
+
+    def selectBestCandidates(self):
+        bestWeight = max(self.weights)
+        candidates = ()
+        if bestWeight > BoardState.OPEN:
+            candidates = tuple(Coordinates(index // self.boardDimensions, index % self.boardDimensions)
+                               for index, weight in enumerate(self.weights) if weight == bestWeight)
+        self.weights = [0] * (self.boardDimensions ** 2)
+        return candidates
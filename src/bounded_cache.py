@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+
+"""A least recently used cache bounded by a memory budget.  Entries are sized by the caller, as Python doesn't make it
+cheap to measure how much memory an object takes, so budgets are approximate.  Caches are meant to be shared between
+selectors, threads and games in the same process.
+
+Public interface
+get(key)
+put(key, value, size)
+hits
+misses
+
+weightCache(memoryBudget)
+"""
+
+"""Rough number of bytes a cache entry takes on top of its value."""
+ENTRY_BYTES = 256
+
+"""Cached weight caches, keyed by memory budget."""
+weightCaches = {}
+
+def weightCache(memoryBudget):
+    """Returns the cache of weighted boards for a memory budget, building it the first time it's asked for.  Selectors
+    with the same budget share a cache, so boards weighted in one game are reused in the next.  Selectors key their
+    entries by engine, so one engine never reuses the boards another weighted.
+
+    Arguments
+    memoryBudget - megabytes of weighted boards to keep.
+    """
+    if memoryBudget not in weightCaches:
+        weightCaches[memoryBudget] = BoundedCache(memoryBudget * 2 ** 20)
+    return weightCaches[memoryBudget]
+
+class BoundedCache:
+    def __init__(self, maxBytes):
+        """Constructor.
+
+        Arguments
+        maxBytes - most bytes of entries to keep.
+        """
+        self.maxBytes = maxBytes
+        self.bytes = 0
+        # Entries and their sizes, least recently used first.
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the value kept for a key, or None if there isn't one."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        """Keeps a value, dropping the least recently used entries if over budget.  Values have to be left unchanged
+        once they're in the cache.
+
+        Arguments
+        key - key of the value.
+        value - the value.
+        size - rough number of bytes the value takes.
+        """
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = (value, size + ENTRY_BYTES)
+            self.bytes += size + ENTRY_BYTES
+            while self.bytes > self.maxBytes:
+                oldKey, (oldValue, oldSize) = self.entries.popitem(last = False)
+                self.bytes -= oldSize
+
+    def __deepcopy__(self, memo):
+        # Caches are shared, copies of a selector keep using the same one.
+        return self
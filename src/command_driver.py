@@ -1,39 +1,168 @@
 import json
+import select
 import logging
+import threading
 from urllib.parse import urlencode
 from http.client import HTTPConnection
+from http.client import HTTPException
+from metrics import metrics
 
 """Sends HTTPS commands to the gameplay server and returns the results.  Commands
 are encoded to JSON format before sending to the server and results are decoded from JSON
-format before returning.   
+format before returning.   Connections are HTTP/1.1 keep-alive connections that are kept open
+between commands.
+
+A command is only sent again on a new connection if it can't have reached the server already, or if it's a status
+poll, which can be sent any number of times.  Firing a shot, starting or joining a game twice is never safe.
 
 Public interface
 join(playerBoard)
 status(gameId)
 fire(gameId, shot):
+close()
+
+connectionDropped(sock)
+canResend(method, sent)
 """
 
+def connectionDropped(sock):
+    """Returns True if an idle connection can't be used for another request, because the server closed it or
+    sent something nobody asked for.
+
+    Arguments
+    sock - Socket of the idle connection, None if it isn't connected.
+    """
+    if sock is None:
+        return False
+    readable, writable, errors = select.select([sock], [], [], 0)
+    return bool(readable)
+
+def canResend(method, sent):
+    """Returns True if a request that failed on a reused connection can be sent again on a new one.
+
+    Arguments
+    method - HTTP method of the request.
+    sent - True if the request was sent before it failed, the server might have handled it.
+    """
+    return method == "GET" or not sent
+
+"""Keeps open connections to the gameplay server so they can be reused by later commands.  A pool can
+be shared by several command drivers in the same process, even on different threads.
+"""
+class HttpConnectionPool:
+    def __init__(self, host, port, maxIdle = 4):
+        """Constructor.
+
+        Arguments
+        host - Gameplay server host name.
+        port - Gameplay server port.
+        maxIdle - Maximum number of idle connections to keep open.
+        """
+        self.host = host
+        self.port = port
+        self.maxIdle = maxIdle
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Returns an idle connection if there is one, otherwise a new connection.
+
+        Returns
+        connection - The connection.
+        reused - True if the connection was used before.
+        """
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+        return HTTPConnection(self.host, self.port), False
+
+    def release(self, connection):
+        """Returns a connection to the pool once a command is done with it."""
+        with self.lock:
+            if len(self.idle) < self.maxIdle:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """Closes all of the idle connections."""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
 class HttpCommandDriver:
-    def __init__(self, host, port, player):
+    def __init__(self, host, port, player, pool = None):
         """Constructor.
 
         Arguments
         host - Gameplay server host name.
         port - Gameplay server port.
         player - name of the person playing the game.
+        pool - HttpConnectionPool to share with other drivers, by default the driver has its own.
         """
         self.host = host;
         self.port = port;
         self.player = player;
         self.headers = { "Content-Type" : "application/json", "Accept" : "application/json" }
+        self.ownsPool = pool is None
+        self.pool = HttpConnectionPool(host, port, 1) if pool is None else pool
         
-        
+    def close(self):
+        """Closes the driver's connections, if it doesn't share them with other drivers."""
+        if self.ownsPool:
+            self.pool.close()
+
     def getResponse(self, connection):
         """Logs and returns the response body."""
         response = connection.getresponse()
         body = response.read() 
         logging.debug("HTTP response status: %d, body: %s" % (response.status, body))
         return body.decode(encoding = "UTF-8")
+
+    def request(self, method, url, body = None):
+        """Sends a request on a pooled connection and returns the decoded response.  A server is free to close a
+        keep-alive connection while it's idle, a reused connection that's been closed is replaced before the request
+        is sent.  If it's closed while the request is being sent, the request is sent again on a new connection if
+        canResend allows it.
+
+        Arguments
+        method - HTTP method.
+        url - URL of the command.
+        body - Encoded body of the request, if it has one.
+
+        Returns
+        The decoded response.
+        """
+        with metrics.timer("http." + url.split("?")[0].rsplit("/", 1)[-1]):
+            connection, reused = self.pool.acquire()
+            if reused and connectionDropped(connection.sock):
+                logging.debug("idle connection dropped by server, reconnecting")
+                metrics.count("http.reconnects")
+                # The closed connection opens a new socket for the request.
+                connection.close()
+                reused = False
+            metrics.count("http.reusedConnections" if reused else "http.newConnections")
+            try:
+                sent = False
+                try:
+                    connection.request(method, url, body, self.headers)
+                    sent = True
+                    response = self.getResponse(connection)
+                except (ConnectionError, HTTPException):
+                    if not reused or not canResend(method, sent):
+                        raise
+                    logging.debug("connection dropped by server, reconnecting")
+                    metrics.count("http.reconnects")
+                    # The closed connection opens a new socket for the next request.
+                    connection.close()
+                    connection.request(method, url, body, self.headers)
+                    response = self.getResponse(connection)
+            except BaseException:
+                connection.close()
+                raise
+            self.pool.release(connection)
+        return json.loads(response)
         
     def start(self, playerBoard):
         """Starts a new game.
@@ -42,11 +171,8 @@ class HttpCommandDriver:
         gameId - The id of the game that was just started.
         """
         logging.debug("cmd: start")
-        connection = HTTPConnection(self.host, self.port)
         body = json.dumps({"player" : self.player, "board" : playerBoard})
-        connection.request("POST", "/games/start", body, self.headers)
-        response = json.loads(self.getResponse(connection))
-        connection.close()
+        response = self.request("POST", "/games/start", body)
         return response["game_id"] 
     
     def join(self, playerBoard, gameId):
@@ -60,29 +186,27 @@ class HttpCommandDriver:
         gameId - The id of the game that was just joined.
         """
         logging.debug("cmd: join")
-        connection = HTTPConnection(self.host, self.port)
         body = json.dumps({"player" : self.player, "game_id" : gameId, "board" : playerBoard})
-        connection.request("POST", "/games/join", body, self.headers)
-        response = json.loads(self.getResponse(connection))
-        connection.close()
+        response = self.request("POST", "/games/join", body)
         return response["game_id"] 
     
-    def status(self, gameId):
+    def status(self, gameId, wait = None):
         """Returns the status of the game.
 
         Arguments
         gameId - The id of the current game.
+        wait - If set, asks the server to hold the response for up to this many seconds until it's my turn.
+        Servers that don't long poll answer right away.
         
         Returns
         state - "waiting", "playing", "won" or "lost".
         myTurn - True if it's my turn, False if it's the enemy's turn.
         """
         logging.debug("cmd: status, game id: %d" % gameId)
-        connection = HTTPConnection(self.host, self.port)
-        connection.request("GET", "/games/status?" + urlencode({"player" : self.player, "game_id" : gameId}), 
-                           headers = self.headers)
-        response = json.loads(self.getResponse(connection))
-        connection.close()
+        query = {"player" : self.player, "game_id" : gameId}
+        if wait is not None:
+            query["wait"] = wait
+        response = self.request("GET", "/games/status?" + urlencode(query))
         return response["state"], response["my_turn"] 
             
     def fire(self, gameId, shot):
@@ -97,9 +221,6 @@ class HttpCommandDriver:
         sunk - Size of the sunk ship, if the shot sunk it.
         """
         logging.debug("cmd: fire, game id: %d, shot: %s" % (gameId, shot))
-        connection = HTTPConnection(self.host, self.port)
         body = json.dumps({"player" : self.player, "game_id" : gameId, "shot" : shot})
-        connection.request("POST", "/games/fire", body, self.headers)
-        response = json.loads(self.getResponse(connection))
-        connection.close()
+        response = self.request("POST", "/games/fire", body)
         return response["hit"], response["sunk"]
@@ -0,0 +1,182 @@
+import logging
+from shot_selector import BoardState
+from shot_selector import Coordinates
+from bitboard_shot_selector import bitCount
+from bounded_cache import BoundedCache
+from bounded_cache import ENTRY_BYTES
+from monte_carlo_shot_selector import MonteCarloShotSelector
+from monte_carlo_shot_selector import TIME_BUDGET
+from monte_carlo_shot_selector import SAMPLE_BUDGET
+
+"""Selects shots by counting every fleet layout that agrees with what's known about the enemy board.
+
+Public interface
+selectShot()
+shotResult(shot, hit, sunk)
+
+transpositionTable(memoryBudget)
+"""
+
+"""Default megabytes of counted board states to keep."""
+MEMORY_BUDGET = 4
+
+"""Rough number of bytes a counted board state takes per set of coordinates on the board."""
+CELL_BYTES = 16
+
+"""Cached transposition tables, keyed by memory budget."""
+transpositionTables = {}
+
+def transpositionTable(memoryBudget):
+    """Returns the transposition table for a memory budget, building it the first time it's asked for.  Selectors
+    with the same budget share a table, so board states counted in one game are reused in the next.
+
+    Arguments
+    memoryBudget - megabytes of counted board states to keep.
+    """
+    if memoryBudget not in transpositionTables:
+        transpositionTables[memoryBudget] = TranspositionTable(memoryBudget * 2 ** 20)
+    return transpositionTables[memoryBudget]
+
+"""Counted board states.  A board state is keyed by the board dimensions, the blocked coordinates and hits still to be
+covered as bit masks, and the ships still to be placed.
+"""
+class TranspositionTable(BoundedCache):
+    def capacity(self, boardDimensions):
+        """Returns the number of board states of a board that fit in the budget."""
+        return self.maxBytes // (ENTRY_BYTES + CELL_BYTES * boardDimensions ** 2)
+
+"""Implements an exact strategy.
+Every fleet layout that agrees with the enemy board is counted by placing the ships one at a time with backtracking,
+and the open coordinates covered by the most layouts are shot.  A layout agrees with the board the same way it does
+for MonteCarloShotSelector.  Placing the ships in different orders often leads to the same board state, so the number
+of layouts completing a board state, and how many of them cover each set of coordinates, are counted once and kept in
+a transposition table.
+
+Before counting, the number of board states the search could visit is bounded by the number of placements of each
+ship.  When that's more than fit in the memory budget, as it is early in a game, shots are sampled instead.
+"""
+class ExactShotSelector(MonteCarloShotSelector):
+    def __init__(self, boardDimensions, shipsAfloat, memoryBudget = MEMORY_BUDGET, timeBudget = TIME_BUDGET,
+                 sampleBudget = SAMPLE_BUDGET):
+        """Builds the enemy board and looks up the placement and transposition tables.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        shipsAfloat - the size and counts of the initial enemy fleet.
+        memoryBudget - megabytes of counted board states to keep.
+        timeBudget - most seconds to spend sampling per shot when there's too much to count, None for no limit.
+        sampleBudget - most layouts to sample per shot when there's too much to count, None for no limit.
+        """
+        MonteCarloShotSelector.__init__(self, boardDimensions, shipsAfloat, timeBudget, sampleBudget)
+        self.transpositionTable = transpositionTable(memoryBudget)
+
+    def selectShot(self):
+        """ Counts layouts and returns the open coordinates covered by the most of them, sampling layouts if there
+        are too many to count.
+
+        Returns
+        A shot of the form LetterNumber.
+        """
+        counts = self.countLayouts()
+        if counts is None:
+            return MonteCarloShotSelector.selectShot(self)
+        return self.selectCoveredShot(counts)
+
+    def countLayouts(self):
+        """ Counts every layout that agrees with the board.
+
+        Returns
+        The number of layouts covering each set of coordinates, as flat indexes, or None if the layouts couldn't be
+        counted within the memory budget or none of them agree with the board.
+        """
+        ships = self.shipPlacements()
+        if ships is None:
+            return None
+        # The search visits at most one board state per placement of the ships placed so far, the last ship is
+        # counted without visiting any more.
+        states = 0
+        placements = 1
+        for shipPlacements in ships:
+            states += placements
+            placements *= len(shipPlacements)
+        capacity = self.transpositionTable.capacity(self.boardDimensions)
+        if states > capacity:
+            logging.debug("up to %d board states to count, only %d fit, sampling" % (states, capacity))
+            return None
+        # Ships are placed in the same order as shipPlacements returns them, sinking ships first.  A sinking ship is
+        # the only ship allowed to cover its bullseye.  Where a sinking ship can be also depends on the order the
+        # hits came in, which isn't on the board, so its placements are part of its key.
+        self.ships = ships
+        bullsEyes = [sinkingShip.bullsEye.x * self.boardDimensions + sinkingShip.bullsEye.y for sinkingShip in self.shipsToSink]
+        self.allowed = [1 << bullsEye for bullsEye in bullsEyes] + [0] * (len(ships) - len(bullsEyes))
+        self.shipKeys = (tuple((sinkingShip.size, bullsEye, tuple(shipPlacements))
+                               for sinkingShip, bullsEye, shipPlacements in zip(self.shipsToSink, bullsEyes, ships)) +
+                         tuple((int(size), -1, None) for size in sorted(self.shipsAfloat.elements(), key = int, reverse = True)))
+        # The number of coordinates covered by the ships from each ship on.
+        self.shipCells = [sum(shipKey[0] for shipKey in self.shipKeys[ship:]) for ship in range(len(ships))]
+        blocked = 0
+        hits = 0
+        for i in range(self.boardDimensions):
+            for j in range(self.boardDimensions):
+                if Coordinates(i, j) in self.sinkingCells:
+                    # Marked as SUNK but still to be covered by one of the sinking ships, which are the only ships
+                    # with placements over it.
+                    hits |= 1 << (i * self.boardDimensions + j)
+                elif self.enemyBoard[i][j] < BoardState.HIT:
+                    blocked |= 1 << (i * self.boardDimensions + j)
+                elif self.enemyBoard[i][j] == BoardState.HIT:
+                    hits |= 1 << (i * self.boardDimensions + j)
+        layouts, counts = self.countBoardState(blocked, hits, 0)
+        logging.debug("%d layouts agree with the board" % layouts)
+        if layouts == 0:
+            return None
+        return counts
+
+    def countBoardState(self, blocked, hits, ship):
+        """ Recursive function that places the ships from ship on in every way that agrees with a board state.
+
+        Arguments
+        blocked - Bit mask of the coordinates no more ships can cover.
+        hits - Bit mask of the hits still to be covered.
+        ship - Index of the next ship to place.
+
+        Returns
+        layouts - The number of ways the ships can be placed.
+        counts - The number of those ways covering each set of coordinates, None if there aren't any.
+        """
+        remaining = len(self.ships) - ship
+        if remaining == 0:
+            return (1, None) if hits == 0 else (0, None)
+        if bitCount(hits) > self.shipCells[ship]:
+            # The ships left can't cover all the hits.
+            return 0, None
+        key = (self.boardDimensions, blocked, hits, self.shipKeys[ship:])
+        result = self.transpositionTable.get(key)
+        if result is not None:
+            return result
+        table = self.placementTable
+        blocked &= ~self.allowed[ship]
+        layouts = 0
+        counts = None
+        for placement in self.ships[ship]:
+            mask = table.masks[placement]
+            if mask & blocked:
+                continue
+            if remaining == 1:
+                if hits & ~mask:
+                    continue
+                childLayouts, childCounts = 1, None
+            else:
+                childLayouts, childCounts = self.countBoardState(blocked | mask | self.allowed[ship], hits & ~mask, ship + 1)
+                if childLayouts == 0:
+                    continue
+            if counts is None:
+                counts = [0] * (self.boardDimensions ** 2)
+            layouts += childLayouts
+            for cell in table.placements[placement]:
+                counts[cell] += childLayouts
+            if childCounts is not None:
+                counts = [count + childCount for count, childCount in zip(counts, childCounts)]
+        result = (layouts, counts)
+        self.transpositionTable.put(key, result, CELL_BYTES * self.boardDimensions ** 2)
+        return result
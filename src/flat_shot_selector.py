@@ -0,0 +1,139 @@
+from array import array
+from shot_selector import BoardState
+from shot_selector import Coordinates
+from shot_selector import MappingShotSelector
+from metrics import metrics
+
+"""Compact flat representation of the enemy board.  The states of the coordinates are kept in one signed byte buffer
+and the weights in a separate buffer of 64 bit ints, both indexed by x * boardDimensions + y.  As the weights never
+share storage with the states, all the weights are reset with one slice assignment and the states never have to be
+cleaned up after weighting.  A row of the states can be viewed like a row of the list of lists enemy board.
+
+Public interface
+rows()
+resetWeights()
+"""
+class FlatBoard:
+    def __init__(self, boardDimensions):
+        """Builds an empty board.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        """
+        self.boardDimensions = boardDimensions
+        # BoardState of every set of coordinates, all OPEN to start with.
+        self.states = array("b", bytes(boardDimensions ** 2))
+        self.weights = array("q", bytes(8 * boardDimensions ** 2))
+        self.noWeights = array("q", bytes(8 * boardDimensions ** 2))
+
+    def rows(self):
+        """Returns a view of every row of the states, reading and writing a view reads and writes the states."""
+        states = memoryview(self.states)
+        return [states[i * self.boardDimensions:(i + 1) * self.boardDimensions] for i in range(self.boardDimensions)]
+
+    def resetWeights(self):
+        self.weights[:] = self.noWeights
+
+"""Implements the mapping strategy on a FlatBoard.
+The enemy board is made up of views of the flat board's rows so the rest of the mapping strategy reads and writes the
+states as usual, but the weights go in the flat board's weight buffer.  Every row and column of the board is weighted
+with a window the size of the ship sliding along it, keeping count of the blocked coordinates and hits in the window,
+so positions are checked with plain integer indexes rather than a recursive search.  The resulting weights are
+identical to the ones computed by MappingShotSelector.
+"""
+class FlatMappingShotSelector(MappingShotSelector):
+    def __init__(self, boardDimensions, shipsAfloat):
+        """Builds the enemy board and keeps tracks of the remaining shots.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        shipsAfloat - the size and counts of the initial enemy fleet.
+        """
+        MappingShotSelector.__init__(self, boardDimensions, shipsAfloat)
+        self.board = FlatBoard(boardDimensions)
+        self.enemyBoard = self.board.rows()
+        # The indexes along every row and every column.
+        self.lines = ([range(i * boardDimensions, (i + 1) * boardDimensions) for i in range(boardDimensions)] +
+                      [range(j, boardDimensions ** 2, boardDimensions) for j in range(boardDimensions)])
+
+    def __getstate__(self):
+        # Views can't be copied, they're made again from the copied board.
+        state = self.__dict__.copy()
+        del(state["enemyBoard"])
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.enemyBoard = self.board.rows()
+
+    def weightBoard(self):
+        """ Weights the board by placing all remaining ships in all possible positions.  The
+        more ways a ship can be placed over a particular set of coordinates, the higher the weight.
+        Positions that overlay previous hits are given extra weight.
+        """
+        metrics.count("selector.placementsTested", self.boardPlacements())
+        for size, count in self.shipsAfloat.items():
+            size = int(size)
+            if size > self.boardDimensions:
+                continue
+            for line in self.lines:
+                self.weightLine(line, size, count)
+
+    def weightLine(self, line, size, weight):
+        """ Weights every position of a ship along a row or column.
+
+        Arguments
+        line - The indexes along the row or column.
+        size - The size of the ship.
+        weight - The weight to apply to the open coordinates of every position the ship can be placed in.
+        """
+        states = self.board.states
+        weights = self.board.weights
+        blocked = 0
+        hits = 0
+        for k, index in enumerate(line):
+            state = states[index]
+            if state < BoardState.HIT:
+                blocked += 1
+            elif state == BoardState.HIT:
+                hits += 1
+            if k >= size:
+                # Slide the coordinates at the back out of the window.
+                state = states[line[k - size]]
+                if state < BoardState.HIT:
+                    blocked -= 1
+                elif state == BoardState.HIT:
+                    hits -= 1
+            if k >= size - 1 and blocked == 0:
+                positionWeight = weight + 10 * hits
+                for cell in line[k - size + 1:k + 1]:
+                    if states[cell] == BoardState.OPEN:
+                        weights[cell] += positionWeight
+
+    def selectBestCoordinates(self):
+        """ Selects the coordinates with the most weight, ties are broken randomly.
+
+        Return
+        bestCoordinates - The highest weighted coordinates.
+        """
+        weights = self.board.weights
+        bestWeight = max(weights)
+        if bestWeight <= BoardState.OPEN:
+            return self.selectOpenCoordinates()
+        bestIndex = self.selectIndex(weights, bestWeight, weights.count(bestWeight))
+        # Reset the weights so they'll be ready for another round of weighting.
+        self.board.resetWeights()
+        return Coordinates(bestIndex // self.boardDimensions, bestIndex % self.boardDimensions)
+
+    def weightedCells(self):
+        return len(self.board.weights) - self.board.weights.count(0)
+
+    def selectBestCandidates(self):
+        weights = self.board.weights
+        bestWeight = max(weights)
+        candidates = ()
+        if bestWeight > BoardState.OPEN:
+            candidates = tuple(Coordinates(index // self.boardDimensions, index % self.boardDimensions)
+                               for index, weight in enumerate(weights) if weight == bestWeight)
+        self.board.resetWeights()
+        return candidates
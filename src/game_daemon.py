@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from command_driver import HttpConnectionPool
+from battleship_player import closeRecorders
+from battleship_player import createParser
+from battleship_player import playGame
+from battleship_player import setupLogging
+
+"""Plays game after game without starting a new interpreter for each.  Games are jobs, json lines read from stdin or
+from the connections to a Unix socket, each with the command line arguments of battleship_player.py for the game:
+
+{"id" : "game-1", "args" : ["localhost", "8080", "bob", "data/player_1_board.json", "data/fleet.json", "--strategy", "mapping"]}
+
+Jobs are played on a bounded pool of worker threads, no more jobs are read while every worker is busy.  The result of
+each game is written as a json line as soon as it's over, to stdout or back to the connection the job came from:
+
+{"id" : "game-1", "gameId" : 12, "result" : "won", "shots" : 43, "seconds" : 12.5}
+
+or {"id" : "game-1", "error" : "..."} if the game couldn't be played.  Everything that's worth keeping between games
+stays warm: parsed board and fleet files, placement and transposition tables, weight caches, opening books, trace
+recorders and connections to each gameplay server.
+
+Public interface
+GameDaemon
+submit(job, respond)
+serveStream(lines, output)
+serveSocket(path)
+close()
+
+main(argv)
+"""
+class GameDaemon:
+    def __init__(self, workers, defaults = ()):
+        """Constructor.
+
+        Arguments
+        workers - the number of games to play at once.
+        defaults - command line arguments every job starts from, the arguments of a job override them.
+        """
+        self.defaults = list(defaults)
+        self.executor = ThreadPoolExecutor(workers)
+        # A slot for every worker, taken when a job is submitted and given back when its game is over.
+        self.slots = threading.Semaphore(workers)
+        # Connection pools shared by the games played on each gameplay server.
+        self.pools = {}
+        self.lock = threading.Lock()
+
+    def connectionPool(self, host, port):
+        with self.lock:
+            if (host, port) not in self.pools:
+                self.pools[(host, port)] = HttpConnectionPool(host, port)
+            return self.pools[(host, port)]
+
+    def submit(self, job, respond):
+        """Plays a job's game on the pool, waiting for a worker to be free first.
+
+        Arguments
+        job - The job, a dict with the arguments of the game in "args" and an optional "id".
+        respond - Called with the result of the game once it's over.
+
+        Returns
+        A future that's done once the result has been passed to respond.
+        """
+        self.slots.acquire()
+        try:
+            return self.executor.submit(self.runJob, job, respond)
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def runJob(self, job, respond):
+        try:
+            respond(self.play(job))
+        finally:
+            self.slots.release()
+
+    def play(self, job):
+        """Plays a job's game.
+
+        Returns
+        The result of the game.
+        """
+        result = {"id" : job.get("id")}
+        startTime = time.perf_counter()
+        try:
+            try:
+                args = createParser().parse_args(self.defaults + [str(arg) for arg in job["args"]])
+            except SystemExit:
+                raise ValueError("invalid arguments: %s" % job["args"])
+            if args.games > 1 or args.manualshot or args.metrics is not None:
+                # Metrics are kept for the whole process, they'd mix up the games played at the same time.
+                raise ValueError("--games, --manualshot and --metrics can't be used with the daemon")
+            gameId, gameState, shots = playGame(args, self.connectionPool(args.host, args.port))
+            result.update(gameId = gameId, result = gameState, shots = shots)
+        except Exception as e:
+            logging.error("job %s failed: %s" % (job.get("id"), e))
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - startTime
+        return result
+
+    def serveLines(self, lines, respond):
+        """Submits a job for every json line and waits for their games to be over.
+
+        Arguments
+        lines - The json lines.
+        respond - Called with the result of every game.
+        """
+        futures = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError as e:
+                respond({"id" : None, "error" : "invalid job: %s" % e})
+                continue
+            futures.append(self.submit(job, respond))
+            # Keep only the games still being played.
+            futures = [future for future in futures if not future.done()]
+        for future in futures:
+            future.result()
+
+    def serveStream(self, lines, output):
+        """Plays the jobs read from lines, writing their results to output."""
+        lock = threading.Lock()
+        def respond(result):
+            with lock:
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+        self.serveLines(lines, respond)
+
+    def serveSocket(self, path):
+        """Plays the jobs sent to a Unix socket until the server is shut down.
+
+        Arguments
+        path - Path of the socket, replaced if it already exists.
+
+        Returns
+        The socket server, serve_forever to start serving.
+        """
+        if os.path.exists(path):
+            os.unlink(path)
+        daemon = self
+        class JobHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                output = self.wfile
+                lock = threading.Lock()
+                def respond(result):
+                    with lock:
+                        output.write((json.dumps(result) + "\n").encode("UTF-8"))
+                        output.flush()
+                daemon.serveLines((line.decode("UTF-8") for line in self.rfile), respond)
+        server = socketserver.ThreadingUnixStreamServer(path, JobHandler)
+        server.daemon_threads = True
+        return server
+
+    def close(self):
+        """Waits for the games being played and closes the connections to the gameplay servers and the trace files."""
+        self.executor.shutdown()
+        for pool in self.pools.values():
+            pool.close()
+        closeRecorders()
+
+def main(argv = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = argparse.ArgumentParser(description = "plays games of battleship read as json lines from stdin or a Unix socket",
+                                     epilog = "any other arguments are passed to every game, see battleship_player.py -h")
+    parser.add_argument("--socket", help = "Unix socket to read jobs from (default is to read them from stdin)")
+    parser.add_argument("--workers", type = int, default = 4, help = "number of games to play at once (default is 4)")
+    parser.add_argument("--logging", choices = ["debug", "info"], default = "info",
+                        help = "logging level (default is info)")
+    try:
+        args, defaults = parser.parse_known_args(argv)
+        setupLogging(args.logging)
+        daemon = GameDaemon(args.workers, defaults)
+        try:
+            if args.socket is None:
+                daemon.serveStream(sys.stdin, sys.stdout)
+            else:
+                server = daemon.serveSocket(args.socket)
+                logging.info("reading jobs from %s" % args.socket)
+                try:
+                    server.serve_forever()
+                except KeyboardInterrupt:
+                    pass
+                finally:
+                    server.server_close()
+                    os.unlink(args.socket)
+        finally:
+            daemon.close()
+    except SystemExit:
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import gzip
+import json
+import logging
+import threading
+
+"""Records the games a player plays as compact traces and reads them back.  A trace file has one json line per game
+holding the board dimensions, the fleet, the result and the shots fired in order.  Shots are packed into a single
+string, each shot is followed by "x" if it was a hit and by the size of the ship it sunk, if it sunk one, so
+"A-1 B-1x B-2x2" is a miss, a hit and a hit that sunk a ship of size 2.  Lines are only ever appended, a file can be
+recorded into by any number of games and read back one game at a time no matter how big it gets.  Files ending in .gz
+are compressed, each game is a gzip member of its own so games appended by different recorders don't mix and a player
+that's killed leaves every finished game readable.
+
+Public interface
+TraceRecorder
+record(gameId, shots, result)
+close()
+
+encodeShots(shots)
+decodeShots(text)
+readTraces(path)
+enemyBoard(trace)
+"""
+
+TRACE_VERSION = 1
+
+def compressed(path):
+    return path.endswith(".gz")
+
+def encodeShots(shots):
+    """Packs shots and their results into a string.
+
+    Arguments
+    shots - (shot, hit, sunk) of each shot fired.
+
+    Returns
+    The shots separated by spaces.
+    """
+    return " ".join(shot + ("x%s" % (sunk or "") if hit else "") for shot, hit, sunk in shots)
+
+def decodeShots(text):
+    """Unpacks the shots packed by encodeShots.
+
+    Returns
+    (shot, hit, sunk) of each shot fired.
+    """
+    shots = []
+    for token in text.split():
+        shot, hit, sunk = token.partition("x")
+        shots.append((shot, bool(hit), int(sunk or 0)))
+    return shots
+
+"""Appends the traces of finished games to a file, shared by every game a process plays."""
+class TraceRecorder:
+    def __init__(self, path, boardDimensions, fleet):
+        """Constructor.
+
+        Arguments
+        path - trace file to append to, created if it doesn't exist.
+        boardDimensions - dimensions of the (square) enemy board.
+        fleet - the size and counts of the enemy's fleet.
+        """
+        self.path = path
+        self.boardDimensions = boardDimensions
+        self.fleet = dict(fleet)
+        self.file = None
+        self.lock = threading.Lock()
+
+    def record(self, gameId, shots, result):
+        """Appends the trace of a game.
+
+        Arguments
+        gameId - The id of the game.
+        shots - (shot, hit, sunk) of each shot fired, in order.
+        result - "won" or "lost".
+        """
+        line = json.dumps({"version" : TRACE_VERSION, "game" : gameId, "dimensions" : self.boardDimensions,
+                           "fleet" : self.fleet, "result" : result, "shots" : encodeShots(shots)},
+                          separators = (",", ":")) + "\n"
+        data = line.encode("UTF-8")
+        if compressed(self.path):
+            data = gzip.compress(data)
+        with self.lock:
+            if self.file is None:
+                # Unbuffered, so each game is appended with a single write, whole, however many files are appending.
+                self.file = open(self.path, "ab", buffering = 0)
+            self.file.write(data)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def __deepcopy__(self, memo):
+        # Copies of a player's selector record into the same file.
+        return self
+
+def readTraces(path):
+    """Reads the games in a trace file one at a time.
+
+    Arguments
+    path - trace file to read.
+
+    Returns
+    A generator of (line number, trace) of each game, the shots of each trace are decoded.
+    """
+    if not compressed(path):
+        with open(path, "r", encoding = "UTF-8") as traceFile:
+            for number, line in enumerate(traceFile, 1):
+                if line.strip():
+                    yield number, parseTrace(line)
+        return
+    with gzip.open(path, "rt", encoding = "UTF-8") as traceFile:
+        number = 0
+        while True:
+            try:
+                line = traceFile.readline()
+            except EOFError:
+                # A player was killed part way through appending its last game, the games before it are whole.
+                logging.warning("%s ends with a truncated game after line %d" % (path, number))
+                return
+            if not line:
+                return
+            number += 1
+            if line.strip():
+                yield number, parseTrace(line)
+
+def parseTrace(line):
+    trace = json.loads(line)
+    if trace.get("version") != TRACE_VERSION:
+        raise ValueError("unsupported trace version: %s" % trace.get("version"))
+    trace["shots"] = decodeShots(trace["shots"])
+    return trace
+
+def enemyBoard(trace):
+    """Works out where the enemy's ships were from the shots fired at them.  Only a won game hit every coordinates of
+    every ship, so only the board of a won game can be worked out.  Each sunk shot sunk a straight line of hits that
+    includes it and that were all hit before it, the lines are fitted to the hits with a backtracking search.  When
+    more than one placement fits the hits the first one found is used.
+
+    Arguments
+    trace - A game trace.
+
+    Returns
+    The enemy's player board, in the same format as the player board files, or None if it can't be worked out.
+    """
+    boardDimensions = trace["dimensions"]
+    hits = {}
+    sinks = []
+    for number, (shot, hit, sunk) in enumerate(trace["shots"]):
+        if not hit:
+            continue
+        toks = shot.split("-")
+        coordinates = (ord(toks[0]) - ord("A"), int(toks[1]) - 1)
+        hits.setdefault(coordinates, number)
+        if sunk:
+            sinks.append((coordinates, sunk))
+    fleet = sorted(int(size) for size, count in trace["fleet"].items() for i in range(count))
+    if sorted(size for coordinates, size in sinks) != fleet or sum(fleet) != len(hits):
+        return None
+    board = [["" for y in range(boardDimensions)] for x in range(boardDimensions)]
+    if not placeSunkShips(board, hits, sinks, 0):
+        return None
+    return board
+
+def placeSunkShips(board, hits, sinks, sink):
+    if sink == len(sinks):
+        return True
+    (x, y), size = sinks[sink]
+    for dx, dy in ((0, 1), (1, 0)):
+        for offset in range(size):
+            cells = [(x + (k - offset) * dx, y + (k - offset) * dy) for k in range(size)]
+            if all(cell in hits and hits[cell] <= hits[(x, y)] and not board[cell[0]][cell[1]] for cell in cells):
+                name = "%s-%d" % (chr(ord("A") + sink % 26) + ("" if sink < 26 else str(sink // 26)), size)
+                for i, j in cells:
+                    board[i][j] = name
+                if placeSunkShips(board, hits, sinks, sink + 1):
+                    return True
+                for i, j in cells:
+                    board[i][j] = ""
+    return False
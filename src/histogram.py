@@ -0,0 +1,106 @@
+import math
+
+"""Histograms used to report distributions without keeping every value around.
+
+Public interface
+Histogram
+add(value)
+merge(other)
+percentile(fraction)
+mean()
+stdev()
+toDict()
+"""
+
+"""Counts values in buckets so the memory used doesn't depend on the number of values added.
+By default the buckets are on a log scale, growing by a constant factor, and percentiles are accurate to within a
+bucket.  Small integer values, like the number of shots in a game, can be counted exactly instead.
+"""
+class Histogram:
+    def __init__(self, bucketsPerDoubling = 4):
+        """Constructor.
+
+        Arguments
+        bucketsPerDoubling - number of buckets each time values double, more buckets give more accurate percentiles.
+        None to count every value exactly.
+        """
+        self.bucketsPerDoubling = bucketsPerDoubling
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.squares = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value, count = 1):
+        """Adds a value to the histogram.
+
+        Arguments
+        value - The (non-negative) value.
+        count - The number of times to add it.
+        """
+        bucket = self.bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += count
+        self.total += value * count
+        self.squares += value * value * count
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def bucket(self, value):
+        if self.bucketsPerDoubling is None:
+            return value
+        if value <= 0:
+            return None
+        return int(math.ceil(math.log2(value) * self.bucketsPerDoubling))
+
+    def bucketValue(self, bucket):
+        """Returns the upper bound of the values counted in a bucket."""
+        if self.bucketsPerDoubling is None:
+            return bucket
+        if bucket is None:
+            return 0
+        return 2 ** (bucket / self.bucketsPerDoubling)
+
+    def merge(self, other):
+        """Adds all of the values of another histogram with the same buckets to this one."""
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                if self.minimum is None or value < self.minimum:
+                    self.minimum = value
+                if self.maximum is None or value > self.maximum:
+                    self.maximum = value
+
+    def percentile(self, fraction):
+        """Returns the value that fraction of the values are at or below, None if there aren't any."""
+        if self.count == 0:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        # Values of 0 or less are kept in the None bucket, which comes first.
+        for bucket in sorted(self.buckets, key = lambda bucket: (bucket is not None, bucket)):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(max(self.bucketValue(bucket), self.minimum), self.maximum)
+        return self.maximum
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def stdev(self):
+        if self.count == 0:
+            return None
+        return math.sqrt(max(self.squares / self.count - self.mean() ** 2, 0))
+
+    def toDict(self):
+        """Summarizes the histogram in a form that can be dumped as json."""
+        return {"count" : self.count, "mean" : self.mean(), "stdev" : self.stdev(),
+                "min" : self.minimum, "p50" : self.percentile(0.5), "p90" : self.percentile(0.9),
+                "p99" : self.percentile(0.99), "max" : self.maximum}
@@ -0,0 +1,141 @@
+import logging
+from shot_selector import BoardState
+from shot_selector import Coordinates
+from shot_selector import Direction
+from shot_selector import MappingShotSelector
+from metrics import metrics
+
+"""Implements the mapping strategy with weights that are kept up to date across turns.
+The board is weighted once when the selector is built.  After that, a change to a set of coordinates only changes
+the ship positions that overlay them, which all lie on the same row or column.  The weights of those positions are
+taken off before the change and put back on after it, which is O(N * sizes) work instead of weighting the whole board.
+
+For every ship size the number of positions over each set of coordinates (coverage) and the extra hit weight of those
+positions (bonus) are kept separately, so a change in the number of ships of a size only needs its coverage.  The weight
+of a set of coordinates is the sum over all sizes of count * coverage + bonus, which is exactly what
+MappingShotSelector.weightBoard computes.
+"""
+class IncrementalMappingShotSelector(MappingShotSelector):
+    def __init__(self, boardDimensions, shipsAfloat):
+        """Builds the enemy board and weights it.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        shipsAfloat - the size and counts of the initial enemy fleet.
+        """
+        MappingShotSelector.__init__(self, boardDimensions, shipsAfloat)
+        self.weightBoard()
+
+    def selectShot(self):
+        """ Returns the highest weighted shot, the weights are already up to date.
+
+        Returns
+        A shot of the form LetterNumber.
+        """
+        self.printBoard()
+        bestCoordinates = self.selectBestCoordinates()
+        shot = self.mapToShot(bestCoordinates)
+        logging.debug("select shot: %s" % (shot))
+        return shot
+
+    def weightBoard(self):
+        """ Weights the board from scratch by placing all remaining ships in all possible positions.
+        """
+        metrics.count("selector.placementsTested", self.boardPlacements())
+        cells = self.boardDimensions ** 2
+        self.weights = [0] * cells
+        self.coverage = {}
+        self.bonus = {}
+        for size in self.shipsAfloat:
+            self.coverage[size] = [0] * cells
+            self.bonus[size] = [0] * cells
+            length = int(size)
+            for i in range(self.boardDimensions):
+                for j in range(self.boardDimensions - length + 1):
+                    self.weightPosition(Coordinates(i, j), size, Direction.East, 1)
+                    self.weightPosition(Coordinates(j, i), size, Direction.South, 1)
+
+    def weightPosition(self, coordinates, size, direction, sign):
+        """ Adds the weight of a single ship position to the coordinates it overlays, or takes it off.
+
+        Arguments
+        coordinates - The first coordinates of the ship, the ship must fit on the board.
+        size - The size of the ship, a key of shipsAfloat.
+        direction - The direction the ship is placed in.
+        sign - 1 to add the weight, -1 to take it off.
+        """
+        length = int(size)
+        states = []
+        hits = 0
+        for k in range(length):
+            state = self.enemyBoard[coordinates.x + k * direction.x][coordinates.y + k * direction.y]
+            if state < BoardState.HIT:
+                # The ship can't be placed here, so the position has no weight.
+                return
+            if state == BoardState.HIT:
+                hits += 1
+            states.append(state)
+        hitWeight = sign * 10 * hits
+        weight = sign * self.shipsAfloat[size] + hitWeight
+        coverage = self.coverage[size]
+        bonus = self.bonus[size]
+        for k in range(length):
+            if states[k] >= BoardState.OPEN:
+                index = (coordinates.x + k * direction.x) * self.boardDimensions + coordinates.y + k * direction.y
+                coverage[index] += sign
+                bonus[index] += hitWeight
+                self.weights[index] += weight
+
+    def weightLines(self, coordinates, sign):
+        """ Adds or takes off the weights of all ship positions that overlay a set of coordinates.
+
+        Arguments
+        coordinates - The coordinates.
+        sign - 1 to add the weights, -1 to take them off.
+        """
+        placements = 0
+        for size in self.shipsAfloat:
+            length = int(size)
+            for direction in (Direction.East, Direction.South):
+                for k in range(length):
+                    start = Coordinates(coordinates.x - k * direction.x, coordinates.y - k * direction.y)
+                    if start.x < 0 or start.y < 0:
+                        continue
+                    if start.x + (length - 1) * direction.x >= self.boardDimensions or \
+                       start.y + (length - 1) * direction.y >= self.boardDimensions:
+                        continue
+                    self.weightPosition(start, size, direction, sign)
+                    placements += 1
+        metrics.count("selector.placementsTested", placements)
+
+    def setState(self, coordinates, state):
+        self.weightLines(coordinates, -1)
+        MappingShotSelector.setState(self, coordinates, state)
+        self.weightLines(coordinates, 1)
+
+    def removeFromFleet(self, size):
+        # One less ship of this size takes one weight off every position it can be placed in.
+        coverage = self.coverage[size]
+        for index in range(len(self.weights)):
+            self.weights[index] -= coverage[index]
+        MappingShotSelector.removeFromFleet(self, size)
+        if size not in self.shipsAfloat:
+            # The last ship of this size sunk, its positions no longer have any weight.
+            bonus = self.bonus[size]
+            for index in range(len(self.weights)):
+                self.weights[index] -= bonus[index]
+            del(self.coverage[size])
+            del(self.bonus[size])
+
+    def selectBestCoordinates(self):
+        """ Selects the open coordinates with the most weight, ties are broken randomly.  The weights
+        are left as-is for the next turn.
+
+        Return
+        bestCoordinates - The highest weighted coordinates.
+        """
+        bestWeight = max(self.weights)
+        if bestWeight <= BoardState.OPEN:
+            return self.selectOpenCoordinates()
+        bestIndex = self.selectIndex(self.weights, bestWeight, self.weights.count(bestWeight))
+        return Coordinates(bestIndex // self.boardDimensions, bestIndex % self.boardDimensions)
@@ -0,0 +1,251 @@
+import random
+import logging
+import itertools
+from player import Player
+
+"""Plays games in memory rather than through the gameplay server.  LocalCommandDriver has the same interface as
+HttpCommandDriver, the games themselves are kept by a LocalGameServer that any number of drivers can share.
+Player boards are in the same format as the json player board files, a list of rows where each coordinates are
+either empty or hold the name of the ship placed over them, for example "A-5".
+
+Public interface
+LocalCommandDriver
+start(playerBoard)
+join(playerBoard, gameId)
+status(gameId)
+fire(gameId, shot)
+
+playLocalGame(playerBoard1, shotSelector1, playerBoard2, shotSelector2)
+randomBoard(boardDimensions, fleet, rng)
+"""
+
+"""Raised when a command can't be carried out."""
+class GameError(Exception):
+    pass
+
+"""A player board that resolves the shots fired at it."""
+class LocalBoard:
+    def __init__(self, playerBoard):
+        """Finds the ships on the board.
+
+        Arguments
+        playerBoard - Player board with ship placements.
+        """
+        self.boardDimensions = len(playerBoard)
+        # The ship placed over each set of coordinates and the number of coordinates of each ship that haven't been hit.
+        self.ships = {}
+        self.afloat = {}
+        for x, row in enumerate(playerBoard):
+            for y, ship in enumerate(row):
+                if ship:
+                    self.ships[(x, y)] = ship
+                    self.afloat[ship] = self.afloat.get(ship, 0) + 1
+        self.sizes = dict(self.afloat)
+        self.shots = set()
+
+    def fire(self, shot):
+        """Fires a shot at the board.
+
+        Arguments
+        shot - Shot to fire of the form LetterNumber.
+
+        Returns
+        hit - True if a ship was hit.
+        sunk - Size of the sunk ship, if the shot sunk it, 0 otherwise.
+        """
+        toks = shot.split("-")
+        coordinates = (ord(toks[0]) - ord("A"), int(toks[1]) - 1)
+        if not (0 <= coordinates[0] < self.boardDimensions and 0 <= coordinates[1] < self.boardDimensions):
+            raise GameError("Shot off the board: %s" % shot)
+        ship = self.ships.get(coordinates)
+        if ship is None:
+            return False, 0
+        if coordinates in self.shots:
+            # Hitting the same coordinates twice doesn't do any more damage.
+            return True, 0
+        self.shots.add(coordinates)
+        self.afloat[ship] -= 1
+        if self.afloat[ship] == 0:
+            return True, self.sizes[ship]
+        return True, 0
+
+    def allSunk(self):
+        """Returns True if every ship on the board was sunk."""
+        return all(count == 0 for count in self.afloat.values())
+
+"""A game between two players."""
+class LocalGame:
+    def __init__(self, gameId, player, playerBoard):
+        self.gameId = gameId
+        self.players = [player]
+        self.boards = {player : LocalBoard(playerBoard)}
+        self.turn = None
+        self.winner = None
+
+    def opponent(self, player):
+        return self.players[1] if self.players[0] == player else self.players[0]
+
+"""Keeps the games being played in memory.  The player that started a game takes the first shot."""
+class LocalGameServer:
+    def __init__(self, hitAgain = False):
+        """Constructor.
+
+        Arguments
+        hitAgain - A player that hits fires again, by default players always take turns.
+        """
+        self.games = {}
+        self.gameIds = itertools.count(1)
+        self.hitAgain = hitAgain
+
+    def start(self, player, playerBoard):
+        game = LocalGame(next(self.gameIds), player, playerBoard)
+        self.games[game.gameId] = game
+        return game.gameId
+
+    def join(self, player, gameId, playerBoard):
+        game = self.game(gameId)
+        if len(game.players) == 2:
+            raise GameError("Game %d already has two players" % gameId)
+        if player in game.players:
+            raise GameError("%s is already playing game %d" % (player, gameId))
+        game.players.append(player)
+        game.boards[player] = LocalBoard(playerBoard)
+        game.turn = game.players[0]
+        return gameId
+
+    def status(self, player, gameId):
+        game = self.game(gameId)
+        if player not in game.players:
+            raise GameError("%s isn't playing game %d" % (player, gameId))
+        if game.winner is not None:
+            return ("won" if game.winner == player else "lost"), False
+        if game.turn is None:
+            return "waiting", False
+        return "playing", game.turn == player
+
+    def fire(self, player, gameId, shot):
+        game = self.game(gameId)
+        if game.winner is not None or game.turn != player:
+            raise GameError("It isn't %s's turn in game %d" % (player, gameId))
+        opponent = game.opponent(player)
+        board = game.boards[opponent]
+        hit, sunk = board.fire(shot)
+        if board.allSunk():
+            game.winner = player
+        if not (hit and self.hitAgain):
+            game.turn = opponent
+        return hit, sunk
+
+    def game(self, gameId):
+        if gameId not in self.games:
+            raise GameError("No such game: %d" % gameId)
+        return self.games[gameId]
+
+class LocalCommandDriver:
+    def __init__(self, server, player):
+        """Constructor.
+
+        Arguments
+        server - LocalGameServer keeping the games.
+        player - name of the person playing the game.
+        """
+        self.server = server
+        self.player = player
+
+    def start(self, playerBoard):
+        """Starts a new game.
+
+        Returns
+        gameId - The id of the game that was just started.
+        """
+        logging.debug("cmd: start")
+        return self.server.start(self.player, playerBoard)
+
+    def join(self, playerBoard, gameId):
+        """Joins the game.
+
+        Arguments
+        playerBoard - Player board with ship placements.
+        gameId - The id of the game to join.
+
+        Returns
+        gameId - The id of the game that was just joined.
+        """
+        logging.debug("cmd: join")
+        return self.server.join(self.player, gameId, playerBoard)
+
+    def status(self, gameId):
+        """Returns the status of the game.
+
+        Arguments
+        gameId - The id of the current game.
+
+        Returns
+        state - "waiting", "playing", "won" or "lost".
+        myTurn - True if it's my turn, False if it's the enemy's turn.
+        """
+        logging.debug("cmd: status, game id: %d" % gameId)
+        return self.server.status(self.player, gameId)
+
+    def fire(self, gameId, shot):
+        """Fires a shot at the enemy.
+
+        Arguments
+        gameId - The id of the current game.
+        shot - Shot to fire of the form LetterNumber.
+
+        Returns
+        hit - True if an enemy's ship was hit.
+        sunk - Size of the sunk ship, if the shot sunk it.
+        """
+        logging.debug("cmd: fire, game id: %d, shot: %s" % (gameId, shot))
+        return self.server.fire(self.player, gameId, shot)
+
+def playLocalGame(playerBoard1, shotSelector1, playerBoard2, shotSelector2):
+    """Plays a whole game between two shot selectors in memory, the first one takes the first shot.
+
+    Arguments
+    playerBoard1, playerBoard2 - Player boards with ship placements.
+    shotSelector1, shotSelector2 - Shot selectors to select the shots each player takes.
+
+    Returns
+    The final game state of each player, "won" or "lost".
+    """
+    server = LocalGameServer()
+    player1 = Player(playerBoard1, LocalCommandDriver(server, "player1"), shotSelector1, 0, False)
+    player2 = Player(playerBoard2, LocalCommandDriver(server, "player2"), shotSelector2, 0, False)
+    player2.join(player1.start())
+    gameStates = [None, None]
+    while None in gameStates:
+        for i, player in enumerate((player1, player2)):
+            if gameStates[i] is None:
+                gameStates[i] = player.playTurn()
+    return gameStates[0], gameStates[1]
+
+def randomBoard(boardDimensions, fleet, rng = random):
+    """Places a fleet of ships at random on an empty player board.
+
+    Arguments
+    boardDimensions - dimensions of the (square) board.
+    fleet - the size and counts of the fleet.
+    rng - random number generator to place the ships with.
+
+    Returns
+    The player board.
+    """
+    board = [["" for j in range(boardDimensions)] for i in range(boardDimensions)]
+    sizes = sorted((int(size) for size, count in fleet.items() for i in range(count)), reverse = True)
+    if sizes and sizes[0] > boardDimensions:
+        raise ValueError("A ship of size %d doesn't fit on the board" % sizes[0])
+    for number, size in enumerate(sizes):
+        ship = "%s-%d" % (chr(ord("A") + number % 26) + ("" if number < 26 else str(number // 26)), size)
+        while True:
+            across = rng.random() < 0.5
+            x = rng.randrange(boardDimensions - (0 if across else size - 1))
+            y = rng.randrange(boardDimensions - (size - 1 if across else 0))
+            cells = [(x, y + k) if across else (x + k, y) for k in range(size)]
+            if all(board[i][j] == "" for i, j in cells):
+                break
+        for i, j in cells:
+            board[i][j] = ship
+    return board
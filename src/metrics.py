@@ -0,0 +1,96 @@
+import json
+import time
+import threading
+from collections import Counter
+from histogram import Histogram
+
+"""Counters and latency histograms for finding out where the time in a game goes.  Metrics are recorded in the
+process wide registry, metrics, which is disabled until enable() is called.  While it's disabled recording is a
+single attribute check, so instrumented code can be left in hot paths.
+
+metrics.count("player.turns")
+with metrics.timer("player.select"):
+    shot = shotSelector.selectShot()
+
+Public interface
+metrics
+enable()
+count(name, amount)
+observe(name, value)
+timer(name)
+toDict()
+dump(path)
+"""
+
+"""A timer that does nothing, handed out while the registry is disabled."""
+class NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+"""Times the block it's used with and adds the seconds it took to a histogram."""
+class Timer:
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.startTime = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.registry.observe(self.name, time.perf_counter() - self.startTime)
+        return False
+
+NULL_TIMER = NullTimer()
+
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self.counters = Counter()
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def enable(self, enabled = True):
+        """Starts (or stops) recording metrics."""
+        self.enabled = enabled
+
+    def reset(self):
+        """Forgets every metric recorded so far."""
+        with self.lock:
+            self.counters = Counter()
+            self.histograms = {}
+
+    def count(self, name, amount = 1):
+        """Adds to a counter."""
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += amount
+
+    def observe(self, name, value):
+        """Adds a (non-negative) value, usually seconds, to a histogram."""
+        if self.enabled:
+            with self.lock:
+                if name not in self.histograms:
+                    self.histograms[name] = Histogram()
+                self.histograms[name].add(value)
+
+    def timer(self, name):
+        """Returns a context manager that adds the seconds its block took to a histogram."""
+        return Timer(self, name) if self.enabled else NULL_TIMER
+
+    def toDict(self):
+        """Returns the counters and a summary of every histogram."""
+        with self.lock:
+            return {"counters" : dict(sorted(self.counters.items())),
+                    "histograms" : dict((name, histogram.toDict()) for name, histogram in sorted(self.histograms.items()))}
+
+    def dump(self, path):
+        """Writes the metrics to a json file."""
+        with open(path, "w") as output:
+            json.dump(self.toDict(), output, indent = 2)
+
+"""The process wide registry."""
+metrics = MetricsRegistry()
@@ -0,0 +1,138 @@
+import time
+import logging
+from shot_selector import BoardState
+from shot_selector import Coordinates
+from placement_table import PlacementMappingShotSelector
+from metrics import metrics
+
+"""Selects shots by sampling fleet layouts that agree with what's known about the enemy board.
+
+Public interface
+selectShot()
+shotResult(shot, hit, sunk)
+"""
+
+"""Default seconds spent sampling per shot."""
+TIME_BUDGET = 0.05
+"""Default number of layouts sampled per shot."""
+SAMPLE_BUDGET = 20000
+
+"""Implements a Monte Carlo strategy.
+Rather than weighting the board with fixed weights, whole fleet layouts are sampled at random and the layouts that
+agree with the enemy board are counted.  A layout agrees with the board when none of its ships cover a miss or a sunk
+ship, every hit is covered, and every ship still sinking is placed over its bullseye and hits only.  The open
+coordinates covered by the most of those layouts are the most likely to hold a ship.
+
+Sampling is an anytime algorithm: it keeps going until the time budget or the sample budget for the shot runs out and
+then shoots with the counts so far, so latency can be traded for accuracy.  If none of the samples agree with the
+board, the shot is selected with the placement weights instead.
+"""
+class MonteCarloShotSelector(PlacementMappingShotSelector):
+    def __init__(self, boardDimensions, shipsAfloat, timeBudget = TIME_BUDGET, sampleBudget = SAMPLE_BUDGET):
+        """Builds the enemy board and looks up the placement table.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        shipsAfloat - the size and counts of the initial enemy fleet.
+        timeBudget - most seconds to spend sampling per shot, None for no limit.
+        sampleBudget - most layouts to sample per shot, None for no limit.
+        """
+        if timeBudget is None and sampleBudget is None:
+            raise ValueError("Monte Carlo sampling needs a time budget or a sample budget")
+        PlacementMappingShotSelector.__init__(self, boardDimensions, shipsAfloat)
+        self.timeBudget = timeBudget
+        self.sampleBudget = sampleBudget
+
+    def selectShot(self):
+        """ Samples layouts and returns the open coordinates covered by the most of them.
+
+        Returns
+        A shot of the form LetterNumber.
+        """
+        counts = self.sampleLayouts()
+        if counts is None:
+            logging.debug("no sampled layouts agree with the board, weighting placements")
+            return PlacementMappingShotSelector.selectShot(self)
+        return self.selectCoveredShot(counts)
+
+    def selectCoveredShot(self, counts):
+        """ Returns the open coordinates covered by the most layouts.
+
+        Arguments
+        counts - The number of layouts covering each set of coordinates, as flat indexes.
+
+        Returns
+        A shot of the form LetterNumber.
+        """
+        for cell, count in enumerate(counts):
+            if count:
+                i, j = divmod(cell, self.boardDimensions)
+                if self.enemyBoard[i][j] >= BoardState.OPEN:
+                    self.enemyBoard[i][j] += count
+        self.printBoard()
+        shot = self.mapToShot(self.selectBestCoordinates())
+        logging.debug("select shot: %s" % (shot))
+        return shot
+
+    def shipPlacements(self):
+        """ Returns the placements each ship can still be in, ships still sinking first as they have the fewest, or
+        None if a ship has nowhere left to go.
+        """
+        table = self.placementTable
+        ships = []
+        for sinkingShip in self.shipsToSink:
+            # The positions the ship could have sunk in, as placements over its bullseye.
+            bullsEye = sinkingShip.bullsEye.x * self.boardDimensions + sinkingShip.bullsEye.y
+            cellsPlacements = dict((frozenset(table.placements[placement]), placement) for placement in table.cellPlacements[bullsEye]
+                                   if int(table.sizes[placement]) == sinkingShip.size)
+            ships.append([cellsPlacements[frozenset(i * self.boardDimensions + j for i, j in cells)]
+                          for cells in self.sinkPlacements(sinkingShip)])
+        for size, count in sorted(self.shipsAfloat.items(), key = lambda item: -int(item[0])):
+            placements = [placement for placement in range(len(table.placements))
+                          if table.sizes[placement] == size and self.blockedCounts[placement] == 0]
+            ships.extend([placements] * count)
+        if not all(ships):
+            return None
+        return ships
+
+    def sampleLayouts(self):
+        """ Samples layouts until the time or sample budget runs out.  Each ship is put in one of its placements at
+        random and the layout is thrown away if ships overlap or a hit is left uncovered, so every layout that agrees
+        with the board is equally likely to be counted.
+
+        Returns
+        The number of agreeing layouts covering each set of coordinates, as flat indexes, or None if there weren't any.
+        """
+        ships = self.shipPlacements()
+        if ships is None:
+            return None
+        placements = self.placementTable.placements
+        hits = set(i * self.boardDimensions + j for i in range(self.boardDimensions) for j in range(self.boardDimensions)
+                   if self.enemyBoard[i][j] == BoardState.HIT or Coordinates(i, j) in self.sinkingCells)
+        counts = [0] * (self.boardDimensions ** 2)
+        samples = 0
+        layouts = 0
+        deadline = None if self.timeBudget is None else time.perf_counter() + self.timeBudget
+        choice = self.rng.choice
+        while self.sampleBudget is None or samples < self.sampleBudget:
+            # Checking the clock costs about as much as a sample, only check it every so often.
+            if deadline is not None and samples % 64 == 0 and time.perf_counter() >= deadline:
+                break
+            samples += 1
+            covered = set()
+            for shipPlacements in ships:
+                cells = placements[choice(shipPlacements)]
+                if not covered.isdisjoint(cells):
+                    break
+                covered.update(cells)
+            else:
+                if hits <= covered:
+                    layouts += 1
+                    for cell in covered:
+                        counts[cell] += 1
+        logging.debug("%d of %d sampled layouts agree with the board" % (layouts, samples))
+        metrics.count("selector.layoutsSampled", samples)
+        metrics.count("selector.layoutsAgreeing", layouts)
+        if layouts == 0:
+            return None
+        return counts
@@ -0,0 +1,93 @@
+from shot_selector import BoardState
+from shot_selector import MappingShotSelector
+from metrics import metrics
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+"""NumPy backed weighting engine for the mapping strategy.  NumPy is optional, the engine can
+only be used when it's installed.
+
+Public interface
+available()
+"""
+
+def available():
+    """Returns True if NumPy is installed and the engine can be used."""
+    return numpy is not None
+
+"""Implements the mapping strategy with the board weighted all at once.
+Rather than walking every coordinate and direction, every possible position of a ship of a given size
+is checked with cumulative sums over the rows (East) and the columns (South) of the board.  A position is legal
+if none of its coordinates are blocked (BULLSEYE, SUNK or MISS) and it's given extra weight for every HIT it overlays.
+The weights of the legal positions are spread back over the coordinates they cover with a second cumulative sum.  The
+resulting weights are identical to the ones computed by MappingShotSelector.
+"""
+class NumpyMappingShotSelector(MappingShotSelector):
+    def __init__(self, boardDimensions, shipsAfloat):
+        """Builds the enemy board and keeps tracks of the remaining shots.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        shipsAfloat - the size and counts of the initial enemy fleet.
+        """
+        if not available():
+            raise ImportError("NumPy is required for the numpy engine")
+        MappingShotSelector.__init__(self, boardDimensions, shipsAfloat)
+
+    def weightBoard(self):
+        """ Weights the board by placing all remaining ships in all possible positions.  The
+        more ways a ship can be placed over a particular set of coordinates, the higher the weight.
+        Positions that overlay previous hits are given extra weight.
+        """
+        metrics.count("selector.placementsTested", self.boardPlacements())
+        board = numpy.array(self.enemyBoard, dtype = numpy.int64)
+        blocked = (board < BoardState.HIT).astype(numpy.int64)
+        hits = (board == BoardState.HIT).astype(numpy.int64)
+        weights = numpy.zeros_like(board)
+        for size, count in self.shipsAfloat.items():
+            size = int(size)
+            if size > self.boardDimensions:
+                continue
+            # East positions are windows along the rows, South positions are the same windows along the columns.
+            weights += self.weightPositions(blocked, hits, size, count)
+            weights += self.weightPositions(blocked.T, hits.T, size, count).T
+        # Weights only apply to coordinates that are open for shot selection.
+        board = numpy.where(board >= BoardState.OPEN, board + weights, board)
+        self.enemyBoard = board.tolist()
+
+    def weightPositions(self, blocked, hits, size, weight):
+        """ Weights all positions of a ship placed along the rows of the board.
+
+        Arguments
+        blocked - 1 where a coordinate can't hold a ship, 0 otherwise.
+        hits - 1 where a coordinate was previously hit, 0 otherwise.
+        size - The size of the ship.
+        weight - The weight to apply to every coordinate a ship can be placed over.
+
+        Returns
+        weights - The weight of each coordinate.
+        """
+        blockedCounts = self.windowSums(blocked, size)
+        hitCounts = self.windowSums(hits, size)
+        # The weight of each legal position, indexed by the coordinates the position starts at.
+        positionWeights = numpy.where(blockedCounts == 0, weight + 10 * hitCounts, 0)
+        # Each coordinate gets the weight of every position that starts at most size - 1 coordinates before it.
+        rows = positionWeights.shape[0]
+        padding = numpy.zeros((rows, size - 1), dtype = numpy.int64)
+        return self.windowSums(numpy.hstack((padding, positionWeights, padding)), size)
+
+    def windowSums(self, values, size):
+        """ Sums every window of size consecutive values along the rows.
+
+        Arguments
+        values - The values to sum.
+        size - The size of the window.
+
+        Returns
+        sums - The sum of the window starting at each column, there are size - 1 fewer columns than in values.
+        """
+        sums = numpy.zeros((values.shape[0], values.shape[1] + 1), dtype = numpy.int64)
+        numpy.cumsum(values, axis = 1, out = sums[:, 1:])
+        return sums[:, size:] - sums[:, :-size]
@@ -0,0 +1,218 @@
+import os
+import sys
+import dbm
+import copy
+import json
+import hashlib
+import logging
+import argparse
+import threading
+from collections import Counter
+from shot_selector import MappingShotSelector
+
+"""An opening book for the mapping strategy.  Early in a game the enemy board is nearly empty, so every game weights
+the same boards to reach the same first shots.  The book stores the best shots for every board reachable in the
+first few shots, with every mix of hits and misses, so the opening is looked up instead of weighted.  Boards with a hit
+are followed for a few more shots so the first hit's follow-ups are in the book too.
+
+Books are dbm files keyed by the shots fired so far and their results, one book per board size and fleet.  The file
+is opened on the first lookup and only the boards looked up are read.  Every book records BOOK_VERSION and is rebuilt
+when it doesn't match, BOOK_VERSION has to be bumped whenever the mapping strategy's weights change.  Books are built
+under a temporary name and renamed into place, so other processes never open a book that's half built.
+
+Public interface
+openingBook(directory, boardDimensions, fleet, depth, followUps)
+OpeningBookShotSelector(shotSelector, book)
+main(argv)
+"""
+
+"""Version of the mapping strategy the books are built for."""
+BOOK_VERSION = 1
+"""Default number of shots covered by a book, and extra shots covered after a hit."""
+DEPTH = 4
+FOLLOW_UPS = 2
+
+def bookPath(directory, boardDimensions, fleet):
+    """Returns the path of the book for a board size and fleet, the fleet is hashed so any fleet gets its own book."""
+    fleetHash = hashlib.sha1(json.dumps(dict((str(size), count) for size, count in fleet.items()),
+                                        sort_keys = True).encode("UTF-8")).hexdigest()[:16]
+    return os.path.join(directory, "opening-%d-%s" % (boardDimensions, fleetHash))
+
+def positionKey(results):
+    """Returns the book key of a board given the shots fired at it so far, in any order, and their results."""
+    return " ".join(sorted("%s:%s" % (shot, "h" if hit else "m") for shot, hit in results)).encode("ISO-8859-1")
+
+def bestShots(shotSelector):
+    """Weights the board and returns every shot with the most weight, in board order."""
+    shotSelector.weightBoard()
+    return [shotSelector.mapToShot(coordinates) for coordinates in shotSelector.selectBestCandidates()]
+
+def buildBook(path, boardDimensions, fleet, depth, followUps):
+    """Builds a book by weighting every board reachable from an empty board by firing the best shots.
+
+    Arguments
+    path - path of the book.
+    boardDimensions - dimensions of the (square) enemy board.
+    fleet - the size and counts of the enemy fleet.
+    depth - number of shots the book covers.
+    followUps - number of extra shots the book covers once there's been a hit.
+
+    Returns
+    The number of boards in the book.
+    """
+    logging.info("building opening book %s, dimensions: %d, depth: %d, follow ups: %d" % (path, boardDimensions, depth, followUps))
+    positions = 0
+    with dbm.open(path, "n") as book:
+        # Boards to weight, with the selector that has had the board's shots fired at it.
+        boards = [((), MappingShotSelector(boardDimensions, Counter(fleet)))]
+        seen = set()
+        while boards:
+            results, shotSelector = boards.pop()
+            key = positionKey(results)
+            if key in seen:
+                continue
+            seen.add(key)
+            shots = bestShots(shotSelector)
+            book[key] = " ".join(shots)
+            positions += 1
+            hits = any(hit for shot, hit in results)
+            if len(results) + 1 >= depth + (followUps if hits else 0):
+                continue
+            for shot in shots:
+                for hit in (True, False):
+                    nextSelector = copy.deepcopy(shotSelector)
+                    nextSelector.shotResult(shot, hit, 0)
+                    boards.append((results + ((shot, hit),), nextSelector))
+        book["version"] = str(BOOK_VERSION)
+        book["settings"] = json.dumps({"dimensions" : boardDimensions, "fleet" : dict(fleet), "depth" : depth,
+                                       "followUps" : followUps})
+    logging.info("opening book has %d boards" % positions)
+    return positions
+
+def openingBook(directory, boardDimensions, fleet, depth = DEPTH, followUps = FOLLOW_UPS):
+    """Returns the book for a board size and fleet, building it if there isn't one yet or the one there is out of date.
+
+    Arguments
+    directory - directory the books are kept in.
+    boardDimensions - dimensions of the (square) enemy board.
+    fleet - the size and counts of the enemy fleet.
+    depth - number of shots the book covers.
+    followUps - number of extra shots the book covers once there's been a hit.
+    """
+    path = bookPath(directory, boardDimensions, fleet)
+    settings = {"dimensions" : boardDimensions, "fleet" : dict((str(size), count) for size, count in fleet.items()),
+                "depth" : depth, "followUps" : followUps}
+    if dbm.whichdb(path) is not None:
+        with dbm.open(path, "r") as book:
+            if (book.get("version") == str(BOOK_VERSION).encode("ISO-8859-1") and
+                json.loads(book.get("settings", b"{}")) == settings):
+                return OpeningBook(path)
+        logging.info("opening book %s is out of date" % path)
+    os.makedirs(directory, exist_ok = True)
+    temporaryName = "%s.%d-%d.tmp" % (os.path.basename(path), os.getpid(), threading.get_ident())
+    buildBook(os.path.join(directory, temporaryName), boardDimensions, fleet, depth, followUps)
+    # dbm modules may add an extension, or keep the book in more than one file.
+    for name in os.listdir(directory):
+        if name.startswith(temporaryName):
+            os.replace(os.path.join(directory, name), path + name[len(temporaryName):])
+    return OpeningBook(path)
+
+"""A book opened for lookups.  The dbm file is opened on the first lookup and stays open."""
+class OpeningBook:
+    def __init__(self, path):
+        self.path = path
+        self.book = None
+        self.lock = threading.Lock()
+
+    def lookup(self, results):
+        """Returns the best shots for the board the shots have been fired at, or None if the board isn't in the book.
+
+        Arguments
+        results - the shots fired so far and whether they hit.
+        """
+        with self.lock:
+            if self.book is None:
+                self.book = dbm.open(self.path, "r")
+        shots = self.book.get(positionKey(results))
+        return None if shots is None else shots.decode("ISO-8859-1").split()
+
+    def close(self):
+        with self.lock:
+            if self.book is not None:
+                self.book.close()
+                self.book = None
+
+    def __deepcopy__(self, memo):
+        # Books are read only and shared, copies of a selector keep using the same one.
+        return self
+
+"""Selects shots from an opening book for as long as the game stays in the book, then from the wrapped selector.
+The wrapped selector is kept up to date with every shot result throughout so it can take over at any point.  A sunk
+ship takes the game out of the book.
+"""
+class OpeningBookShotSelector:
+    def __init__(self, shotSelector, book):
+        """Constructor.
+
+        Arguments
+        shotSelector - Mapping shot selector to select the shots once the game is out of the book.
+        book - The OpeningBook for the board size and fleet.
+        """
+        self.shotSelector = shotSelector
+        self.book = book
+        # Shots fired so far and whether they hit, None once the game is out of the book.
+        self.results = ()
+
+    def __getattr__(self, name):
+        if name == "shotSelector":
+            raise AttributeError(name)
+        return getattr(self.shotSelector, name)
+
+    def selectShot(self):
+        """Returns a random one of the book's best shots, or the wrapped selector's shot once out of the book.
+
+        Returns
+        A shot of the form LetterNumber.
+        """
+        if self.results is not None:
+            shots = self.book.lookup(self.results)
+            if shots:
+                shot = self.rng.choice(shots)
+                logging.debug("book shot: %s" % (shot))
+                return shot
+            logging.debug("out of the opening book after %d shots" % len(self.results))
+            self.results = None
+        return self.shotSelector.selectShot()
+
+    def shotResult(self, shot, hit, sunk):
+        """Updates the wrapped selector with the result of a shot.
+
+        Arguments
+        shot - Shot of the form LetterNumber.
+        hit - True, if the shot was a hit.
+        sunk - Size of the sunk ship, if the shot sunk it.
+        """
+        self.shotSelector.shotResult(shot, hit, sunk)
+        if self.results is not None:
+            self.results = None if sunk else self.results + ((shot, bool(hit)),)
+
+def main(argv = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = argparse.ArgumentParser(description = "builds an opening book for the mapping strategy")
+    parser.add_argument("fleet", help = "json file containing the number and size of the fleet of ships")
+    parser.add_argument("directory", help = "directory to keep the book in")
+    parser.add_argument("--dimensions", type = int, default = 10, help = "dimensions of the (square) board (default is 10)")
+    parser.add_argument("--depth", type = int, default = DEPTH, help = "number of shots the book covers (default is %d)" % DEPTH)
+    parser.add_argument("--followups", type = int, default = FOLLOW_UPS,
+                        help = "number of extra shots the book covers after a hit (default is %d)" % FOLLOW_UPS)
+    try:
+        args = parser.parse_args(argv)
+        logging.basicConfig(level = logging.INFO)
+        fleet = json.load(open(args.fleet))["fleet"]
+        openingBook(args.directory, args.dimensions, fleet, args.depth, args.followups).close()
+    except SystemExit:
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+import logging
+from shot_selector import BoardState
+from shot_selector import Coordinates
+from shot_selector import Direction
+from shot_selector import MappingShotSelector
+from metrics import metrics
+
+"""Hunts and targets rather than weighting the whole board.  While there are no live hits, coordinates that were hit
+and can't be part of a sunk ship whichever way the sinking ships sunk, every ship afloat is at least as long as the smallest one, so every ship
+covers one of the coordinates of a lattice with that spacing, the coordinates where (x + y) % spacing is the lattice
+offset.  Hunting only weights and selects from the open coordinates of the lattice, about one in every spacing of the
+board.  The spacing follows the smallest ship afloat as ships are sunk.  Once there are live hits, targeting only
+places ships over the hits, so only the coordinates within reach of a hit are weighted.  Weights are the ones the
+mapping strategy gives the same coordinates for the placements that are considered.
+
+Public interface
+mode()
+liveHits
+"""
+class ParityShotSelector(MappingShotSelector):
+    def __init__(self, boardDimensions, shipsAfloat):
+        """Builds the enemy board and keeps tracks of the remaining shots.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        shipsAfloat - the size and counts of the initial enemy fleet.
+        """
+        MappingShotSelector.__init__(self, boardDimensions, shipsAfloat)
+        # Coordinates that are HIT, and the ones of them that have to be part of a ship afloat.
+        self.hits = set()
+        self.liveHits = set()
+        self.spacing = None
+        self.offset = 0
+        # Weight of every set of coordinates that was weighted, None when the whole board was weighted instead.
+        self.weights = {}
+
+    def setState(self, coordinates, state):
+        MappingShotSelector.setState(self, coordinates, state)
+        if state == BoardState.HIT:
+            # A sinking ship can't cover a hit that came after it sunk, a new hit is always live.
+            self.hits.add(coordinates)
+            self.liveHits.add(coordinates)
+        else:
+            self.hits.discard(coordinates)
+            self.liveHits.discard(coordinates)
+
+    def sinkShips(self):
+        MappingShotSelector.sinkShips(self)
+        # The hits a sinking ship could cover might be part of it, targeting them would be a waste.
+        self.liveHits = self.hits - self.sinkCoverage
+
+    def mode(self):
+        """Returns "target" if there are live hits to place ships over, "hunt" if there aren't."""
+        return "target" if self.liveHits else "hunt"
+
+    def weightBoard(self):
+        """ Weights the lattice when hunting or the coordinates around the live hits when targeting.  If none of them
+        can have a ship placed over them the whole board is weighted instead.
+        """
+        if self.liveHits:
+            self.weights = self.targetWeights()
+        else:
+            self.weights = self.huntWeights()
+        logging.debug("weighting in %s mode" % (self.mode()))
+        if not self.weights:
+            self.weights = None
+            MappingShotSelector.weightBoard(self)
+
+    def latticeOffset(self):
+        """Returns the offset of the lattice for the smallest ship afloat, picking a new one at random when the
+        spacing changes.
+        """
+        spacing = min(int(size) for size in self.shipsAfloat)
+        if spacing != self.spacing:
+            self.spacing = spacing
+            self.offset = self.rng.randrange(spacing)
+        return self.offset
+
+    def huntWeights(self):
+        """Counts the placements of the ships afloat over every open set of coordinates of the lattice.  There are no
+        live hits, so no placement overlays any.
+
+        Returns
+        The weight of every set of lattice coordinates that has any.
+        """
+        if not self.shipsAfloat:
+            return {}
+        offset = self.latticeOffset()
+        ships = [(int(size), count) for size, count in self.shipsAfloat.items() if int(size) <= self.boardDimensions]
+        longest = max(size for size, count in ships) if ships else 0
+        weights = {}
+        enemyBoard = self.enemyBoard
+        boardDimensions = self.boardDimensions
+        for x in range(boardDimensions):
+            row = enemyBoard[x]
+            for y in range((offset - x) % self.spacing, boardDimensions, self.spacing):
+                if row[y] == BoardState.OPEN:
+                    weight = self.placementWeight(x, y, ships, longest)
+                    if weight:
+                        weights[Coordinates(x, y)] = weight
+        metrics.count("selector.placementsTested", len(weights) * 2 * len(ships))
+        return weights
+
+    def placementWeight(self, x, y, ships, longest):
+        """Counts the placements of ships over (x, y), without any extra weight for the hits they overlay.
+
+        Arguments
+        x, y - The coordinates.
+        ships - The size and count of each ship afloat.
+        longest - The size of the longest ship.
+
+        Returns
+        The number of placements of every ship covering the coordinates, times the number of ships of its size.
+        """
+        # How far the coordinates a ship can cover run out from (x, y) in each direction, up to the longest ship.
+        reach = [self.reach(x, y, direction, longest - 1)
+                 for direction in (Direction.West, Direction.East, Direction.North, Direction.South)]
+        weight = 0
+        for size, count in ships:
+            for before, after in ((reach[0], reach[1]), (reach[2], reach[3])):
+                weight += count * max(0, min(before, size - 1) + min(after, size - 1) + 2 - size)
+        return weight
+
+    def reach(self, x, y, direction, limit):
+        """Returns the number of coordinates past (x, y) in a direction that a ship can cover, up to limit."""
+        dx, dy = direction
+        for k in range(limit):
+            x += dx
+            y += dy
+            if not (0 <= x < self.boardDimensions and 0 <= y < self.boardDimensions) or self.enemyBoard[x][y] < BoardState.HIT:
+                return k
+        return limit
+
+    def targetWeights(self):
+        """Weights the open coordinates covered by placements of the ships afloat that overlay a live hit.  They're
+        given the weight the mapping strategy would give them, every placement over them counts and the ones that
+        overlay hits get extra weight for every hit.
+
+        Returns
+        The weight of every open set of coordinates covered by any of the placements overlaying a hit.
+        """
+        placements = set()
+        for x, y in self.liveHits:
+            for size in self.shipsAfloat:
+                size = int(size)
+                for dx, dy in (Direction.East, Direction.South):
+                    for k in range(size):
+                        placements.add((x - k * dx, y - k * dy, dx, dy, size))
+        metrics.count("selector.placementsTested", len(placements))
+        weights = {}
+        enemyBoard = self.enemyBoard
+        boardDimensions = self.boardDimensions
+        for x, y, dx, dy, size in placements:
+            endX = x + dx * (size - 1)
+            endY = y + dy * (size - 1)
+            if not (0 <= x and 0 <= y and endX < boardDimensions and endY < boardDimensions):
+                continue
+            cells = [Coordinates(x + k * dx, y + k * dy) for k in range(size)]
+            states = [enemyBoard[i][j] for i, j in cells]
+            if min(states) < BoardState.HIT:
+                continue
+            weight = 10 * states.count(BoardState.HIT)
+            for coordinates, state in zip(cells, states):
+                if state == BoardState.OPEN:
+                    weights[coordinates] = weights.get(coordinates, 0) + weight
+        ships = [(int(size), count) for size, count in self.shipsAfloat.items() if int(size) <= boardDimensions]
+        longest = max(size for size, count in ships) if ships else 0
+        for coordinates in weights:
+            weights[coordinates] += self.placementWeight(coordinates.x, coordinates.y, ships, longest)
+        return weights
+
+    def selectBestCoordinates(self):
+        """ Selects the coordinates with the most weight, ties are broken randomly.
+
+        Return
+        bestCoordinates - The highest weighted coordinates.
+        """
+        if self.weights is None:
+            return MappingShotSelector.selectBestCoordinates(self)
+        return self.rng.choice(self.selectBestCandidates())
+
+    def selectBestCandidates(self):
+        if self.weights is None:
+            return MappingShotSelector.selectBestCandidates(self)
+        bestWeight = max(self.weights.values())
+        # Sorted so the choice only depends on rng, not on the order of the set of live hits.
+        return tuple(sorted(coordinates for coordinates, weight in self.weights.items() if weight == bestWeight))
+
+    def weightedCells(self):
+        if self.weights is None:
+            return MappingShotSelector.weightedCells(self)
+        return len(self.weights)
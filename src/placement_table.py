@@ -0,0 +1,125 @@
+import logging
+from shot_selector import BoardState
+from shot_selector import MappingShotSelector
+from metrics import metrics
+
+"""Precomputed ship placements.  For a given board size and fleet the possible placements of the ships never
+change, only whether they're still possible does.  Tables are cached so repeated games in the same process share them.
+
+Public interface
+placementTable(boardDimensions, fleet)
+"""
+
+"""Cached tables, keyed by board dimensions and ship sizes."""
+placementTables = {}
+
+def placementTable(boardDimensions, fleet):
+    """Returns the placement table for a board and fleet, building it the first time it's asked for.
+    The number of ships of each size has no effect on where they can be placed so only the sizes are
+    part of the key.
+
+    Arguments
+    boardDimensions - dimensions of the (square) enemy board.
+    fleet - the size and counts of the enemy fleet.
+    """
+    key = (boardDimensions, tuple(sorted(fleet, key = int)))
+    if key not in placementTables:
+        placementTables[key] = PlacementTable(boardDimensions, key[1])
+    return placementTables[key]
+
+"""Every placement of every ship size in both orientations along with an inverted index from a set of coordinates
+to the placements covering it.  Coordinates are flat indexes, x * boardDimensions + y.  Tables are shared and must
+not be modified.
+"""
+class PlacementTable:
+    def __init__(self, boardDimensions, sizes):
+        """Builds the table.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        sizes - the ship sizes, keys of shipsAfloat.
+        """
+        logging.debug("building placement table, dimensions: %d, sizes: %s" % (boardDimensions, sizes))
+        self.boardDimensions = boardDimensions
+        # The coordinates covered by each placement.
+        self.placements = []
+        # The coordinates covered by each placement as a bit mask, bit x * boardDimensions + y.
+        self.masks = []
+        # The ship size of each placement.
+        self.sizes = []
+        # The placements covering each set of coordinates.
+        self.cellPlacements = [[] for i in range(boardDimensions ** 2)]
+        for size in sizes:
+            length = int(size)
+            for step in (1, boardDimensions):
+                for i in range(boardDimensions):
+                    for j in range(boardDimensions - length + 1):
+                        start = i * boardDimensions + j if step == 1 else j * boardDimensions + i
+                        self.addPlacement(size, tuple(range(start, start + length * step, step)))
+
+    def addPlacement(self, size, cells):
+        placement = len(self.placements)
+        self.placements.append(cells)
+        self.masks.append(sum(1 << cell for cell in cells))
+        self.sizes.append(size)
+        for cell in cells:
+            self.cellPlacements[cell].append(placement)
+
+    def __deepcopy__(self, memo):
+        # Tables are immutable and shared, copies of a selector keep using the same one.
+        return self
+
+"""Implements the mapping strategy on a precomputed placement table.
+Rather than searching for positions every turn, each placement keeps a count of the blocked (BULLSEYE, SUNK or MISS)
+coordinates and hits it covers, updated as the board changes.  A placement is dead as soon as one of its coordinates
+is blocked.  The weight of a set of coordinates is the sum over the live placements covering it, which is the same
+weight MappingShotSelector computes.
+"""
+class PlacementMappingShotSelector(MappingShotSelector):
+    def __init__(self, boardDimensions, shipsAfloat):
+        """Builds the enemy board and looks up the placement table.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        shipsAfloat - the size and counts of the initial enemy fleet.
+        """
+        MappingShotSelector.__init__(self, boardDimensions, shipsAfloat)
+        self.placementTable = placementTable(boardDimensions, shipsAfloat)
+        placements = len(self.placementTable.placements)
+        self.blockedCounts = [0] * placements
+        self.hitCounts = [0] * placements
+
+    def setState(self, coordinates, state):
+        previousState = self.enemyBoard[coordinates.x][coordinates.y]
+        MappingShotSelector.setState(self, coordinates, state)
+        blocked = (state < BoardState.HIT) - (previousState < BoardState.HIT)
+        hit = (state == BoardState.HIT) - (previousState == BoardState.HIT)
+        if blocked == 0 and hit == 0:
+            return
+        for placement in self.placementTable.cellPlacements[coordinates.x * self.boardDimensions + coordinates.y]:
+            self.blockedCounts[placement] += blocked
+            self.hitCounts[placement] += hit
+
+    def weightBoard(self):
+        """ Weights the board by adding up the live placements over every open set of coordinates.
+        Placements that overlay previous hits are given extra weight.
+        """
+        table = self.placementTable
+        blockedCounts = self.blockedCounts
+        hitCounts = self.hitCounts
+        tested = 0
+        for i in range(self.boardDimensions):
+            row = self.enemyBoard[i]
+            for j in range(self.boardDimensions):
+                if row[j] < BoardState.OPEN:
+                    continue
+                weight = 0
+                placements = table.cellPlacements[i * self.boardDimensions + j]
+                tested += len(placements)
+                for placement in placements:
+                    if blockedCounts[placement] == 0:
+                        count = self.shipsAfloat.get(table.sizes[placement], 0)
+                        if count > 0:
+                            weight += count + 10 * hitCounts[placement]
+                row[j] += weight
+        metrics.count("selector.placementsTested", tested)
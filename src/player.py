@@ -1,5 +1,8 @@
 import logging
 import time
+from poll_scheduler import PollScheduler
+from turn_tracker import TurnTracker
+from metrics import metrics
 
 """Plays the game of battleship.
 
@@ -7,7 +10,8 @@ Public interface
 play()
 """
 class Player:
-    def __init__(self, playerBoard, commandDriver, shotSelector, pauseTime, manualShot):
+    def __init__(self, playerBoard, commandDriver, shotSelector, pauseTime, manualShot, pollScheduler = None, longPoll = None,
+                 recorder = None, turnTracker = None):
         """Constructor.
 
         Arguments
@@ -16,12 +20,22 @@ class Player:
         shotSelector -  Shot selector to select shots to take.
         pauseTime - Time to wait between turns.
         manualShot - Wait for user input to take a shot.
+        pollScheduler - PollScheduler deciding how long to wait between status polls, by default always pauseTime.
+        longPoll - If set, the number of seconds the server is asked to hold a status poll until it's my turn.
+        recorder - TraceRecorder to record the game to once it's over, None not to record it.
+        turnTracker - TurnTracker working out whose turn it is from my shots, by default every turn is polled for.
         """
         self.playerBoard = playerBoard
         self.commandDriver = commandDriver
         self.shotSelector = shotSelector
         self.pauseTime = pauseTime
         self.manualShot = manualShot
+        self.pollScheduler = PollScheduler.fixed(pauseTime) if pollScheduler is None else pollScheduler
+        self.longPoll = longPoll
+        self.recorder = recorder
+        self.turnTracker = TurnTracker() if turnTracker is None else turnTracker
+        # (shot, hit, sunk) of each shot fired.
+        self.shots = []
         
     def start(self):
         """Starts a new game.
@@ -48,17 +62,87 @@ class Player:
             update the enemy's board with the results of the shot
           else
             wait for my turn
+
+        Returns
+        gameState - "won" or "lost".
         """
         while True:
-            gameState, myTurn = self.commandDriver.status(self.gameId)
-            if gameState == "won" or gameState == "lost":
-                logging.info("I %s!" % gameState)
-                break
-            if gameState == "playing" and myTurn:
-                if self.manualShot:
-                    input("take a shot")
+            gameState = self.playTurn()
+            if gameState is not None:
+                return gameState
+
+    def playTurn(self):
+        """A single pass through the gameplay loop.
+
+        Returns
+        gameState - "won" or "lost" if the game is over, None if it isn't.
+        """
+        pollTime = time.perf_counter()
+        if self.turnTracker.knownTurn:
+            # My last shot hit and the rules say I go again, there's no need to ask.
+            metrics.count("player.statusSkipped")
+            gameState, myTurn = "playing", True
+            polled = False
+        else:
+            polled = True
+            with metrics.timer("player.status"):
+                gameState, myTurn = self.status()
+            self.turnTracker.polled()
+        if gameState == "won" or gameState == "lost":
+            logging.info("I %s!" % gameState)
+            self.logPolls()
+            if self.recorder is not None:
+                self.recorder.record(self.gameId, self.shots, gameState)
+            return gameState
+        if gameState == "playing" and myTurn:
+            polls = self.pollScheduler.turnStarted(polled)
+            logging.debug("my turn after %d polls" % polls)
+            metrics.count("player.turns")
+            if polled:
+                metrics.observe("player.pollsPerTurn", polls)
+            if self.manualShot:
+                input("take a shot")
+            with metrics.timer("player.select"):
                 shot = self.shotSelector.selectShot()
+            with metrics.timer("player.fire"):
                 hit, sunk = self.commandDriver.fire(self.gameId, shot)
+            with metrics.timer("player.shotResult"):
                 self.shotSelector.shotResult(shot, hit, sunk)
-            else:
-                time.sleep(self.pauseTime)
+            self.shots.append((shot, hit, sunk))
+            metrics.observe("player.turn", time.perf_counter() - pollTime)
+            self.turnTracker.fired(hit, sunk, bool(self.shotSelector.shipsAfloat))
+            if self.turnTracker.knownTurn is False and self.longPoll is None:
+                # It's the enemy's turn, a poll now would only say so.  Wait as if it had, a long poll is held by the
+                # server anyway so there's nothing to skip.
+                metrics.count("player.statusSkipped")
+                self.wait(pollTime, False)
+        else:
+            self.wait(pollTime)
+        return None
+
+    def wait(self, pollTime, polled = True):
+        """Waits before polling again.
+
+        Arguments
+        pollTime - When the last poll was sent.
+        polled - False if the poll was skipped, it isn't counted by the poll scheduler.
+        """
+        delay = self.pollScheduler.nextDelay() if polled else self.pollScheduler.skippedDelay()
+        if self.longPoll is not None:
+            # The server already held the poll, only wait out whatever's left.  A server that doesn't long poll
+            # answers right away, so this falls back to the normal back off.
+            delay -= time.perf_counter() - pollTime
+        if delay > 0:
+            metrics.observe("player.wait", delay)
+            time.sleep(delay)
+
+    def status(self):
+        """Polls the status of the game, holding the poll on the server if long polling."""
+        if self.longPoll is None:
+            return self.commandDriver.status(self.gameId)
+        return self.commandDriver.status(self.gameId, self.longPoll)
+
+    def logPolls(self):
+        pollsPerTurn = self.pollScheduler.pollsPerTurn
+        if pollsPerTurn:
+            logging.info("status polls per turn, mean: %.1f, max: %d" % (sum(pollsPerTurn) / len(pollsPerTurn), max(pollsPerTurn)))
@@ -0,0 +1,73 @@
+import random
+
+"""Decides how long to wait between status polls while waiting for a turn.  The first poll after the enemy starts
+their turn comes quickly, then the wait backs off exponentially up to a cap so a slow enemy doesn't cause a flood of
+polls.  Waits are jittered so players polling the same server don't poll in lockstep.  The back off starts over
+every time the turn comes back around.
+
+Public interface
+nextDelay()
+skippedDelay()
+turnStarted(polled)
+pollsPerTurn
+"""
+class PollScheduler:
+    def __init__(self, initialDelay, maxDelay, factor = 2.0, jitter = 0.2, rng = random):
+        """Constructor.
+
+        Arguments
+        initialDelay - seconds to wait before the second poll of a turn.
+        maxDelay - most seconds to wait between polls.
+        factor - how much the wait grows after each poll.
+        jitter - fraction of the wait that's randomly added or taken off.
+        rng - random number generator for the jitter.
+        """
+        self.initialDelay = initialDelay
+        self.maxDelay = maxDelay
+        self.factor = factor
+        self.jitter = jitter
+        self.rng = rng
+        self.delay = initialDelay
+        # Polls made since the turn last came around.
+        self.polls = 0
+        # Number of polls it took for each turn to come around.
+        self.pollsPerTurn = []
+
+    @classmethod
+    def fixed(cls, delay):
+        """Returns a scheduler that always waits the same number of seconds."""
+        return cls(delay, delay, 1.0, 0.0)
+
+    def nextDelay(self):
+        """Counts a poll that found it wasn't my turn and returns the number of seconds to wait before the next one."""
+        self.polls += 1
+        delay = self.delay
+        self.delay = min(self.delay * self.factor, self.maxDelay)
+        if self.jitter:
+            delay *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        return min(delay, self.maxDelay)
+
+    def skippedDelay(self):
+        """Returns the number of seconds to wait in place of a poll that was skipped because its answer was already
+        known, without counting it as a poll or backing off.
+        """
+        delay = self.delay
+        if self.jitter:
+            delay *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        return min(delay, self.maxDelay)
+
+    def turnStarted(self, polled = True):
+        """Counts the poll that found it was my turn and starts the back off over.
+
+        Arguments
+        polled - False if it was known to be my turn without polling, the turn isn't counted in pollsPerTurn.
+
+        Returns
+        The number of polls it took for the turn to come around.
+        """
+        polls = self.polls + 1 if polled else self.polls
+        if polled:
+            self.pollsPerTurn.append(polls)
+        self.polls = 0
+        self.delay = self.initialDelay
+        return polls
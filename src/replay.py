@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import multiprocessing
+from collections import Counter
+from histogram import Histogram
+from local_command_driver import LocalBoard
+from selector_factory import createShotSelector
+from tournament import parseStrategy
+from tournament import playHeadlessGame
+from game_trace import readTraces
+from game_trace import enemyBoard
+
+"""Replays recorded games offline to see how many shots other strategies would have needed to win them and how
+long they took to select each shot.  The enemy board of every won game in a trace file is worked out from the shots
+fired at it and each strategy plays a headless game against it, as in the tournament.  Lost games didn't find every
+ship, so they're skipped.  Trace files are streamed, only as many games as the workers are busy with are read ahead,
+so files with millions of games don't have to fit in memory.  Only the distributions are kept, the results of each
+game can be streamed to disk.
+
+Public interface
+main(argv)
+replayTraces(traces, strategies, workers, seed, output)
+"""
+
+"""Settings of the replay, set in every worker when the pool starts."""
+settings = {}
+
+def setup(strategies, seed):
+    settings.update(strategies = strategies, seed = seed)
+
+def replayGame(numberedTrace):
+    """Plays one recorded game with every strategy.
+
+    Arguments
+    numberedTrace - The line number of the game in the trace file and its trace.
+
+    Returns
+    The results of each strategy, an empty list if the game couldn't be replayed.
+    """
+    number, trace = numberedTrace
+    board = enemyBoard(trace)
+    if board is None:
+        return []
+    results = []
+    for spec in settings["strategies"]:
+        # Selectors break ties with the random module, seed it so the replay can be repeated.
+        random.seed("%s-%d%s" % (settings["seed"], number, spec))
+        strategy, engine = parseStrategy(spec)
+        # Games are already spread over the workers, the tiled engine weights in the same process.
+        shotSelector = createShotSelector(strategy, engine, trace["dimensions"], Counter(trace["fleet"]), workers = 1)
+        shots, selectTimes = playHeadlessGame(shotSelector, LocalBoard(board))
+        shotSelector.close()
+        results.append({"line" : number, "game" : trace.get("game"), "strategy" : spec, "shots" : shots,
+                        "recordedShots" : len(trace["shots"]), "selectSeconds" : selectTimes.total,
+                        "selectTimes" : selectTimes})
+    return results
+
+def boundedTraces(traces, inFlight):
+    """Passes the traces on as long as fewer than inFlight of them are being replayed."""
+    for trace in traces:
+        inFlight.acquire()
+        yield trace
+
+def replayTraces(traces, strategies, workers, seed, output = None):
+    """Replays recorded games.
+
+    Arguments
+    traces - iterable of (line number, trace) of each game, as read by readTraces.
+    strategies - the strategies to replay the games with, of the form strategy[:engine].
+    workers - the number of worker processes, 1 replays every game in this process.
+    seed - seed the selectors break ties with.
+    output - file to write the results of each game to as json lines, None not to write them.
+
+    Returns
+    The shots to win and per-shot selection time histograms of each strategy, the shots the recorded games took and
+    the number of games replayed and skipped.
+    """
+    shotHistograms = dict((spec, Histogram(None)) for spec in strategies)
+    timeHistograms = dict((spec, Histogram()) for spec in strategies)
+    recordedShots = Histogram(None)
+    counts = Counter(replayed = 0, skipped = 0)
+    arguments = (list(strategies), seed)
+    chunkSize = 16
+    # The pool reads ahead as fast as it can, hold it back to a few chunks per worker.
+    inFlight = threading.Semaphore(workers * chunkSize * 4)
+    if workers == 1:
+        setup(*arguments)
+        pool = None
+        gameResults = map(replayGame, traces)
+    else:
+        pool = multiprocessing.Pool(workers, setup, arguments)
+        gameResults = pool.imap_unordered(replayGame, boundedTraces(traces, inFlight), chunksize = chunkSize)
+    try:
+        for results in gameResults:
+            inFlight.release()
+            if not results:
+                counts["skipped"] += 1
+                continue
+            counts["replayed"] += 1
+            recordedShots.add(results[0]["recordedShots"])
+            for result in results:
+                shotHistograms[result["strategy"]].add(result["shots"])
+                timeHistograms[result["strategy"]].merge(result.pop("selectTimes"))
+                if output is not None:
+                    output.write(json.dumps(result) + "\n")
+    finally:
+        if pool is not None:
+            pool.terminate()
+    summary = {"games" : dict(counts), "recorded" : {"shots" : recordedShots.toDict()}}
+    summary.update((spec, {"shots" : shotHistograms[spec].toDict(), "selectSeconds" : timeHistograms[spec].toDict()})
+                   for spec in strategies)
+    return summary
+
+def main(argv = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = argparse.ArgumentParser(description = "replays recorded games with other shot selection strategies")
+    parser.add_argument("traces", help = "trace file recorded with battleship_player.py --trace")
+    parser.add_argument("--strategies", nargs = "+", default = ["mapping"],
+                        help = "strategies to replay the games with, of the form strategy[:engine] (default is mapping)")
+    parser.add_argument("--workers", type = int, default = os.cpu_count(),
+                        help = "number of worker processes (default is the number of cores)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed the selectors break ties with (default is 0)")
+    parser.add_argument("--output", help = "json lines file to stream the result of each game to")
+    parser.add_argument("--summary", help = "json file to write the summary to")
+    try:
+        args = parser.parse_args(argv)
+        output = open(args.output, "w") if args.output else None
+        startTime = time.perf_counter()
+        try:
+            summary = replayTraces(readTraces(args.traces), args.strategies, args.workers, args.seed, output)
+        finally:
+            if output is not None:
+                output.close()
+        games = summary["games"]
+        print("%d games replayed, %d skipped in %.1f seconds" % (games["replayed"], games["skipped"],
+                                                                 time.perf_counter() - startTime))
+        if games["replayed"]:
+            shots = summary["recorded"]["shots"]
+            print("%-20s shots mean %.2f stdev %.2f min %d p50 %d p90 %d max %d" %
+                  ("recorded", shots["mean"], shots["stdev"], shots["min"], shots["p50"], shots["p90"], shots["max"]))
+            for spec in args.strategies:
+                shots = summary[spec]["shots"]
+                selectSeconds = summary[spec]["selectSeconds"]
+                print("%-20s shots mean %.2f stdev %.2f min %d p50 %d p90 %d max %d, select ms mean %.3f p50 %.3f p99 %.3f" %
+                      (spec, shots["mean"], shots["stdev"], shots["min"], shots["p50"], shots["p90"], shots["max"],
+                       selectSeconds["mean"] * 1000, selectSeconds["p50"] * 1000, selectSeconds["p99"] * 1000))
+        if args.summary:
+            with open(args.summary, "w") as summaryFile:
+                json.dump(summary, summaryFile, indent = 2)
+    except SystemExit:
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+from shot_selector import RandomShotSelector
+from shot_selector import MappingShotSelector
+from numpy_shot_selector import NumpyMappingShotSelector
+from bitboard_shot_selector import BitboardMappingShotSelector
+from incremental_shot_selector import IncrementalMappingShotSelector
+from placement_table import PlacementMappingShotSelector
+from flat_shot_selector import FlatMappingShotSelector
+from tiled_shot_selector import TiledMappingShotSelector
+from monte_carlo_shot_selector import MonteCarloShotSelector
+from monte_carlo_shot_selector import TIME_BUDGET
+from monte_carlo_shot_selector import SAMPLE_BUDGET
+from exact_shot_selector import ExactShotSelector
+from exact_shot_selector import MEMORY_BUDGET
+from parity_shot_selector import ParityShotSelector
+
+"""Builds shot selectors by name so the strategy and the engine used to run it can be picked per deployment.
+
+Public interface
+createShotSelector(strategy, engine, boardDimensions, shipsAfloat, timeBudget, sampleBudget, memoryBudget, workers)
+"""
+
+STRATEGIES = ["exact", "mapping", "montecarlo", "parity", "random"]
+
+"""Weighting engines for the mapping strategy, they all select shots the same way."""
+MAPPING_ENGINES = {
+    "python" : MappingShotSelector,
+    "numpy" : NumpyMappingShotSelector,
+    "bitboard" : BitboardMappingShotSelector,
+    "incremental" : IncrementalMappingShotSelector,
+    "placement" : PlacementMappingShotSelector,
+    "flat" : FlatMappingShotSelector,
+    "tiled" : TiledMappingShotSelector,
+}
+
+def createShotSelector(strategy, engine, boardDimensions, shipsAfloat, timeBudget = TIME_BUDGET, sampleBudget = SAMPLE_BUDGET,
+                       memoryBudget = MEMORY_BUDGET, workers = None):
+    """Builds a shot selector.
+
+    Arguments
+    strategy - shot selection strategy, one of STRATEGIES.
+    engine - weighting engine used by the mapping strategy, one of MAPPING_ENGINES.
+    boardDimensions - dimensions of the (square) enemy board.
+    shipsAfloat - the size and counts of the initial enemy fleet.
+    timeBudget - most seconds the montecarlo and exact strategies spend sampling per shot, None for no limit.
+    sampleBudget - most layouts the montecarlo and exact strategies sample per shot, None for no limit.
+    memoryBudget - megabytes of counted board states the exact strategy keeps.
+    workers - worker processes the tiled engine weights the board on, by default its defaultWorkers().
+
+    Returns
+    The shot selector.
+    """
+    if strategy == "mapping":
+        if engine == "tiled":
+            return TiledMappingShotSelector(boardDimensions, shipsAfloat, workers)
+        return MAPPING_ENGINES[engine](boardDimensions, shipsAfloat)
+    if strategy == "exact":
+        return ExactShotSelector(boardDimensions, shipsAfloat, memoryBudget, timeBudget, sampleBudget)
+    if strategy == "montecarlo":
+        return MonteCarloShotSelector(boardDimensions, shipsAfloat, timeBudget, sampleBudget)
+    if strategy == "parity":
+        return ParityShotSelector(boardDimensions, shipsAfloat)
+    if strategy == "random":
+        return RandomShotSelector(boardDimensions, shipsAfloat)
+    raise ValueError("Invalid strategy: %s" % strategy)
@@ -1,13 +1,28 @@
 import random
-import heapq
 import logging
 from collections import namedtuple
+from zobrist import STATES
+from zobrist import stateKeys
+from zobrist import fleetKey
+from zobrist import fleetHash
+from metrics import metrics
+from sink_solver import SinkSolver
 
 """Stores x and y values of the enemy board positions."""
 Coordinates = namedtuple('Coordinates', 'x y')
 """Stores information about a sinking ship, the shot that caused it to start sinking and its size."""
 SinkingShip = namedtuple('SinkingShip', 'bullsEye size')
 
+"""The random module, as a generator a selector can hold on to.  Copies of a selector share it rather than copying it."""
+class ModuleRandom:
+    def __getattr__(self, name):
+        return getattr(random, name)
+
+    def __deepcopy__(self, memo):
+        return self
+
+moduleRandom = ModuleRandom()
+
 """OPEN - no information is known, open for shot selection
 HIT - shot hit a ship
 BULLSEYE - shot sunk a ship
@@ -30,11 +45,16 @@ class Direction:
     West = Coordinates(0, -1)
     
 """Selects the next shot to take at the enemy.  This class needs to be overridden, child classes will
-implement specific strategies.
+implement specific strategies.  A Zobrist hash of the enemy board and the ships afloat is kept up to date in boardHash
+as shot results come in.
+
+Random choices are made with rng, the random module unless the selector is given a generator of its own.
 
 Public interface
 selectShot()
 shotResult(shot, hit, sunk)
+useRandom(rng)
+close()
 
 """
 class ShotSelector:        
@@ -48,10 +68,14 @@ class ShotSelector:
         self.enemyBoard = [[BoardState.OPEN for j in range(boardDimensions)] for i in range(boardDimensions)]
         self.boardDimensions = boardDimensions
         self.shipsAfloat = shipsAfloat
+        self.boardHash = fleetHash(shipsAfloat)
+        self.rng = moduleRandom
         
     def printShipsAfloat(self):
         """For debugging purposes, prints the remaining ships afloat.
         """
+        if not logging.getLogger().isEnabledFor(logging.DEBUG):
+            return
         logging.debug("ships afloat")
         sb = []
         for size in self.shipsAfloat:
@@ -65,6 +89,8 @@ class ShotSelector:
     def printBoard(self):
         """For debugging purposes, prints the board.
         """
+        if not logging.getLogger().isEnabledFor(logging.DEBUG):
+            return
         logging.debug("enemy board")
         for i in range(self.boardDimensions):
             sb = []
@@ -81,6 +107,14 @@ class ShotSelector:
         """
         raise NotImplementedError("Subclass needs to implement this")
     
+    def useRandom(self, rng):
+        """Makes random choices with rng, a random.Random, from now on rather than the random module."""
+        self.rng = rng
+
+    def close(self):
+        """Releases anything the selector holds on to once the game is over, there's nothing to release by default."""
+        pass
+
     def shotResult(self, shot, hit, sunk):
         """Updates internal state given the results of a shot.
         
@@ -93,19 +127,41 @@ class ShotSelector:
         coordinates = self.mapToCoordinates(shot)
         # If a ship was sunk, remove it from the fleet.
         if sunk:
-            sunk = str(sunk)
-            assert(self.shipsAfloat[sunk] > 0)
-            self.shipsAfloat[sunk] -= 1
-            # Remove any counts that went to 0.
-            if self.shipsAfloat[sunk] == 0:
-                del(self.shipsAfloat[sunk])
-            self.enemyBoard[coordinates.x][coordinates.y] = BoardState.BULLSEYE
+            self.removeFromFleet(str(sunk))
+            self.setState(coordinates, BoardState.BULLSEYE)
         else:
             if hit:
-                self.enemyBoard[coordinates.x][coordinates.y] = BoardState.HIT
+                self.setState(coordinates, BoardState.HIT)
             else:
-                self.enemyBoard[coordinates.x][coordinates.y] = BoardState.MISS
-    
+                self.setState(coordinates, BoardState.MISS)
+
+    def removeFromFleet(self, size):
+        """Removes a sunk ship from the ships afloat.
+
+        Arguments
+        size - Size of the sunk ship.
+        """
+        assert(self.shipsAfloat[size] > 0)
+        self.boardHash ^= fleetKey(size, self.shipsAfloat[size]) ^ fleetKey(size, self.shipsAfloat[size] - 1)
+        self.shipsAfloat[size] -= 1
+        # Remove any counts that went to 0.
+        if self.shipsAfloat[size] == 0:
+            del(self.shipsAfloat[size])
+
+    def setState(self, coordinates, state):
+        """Sets the state of a set of coordinates on the enemy board.  Child classes that keep their own
+        representation of the board override this to keep it in step with the enemy board.
+
+        Arguments
+        coordinates - The coordinates to set.
+        state - The new BoardState of the coordinates.
+        """
+        keys = stateKeys(self.boardDimensions)
+        cell = (coordinates.x * self.boardDimensions + coordinates.y) * STATES
+        previousState = min(self.enemyBoard[coordinates.x][coordinates.y], BoardState.OPEN)
+        self.boardHash ^= keys[cell - previousState] ^ keys[cell - state]
+        self.enemyBoard[coordinates.x][coordinates.y] = state
+
     def mapToCoordinates(self, shot):
         """Maps a shot to x and y coordinates."""
         toks = shot.split("-")
@@ -126,7 +182,7 @@ class RandomShotSelector(ShotSelector):
         """ 
         ShotSelector.__init__(self, boardDimensions, shipsAfloat)
         self.remainingCoordinates = [Coordinates(i, j) for i in range(self.boardDimensions) for j in range(self.boardDimensions)]
-        random.shuffle(self.remainingCoordinates)
+        self.rng.shuffle(self.remainingCoordinates)
 
     def selectShot(self):
         """Picks a random coordinate from the coordinates remaining and returns it."""
@@ -141,10 +197,13 @@ class RandomShotSelector(ShotSelector):
 Shots are selected by weighting the board with all remaining enemy ships in all possible positions and picking the highest 
 weighted coordinates.  The more "ways" an enemy ship can be positioned over particular coordinates, the higher the weight 
 of the coordinates.  Ship positions that overlay previously hit coordinates are given extra weight.  When a ship is sinking, 
-all possible ways that a ship of that size can be sunk are tried.  If only one way is found, the ships coordinates are marked
-as SUNK to preclude them in subsequent shot selections.  If there is more than one way a sinking ship can be sunk, the coordinates are 
-left as-is with the hope being that the next sinking ship will provide enough information to sink this ship.  Think of it like
-dominoes toppling. 
+all possible ways that the sinking ships can be sunk together are tried.  A ship that can only be sunk one way has its
+coordinates marked as SUNK to preclude them in subsequent shot selections, as do hits that are part of a sunk ship whichever
+way the ships are sunk.  The rest of the coordinates are left as-is with the hope being that the next sinking ship will provide
+enough information to sink this ship.  Think of it like dominoes toppling. 
+
+The weights only depend on the enemy board and the ships afloat, so with a weight cache the best coordinates are kept
+by board hash and boards that come up again, in this game or another, aren't weighted again.
 """
 class MappingShotSelector(ShotSelector):
     def __init__(self, boardDimensions, shipsAfloat):
@@ -156,13 +215,24 @@ class MappingShotSelector(ShotSelector):
         """
         ShotSelector.__init__(self, boardDimensions, shipsAfloat)
         self.shipsToSink = []
+        # Hits marked as SUNK whose sinking ship isn't known yet.
+        self.sinkingCells = set()
+        # Coordinates the sinking ships cover in some way of sinking them.
+        self.sinkCoverage = set()
+        # The number of shots taken, and the shot each set of coordinates was first hit by.
+        self.shots = 0
+        self.hitTimes = {}
+        # BoundedCache of the best coordinates of weighted boards, None to weight every board.
+        self.weightCache = None
         
     def printShipsToSink(self):
         """For debugging purposes, prints the ships that are sinking.
         """
+        if not logging.getLogger().isEnabledFor(logging.DEBUG):
+            return
         sb = []
         for sinkingShip in self.shipsToSink:
-            shot = self.mapToShot(sinkingShip.bullseye)
+            shot = self.mapToShot(sinkingShip.bullsEye)
             sb.append(str(shot))
             sb.append(":")
             sb.append(str(sinkingShip.size))
@@ -175,19 +245,56 @@ class MappingShotSelector(ShotSelector):
         Returns 
         A shot of the form LetterNumber.
         """
-        self.weightBoard()
-        self.printBoard()
-        bestCoordinates = self.selectBestCoordinates()
+        if self.weightCache is None:
+            self.timeWeightBoard()
+            self.printBoard()
+            with metrics.timer("selector.selectBestCoordinates"):
+                bestCoordinates = self.selectBestCoordinates()
+        else:
+            # Engines share caches, each one keeps its own entries so they're timed weighting their own boards.
+            key = (type(self), self.boardDimensions, self.boardHash)
+            candidates = self.weightCache.get(key)
+            if candidates is None:
+                self.timeWeightBoard()
+                self.printBoard()
+                candidates = self.selectBestCandidates()
+                self.weightCache.put(key, candidates, 64 * len(candidates))
+            bestCoordinates = self.rng.choice(candidates) if candidates else self.selectOpenCoordinates()
         shot = self.mapToShot(bestCoordinates)
         logging.debug("select shot: %s" % (shot))
         return shot
 
+    def timeWeightBoard(self):
+        """ Weights the board, recording how long it took and how many coordinates were weighted if metrics are enabled.
+        Engines only weight the board, the number of coordinates weighted is logged here for all of them.
+        """
+        if not metrics.enabled:
+            self.weightBoard()
+        else:
+            with metrics.timer("selector.weightBoard"):
+                self.weightBoard()
+            metrics.count("selector.cellsWeighted", self.weightedCells())
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("weighted %d coordinates" % (self.weightedCells()))
+
+    def weightedCells(self):
+        """Returns the number of coordinates given weight by the last weightBoard."""
+        return sum(1 for row in self.enemyBoard for weight in row if weight > BoardState.OPEN)
+
+    def boardPlacements(self):
+        """Returns the number of positions the ships afloat fit in on the board, the placements an engine that weights
+        every position along the rows and columns tests."""
+        boardDimensions = self.boardDimensions
+        return sum(2 * boardDimensions * (boardDimensions - int(size) + 1) for size in self.shipsAfloat
+                   if int(size) <= boardDimensions)
+
     def weightBoard(self):
         """ Weights the board by placing all remaining ships in all possible positions.  The
         more ways a ship can be placed over a particular set of coordinates, the higher the weight.
         Positions that overlay previous hits are given extra weight.
         """
         directions = (Direction.East, Direction.South)
+        metrics.count("selector.placementsTested", len(directions) * self.boardDimensions ** 2 * len(self.shipsAfloat))
         for size, count in self.shipsAfloat.items():
             size = int(size)
             for i in range(self.boardDimensions):
@@ -203,67 +310,131 @@ class MappingShotSelector(ShotSelector):
         self.weightShipSearch(coordinates, size, weight, direction, 0)
         
     def weightShipSearch(self, coordinates, size, weight, direction, hitWeight):
-        """ Recursive function that positions a ship in a particular direction and applies
-        the weights.
+        """ Positions a ship in a particular direction and applies the weights.  The states under the ship
+        are gathered first to check the ship fits and add up the hits it overlays, then the coordinates
+        are weighted, so ships of any size can be placed.
         
         Arguments
-        coordinates - The coordinate to check.
+        coordinates - The coordinates to start placing the ship at.
         size - The size of the ship.
-        weight - The weight to apply if this coordinate can hold a ship.
+        weight - The weight to apply if the ship can be placed.
         direction - The direction to move as the ship is being placed.
         hitWeight - The extra amount of weight to add if the ship overlays previously hit
         coordinates.
         
         Returns
         result - True if the ship can be placed, False if it can't.
-        hitWeight - The extra hit weight to apply as the recursive stack unwinds.
+        hitWeight - The extra hit weight applied to the ship's coordinates.
         """
         if size == 0:
             # Successfully searched the required size.
-            return True, hitWeight        
-        if coordinates.x < 0 or coordinates.y < 0 or coordinates.x == self.boardDimensions or coordinates.y == self.boardDimensions:
+            return True, hitWeight
+        x, y = coordinates
+        dx, dy = direction
+        endX = x + dx * (size - 1)
+        endY = y + dy * (size - 1)
+        boardDimensions = self.boardDimensions
+        if not (0 <= x < boardDimensions and 0 <= y < boardDimensions and 0 <= endX < boardDimensions and 0 <= endY < boardDimensions):
             # Can't go off the board.
             return False, 0
-        if self.enemyBoard[coordinates.x][coordinates.y] < BoardState.HIT:
+        enemyBoard = self.enemyBoard
+        if enemyBoard[x][y] < BoardState.HIT:
+            # Late in the game most positions start on blocked coordinates, don't bother gathering their states.
+            return False, 0
+        if direction == Direction.East:
+            row = enemyBoard[x]
+            states = row[y:endY + 1]
+        else:
+            states = [enemyBoard[x + k * dx][y + k * dy] for k in range(size)]
+        if min(states) < BoardState.HIT:
             # This search is all for naught since we can't possibly have a ship at this position.
             return False, 0
-        if self.enemyBoard[coordinates.x][coordinates.y] == BoardState.HIT:
-            # Weigh searches with hits already in them over searches without them.  This is to 
-            # direct the shot selection toward coordinates with hits already near them.
-            hitWeight += 10
-        # Move to the next set of coordinates on the board.
-        result, hitWeight = self.weightShipSearch(Coordinates(coordinates.x + direction.x, coordinates.y + direction.y),
-                                                  size - 1, weight, direction, hitWeight)
-        if result:
-            # A entire ship can fit, weight the coordinate appropriately.
-            if self.enemyBoard[coordinates.x][coordinates.y] >= BoardState.OPEN:
-                self.enemyBoard[coordinates.x][coordinates.y] += (weight + hitWeight)
-        return result, hitWeight
+        # Weigh searches with hits already in them over searches without them.  This is to 
+        # direct the shot selection toward coordinates with hits already near them.
+        hitWeight += 10 * states.count(BoardState.HIT)
+        # A entire ship can fit, weight the coordinates appropriately.
+        weight += hitWeight
+        if direction == Direction.East:
+            for j in range(y, endY + 1):
+                if row[j] >= BoardState.OPEN:
+                    row[j] += weight
+        else:
+            for k in range(size):
+                row = enemyBoard[x + k * dx]
+                if row[y + k * dy] >= BoardState.OPEN:
+                    row[y + k * dy] += weight
+        return True, hitWeight
     
     def selectBestCoordinates(self):
-        """ Puts all of the weighted coordinates in a priority queue and selects the coordinate with the most weight.
+        """ Selects the coordinates with the most weight in a single pass over the board.
         
         Return
         bestCoordinates - The highest weighted coordinates.
         """
-        coordinatesQueue = []
         # It's highly likely that there are going to be a lot of coordinates with the same "most" weight.  Rather
-        # than always choosing the leftmost coordinates, make a random choice by adding a random tie breaker to the 
-        # priority.  
-        randomTieBreaker = [i for i in range(self.boardDimensions ** 2 )]
-        random.shuffle(randomTieBreaker)
-        for i in range(self.boardDimensions):
-            for j in range(self.boardDimensions):
-                if self.enemyBoard[i][j] > BoardState.OPEN:
-                    heapq.heappush(coordinatesQueue, (-self.enemyBoard[i][j], randomTieBreaker.pop(), Coordinates(i, j)))
-        bestCoordinates = heapq.heappop(coordinatesQueue)[-1]
-        self.enemyBoard[bestCoordinates.x][bestCoordinates.y] = BoardState.OPEN
-        while len(coordinatesQueue) > 0:
-            coordinates = heapq.heappop(coordinatesQueue)[-1]
-            # Reset the weights on all coordinates under consideration so they'll be ready for another round of 
-            # weighting.
-            self.enemyBoard[coordinates.x][coordinates.y] = BoardState.OPEN
+        # than always choosing the leftmost coordinates, make a uniformly random choice among them by reservoir sampling:
+        # a row with count of the ties replaces the current choice with probability count / (ties seen so far).
+        bestWeight = BoardState.OPEN
+        ties = 0
+        bestCoordinates = None
+        for i, row in enumerate(self.enemyBoard):
+            weight = max(row)
+            if weight > BoardState.OPEN and weight >= bestWeight:
+                count = row.count(weight)
+                if weight > bestWeight:
+                    bestWeight = weight
+                    ties = 0
+                ties += count
+                if self.rng.randrange(ties) < count:
+                    bestCoordinates = Coordinates(i, self.selectIndex(row, weight, count))
+            # Reset the weights on the row so they'll be ready for another round of weighting.
+            row[:] = [min(value, BoardState.OPEN) for value in row]
+        if bestCoordinates is None:
+            return self.selectOpenCoordinates()
         return bestCoordinates
+
+    def selectBestCandidates(self):
+        """ Selects every set of coordinates with the most weight and resets the weights.
+
+        Return
+        The highest weighted coordinates, empty if none of the coordinates have any weight.
+        """
+        bestWeight = max(max(row) for row in self.enemyBoard)
+        candidates = []
+        for i, row in enumerate(self.enemyBoard):
+            if bestWeight > BoardState.OPEN:
+                candidates.extend(Coordinates(i, j) for j, weight in enumerate(row) if weight == bestWeight)
+            row[:] = [min(value, BoardState.OPEN) for value in row]
+        return tuple(candidates)
+
+    def selectOpenCoordinates(self):
+        """ Selects open coordinates at random.  Used when no ship fits anywhere on the board, which only happens
+        when a sinking ship was sunk in the wrong position and the coordinates of a ship afloat were marked as SUNK.
+        
+        Return
+        The selected coordinates.
+        """
+        openCoordinates = [Coordinates(i, j) for i in range(self.boardDimensions) for j in range(self.boardDimensions)
+                           if self.enemyBoard[i][j] == BoardState.OPEN]
+        if not openCoordinates:
+            raise IndexError("no open coordinates to select")
+        return self.rng.choice(openCoordinates)
+
+    def selectIndex(self, weights, weight, count):
+        """ Selects one of the indexes of weight uniformly at random.
+
+        Arguments
+        weights - The weights to select from.
+        weight - The weight to select.
+        count - The number of times weight appears in weights.
+
+        Returns
+        The selected index.
+        """
+        index = -1
+        for k in range(self.rng.randrange(count) + 1):
+            index = weights.index(weight, index + 1)
+        return index
     
     def shotResult(self, shot, hit, sunk):
         """Attempts to sink as many sinking ships as possible given the shot result.
@@ -275,6 +446,9 @@ class MappingShotSelector(ShotSelector):
         """
         ShotSelector.shotResult(self, shot, hit, sunk)
         coordinates = self.mapToCoordinates(shot)
+        self.shots += 1
+        if hit or sunk:
+            self.hitTimes.setdefault(coordinates, self.shots)
         if sunk:
             self.shipsToSink.append(SinkingShip(coordinates, sunk))
             self.sinkShips()
@@ -282,85 +456,72 @@ class MappingShotSelector(ShotSelector):
         self.printShipsToSink()
             
     def sinkShips(self):
-        """Attempts to sink all sinking ships by positioning them in all possible positions .  
-        If there's not enough information to sink them, the board remains as-is.  For every ship that's sunk
-        marks all of its coordinates as SUNK to prevent them from being used in subsequent shot selections.
-        """
-        while True:
-            stillSinkingShips = False
-            for i in range(len(self.shipsToSink) - 1, -1, -1):
-                sunkShip, shipCoordinates = self.positionAndSinkShip(self.shipsToSink[i])
-                if sunkShip:
-                    stillSinkingShips = True
-                    for coordinates in shipCoordinates:
-                        self.enemyBoard[coordinates.x][coordinates.y] = BoardState.SUNK
-                    del(self.shipsToSink[i])
-            if not stillSinkingShips:
-                break
-                
-    def positionAndSinkShip(self, sinkingShip):
-        """Positions a sinking ship in all possible positions and tries to sink it.  
-        
-        Arguments 
-        sinkingShip The ship to position.
-        
-        Returns 
-        sunkShip - True if the ship was sunk, False if not.
-        shipCoorindates - Only valid if the ship was sunk, the coordinates of the sunk ship.
-        """
-        directions = [Direction.North, Direction.South, Direction.East, Direction.West]
-        sunkShip = False
-        shipCoordinates = None
-        for direction in directions:
-            tSunkShip, tShipCoordinates = self.sinkShip(sinkingShip.bullsEye, sinkingShip.size, direction)
-            if tSunkShip:
-                if sunkShip:
-                    return False, None
-                else:
-                    sunkShip = tSunkShip
-                    shipCoordinates = tShipCoordinates
-        return sunkShip, shipCoordinates
-            
-    def sinkShip(self, bullsEye, size, direction):
-        """Skips over the BULLSEYE before placing the sinking ship as the BULLSEYE will cause early search termination.
-        
-        Arguments
-        bullsEye - The coordinates of the shot that caused the ship to start sinking.
-        size - The size of the ship.
-        direction - The direction to move as the ship is being placed.
-    
-        Returns
-        sunkShip - True if the ship was sunk, False if not.
-        shipCoorindates - Only valid if the ship was sunk, the coordinates of the sunk ship.
+        """Works out where the sinking ships sunk, all of them together since they can't overlap.  A ship that's
+        in the same position in every way of placing the sinking ships is sunk and its coordinates are marked as
+        SUNK.  Hits that are part of a sunk ship in every way of placing them are marked as SUNK too, even though
+        which ship they're part of isn't known yet, so they stop drawing weight.  Hits that aren't part of any
+        sunk ship in any way of placing them are left for the ships afloat, see afloatHits.
         """
-        sunkShip, shipCoordinates = self.sinkShipSearch(Coordinates(bullsEye.x + direction.x, bullsEye.y + direction.y), size - 1, direction)
-        if sunkShip:
-            shipCoordinates.append(bullsEye)
-        return sunkShip, shipCoordinates
-    
-    def sinkShipSearch(self, coordinates, size, direction):
-        """ Recursive function that positions a sinking ship in a particular direction to see if can be sunk.
+        placements = [self.sinkPlacements(sinkingShip) for sinkingShip in self.shipsToSink]
+        solver = SinkSolver(placements)
+        if not solver.solvable():
+            logging.warning("the sinking ships can't be placed on the board")
+            return
+        possible = solver.possiblePlacements()
+        self.sinkCoverage = set()
+        for i in range(len(self.shipsToSink) - 1, -1, -1):
+            if len(possible[i]) == 1:
+                for coordinates in placements[i][possible[i][0]]:
+                    self.setState(coordinates, BoardState.SUNK)
+                    self.sinkingCells.discard(coordinates)
+                del(self.shipsToSink[i])
+            else:
+                for index in possible[i]:
+                    self.sinkCoverage.update(placements[i][index])
+        for coordinates in sorted(self.sinkCoverage):
+            if self.enemyBoard[coordinates.x][coordinates.y] == BoardState.HIT and solver.forced(coordinates):
+                self.setState(coordinates, BoardState.SUNK)
+                self.sinkingCells.add(coordinates)
+
+    def sinkPlacements(self, sinkingShip):
+        """Returns every position a sinking ship could have sunk in.  The ship covers its bullseye, anywhere along
+        its length, and coordinates that were hit before the bullseye and aren't part of a ship that's already sunk.
 
         Arguments
-        bullsEye - The coordinates of the shot that caused the ship to start sinking.
-        size - The size of the ship.
-        direction - The direction to move as the ship is being placed.
-        
+        sinkingShip - The ship to position.
+
         Returns
-        sunkShip - True if the ship was sunk, False if not.
-        shipCoorindates - Only valid if the ship was sunk, the coordinates of the sunk ship.
+        The coordinates of the ship in each position.
         """
-        if size == 0:
-            # Successfully searched the required size.
-            return True, []
-        if coordinates.x < 0 or coordinates.y < 0 or coordinates.x == self.boardDimensions or coordinates.y == self.boardDimensions:
-            # Can't go off the board.
-            return False, None
-        if self.enemyBoard[coordinates.x][coordinates.y] != BoardState.HIT:
-            # This search is all for naught since the ship can't possibly have sunk at this position.
-            return False, None
-        sunkShip, shipCoordinates = self.sinkShipSearch(Coordinates(coordinates.x + direction.x, coordinates.y + direction.y), size - 1, direction)
-        if sunkShip:
-            shipCoordinates.append(coordinates)
-        return sunkShip, shipCoordinates
+        bullsEye, size = sinkingShip
+        sinkTime = self.hitTimes.get(bullsEye)
+
+        def sinkable(x, y):
+            if x < 0 or y < 0 or x == self.boardDimensions or y == self.boardDimensions:
+                return False
+            coordinates = Coordinates(x, y)
+            if self.enemyBoard[x][y] != BoardState.HIT and coordinates not in self.sinkingCells:
+                return False
+            # Hits after the bullseye came after the ship sunk.
+            return sinkTime is None or self.hitTimes.get(coordinates, 0) < sinkTime
+
+        placements = []
+        for dx, dy in (Direction.South, Direction.East):
+            back = 0
+            while back < size - 1 and sinkable(bullsEye.x - (back + 1) * dx, bullsEye.y - (back + 1) * dy):
+                back += 1
+            forward = 0
+            while forward < size - 1 and sinkable(bullsEye.x + (forward + 1) * dx, bullsEye.y + (forward + 1) * dy):
+                forward += 1
+            for start in range(-back, forward - size + 2):
+                placements.append(tuple(Coordinates(bullsEye.x + (start + k) * dx, bullsEye.y + (start + k) * dy)
+                                        for k in range(size)))
+            if size == 1:
+                # Both directions are the same position.
+                break
+        return placements
 
+    def afloatHits(self):
+        """Returns the hits that aren't part of a sunk ship in any way of placing the sinking ships."""
+        return [Coordinates(i, j) for i in range(self.boardDimensions) for j in range(self.boardDimensions)
+                if self.enemyBoard[i][j] == BoardState.HIT and Coordinates(i, j) not in self.sinkCoverage]
@@ -0,0 +1,64 @@
+"""Works out where sinking ships can be, all of them at once.  Every sinking ship has a list of the placements it
+could be in and the ships can't overlap, so a placement is only possible if the other ships can still be placed
+around it, and a set of coordinates is only sure to be part of a sunk ship if the ships can't all be placed without
+covering it.  Both questions come down to whether the ships can be placed clear of a set of coordinates, which is
+answered with a backtracking search that places the ship with the fewest placements left first and remembers the
+answer for every set of ships and coordinates it has seen.
+
+Public interface
+SinkSolver
+solvable()
+possiblePlacements()
+forced(cell)
+"""
+class SinkSolver:
+    def __init__(self, placements):
+        """Constructor.
+
+        Arguments
+        placements - For each ship, the placements it could be in, each a sequence of the cells it covers.
+        """
+        self.placements = [[frozenset(placement) for placement in shipPlacements] for shipPlacements in placements]
+        self.ships = tuple(range(len(placements)))
+        self.memo = {}
+
+    def solvable(self, ships = None, used = frozenset()):
+        """Returns True if the ships can all be placed without overlapping each other or any used cells.
+
+        Arguments
+        ships - The ships to place, by default all of them.
+        used - Cells none of the ships can cover.
+        """
+        if ships is None:
+            ships = self.ships
+        if not ships:
+            return True
+        key = (ships, used)
+        if key in self.memo:
+            return self.memo[key]
+        # The ship with the fewest placements left has the fewest branches to try, if it has none there's no need
+        # to try any.
+        fewest = None
+        for ship in ships:
+            free = [cells for cells in self.placements[ship] if used.isdisjoint(cells)]
+            if fewest is None or len(free) < len(fewest[1]):
+                fewest = (ship, free)
+                if not free:
+                    break
+        ship, free = fewest
+        others = tuple(other for other in ships if other != ship)
+        result = any(self.solvable(others, used | cells) for cells in free)
+        self.memo[key] = result
+        return result
+
+    def possiblePlacements(self):
+        """Returns, for each ship, the indexes of the placements it's in in some way of placing all the ships."""
+        possible = []
+        for ship in self.ships:
+            others = tuple(other for other in self.ships if other != ship)
+            possible.append([index for index, cells in enumerate(self.placements[ship]) if self.solvable(others, cells)])
+        return possible
+
+    def forced(self, cell):
+        """Returns True if every way of placing the ships covers cell."""
+        return not self.solvable(self.ships, frozenset((cell,)))
@@ -0,0 +1,123 @@
+import copy
+import random
+import logging
+from concurrent.futures import wait
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+
+"""Selects the next shot in the background while waiting for the enemy to take their turn.  The enemy's shots
+don't change what's known about their board, so the shot selected as soon as the result of my last shot is known
+is the same one that would be selected once it's my turn again.  Wraps any ShotSelector.
+
+With branches the next shot is also selected while the current shot is being fired, once for a hit and once for a
+miss, each on a copy of the selector.  The copies are made in the background too, so firing the shot isn't held
+up by them.  When the result comes back the copy for the branch that happened takes over, its next shot is already
+selected or on its way.  A shot that sinks a ship is handled without speculation, as sinking ships changes too much.
+Each copy makes its random choices with its own generator, seeded from the selector's, so the branches don't take
+turns at the random module in whatever order their threads run and seeded games play the same every time.
+
+Public interface
+selectShot()
+shotResult(shot, hit, sunk)
+close()
+"""
+class SpeculativeShotSelector:
+    def __init__(self, shotSelector, branches = False):
+        """Constructor.
+
+        Arguments
+        shotSelector - Shot selector to select the shots.
+        branches - Also select the next shot for both results of the shot being fired.
+        """
+        self.shotSelector = shotSelector
+        self.branches = branches
+        self.executor = ThreadPoolExecutor(3 if branches else 1)
+        # The next shot, being selected in the background.
+        self.nextShot = None
+        # Futures of the copies of the selector for each result of the shot being fired, keyed by whether it was a hit.
+        self.pendingShot = None
+        self.branchSelectors = {}
+        self.branchShots = {}
+
+    def __getattr__(self, name):
+        # Anything else, like the enemy board, comes from the selector making the selections.
+        if name == "shotSelector":
+            raise AttributeError(name)
+        return getattr(self.shotSelector, name)
+
+    def selectShot(self):
+        """Returns the next shot, waiting for it if it's still being selected in the background.
+
+        Returns
+        A shot of the form LetterNumber.
+        """
+        if self.nextShot is None:
+            shot = self.shotSelector.selectShot()
+        else:
+            shot = self.nextShot.result()
+            self.nextShot = None
+        if self.branches:
+            self.selectBranches(shot)
+        return shot
+
+    def selectBranches(self, shot):
+        """Starts copying the selector and selecting the shot after shot for a hit and for a miss."""
+        self.pendingShot = shot
+        self.branchSelectors = {}
+        self.branchShots = {}
+        for hit in (True, False):
+            seed = self.shotSelector.rng.getrandbits(64)
+            self.branchSelectors[hit] = Future()
+            self.branchShots[hit] = self.executor.submit(self.selectBranch, self.shotSelector, self.branchSelectors[hit],
+                                                         shot, hit, seed)
+
+    def selectBranch(self, shotSelector, branchSelector, shot, hit, seed):
+        """Copies shotSelector, updates the copy with the result of shot and selects its next shot.
+
+        Arguments
+        shotSelector - The selector to copy.
+        branchSelector - Future to set to the copy once it's up to date.
+        shot - Shot being fired.
+        hit - The result of the shot to speculate on.
+        seed - Seed of the copy's random number generator.
+
+        Returns
+        The copy's next shot.
+        """
+        try:
+            copied = copy.deepcopy(shotSelector)
+            copied.useRandom(random.Random(seed))
+            copied.shotResult(shot, hit, 0)
+        except BaseException as e:
+            branchSelector.set_exception(e)
+            raise
+        branchSelector.set_result(copied)
+        return copied.selectShot()
+
+    def shotResult(self, shot, hit, sunk):
+        """Updates the selector with the result of a shot and starts selecting the next one.
+
+        Arguments
+        shot - Shot of the form LetterNumber.
+        hit - True, if the shot was a hit.
+        sunk - Size of the sunk ship, if the shot sunk it.
+        """
+        if shot == self.pendingShot and not sunk:
+            logging.debug("speculated %s for shot: %s" % ("hit" if hit else "miss", shot))
+            self.shotSelector = self.branchSelectors[bool(hit)].result()
+            self.nextShot = self.branchShots[bool(hit)]
+        else:
+            # The branches copy the selector, let them finish before changing it.
+            wait(self.branchSelectors.values())
+            self.shotSelector.shotResult(shot, hit, sunk)
+            self.nextShot = self.executor.submit(self.shotSelector.selectShot)
+        self.pendingShot = None
+        self.branchSelectors = {}
+        self.branchShots = {}
+
+    def close(self):
+        """Stops selecting shots in the background, waiting for any selection that's already running so it doesn't
+        go on using the selector, or the random module, after the game, then closes the selector.
+        """
+        self.executor.shutdown(wait = True, cancel_futures = True)
+        self.shotSelector.close()
@@ -0,0 +1,314 @@
+import os
+import weakref
+import multiprocessing
+from collections import OrderedDict
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from shot_selector import BoardState
+from shot_selector import Coordinates
+from shot_selector import MappingShotSelector
+from flat_shot_selector import FlatMappingShotSelector
+from metrics import metrics
+
+"""Large board mode.  The states of the enemy board are kept in a shared memory buffer, one byte per set of
+coordinates, and the board is split into square tiles that are weighted in parallel by a pool of worker processes.
+Workers attach to the buffer by name and read the states in place, nothing but the tile bounds and the ships afloat
+are sent to them.  Each tile is read with a halo as wide as the largest ship afloat, less one, around it so every
+position of a ship covering the tile is seen, and only the weights of the tile itself are kept.  Workers send back
+the best weight of their tile and the coordinates that have it, which are merged into the best coordinates of the
+board.  The weights, and so the shots selected, are the same as FlatMappingShotSelector's.
+
+Each selector has its own pool, started the first time a board is weighted and stopped when the selector is closed.
+Workers are started with a fresh interpreter rather than forked, so it's safe to start a pool from a threaded process.
+A process that's a pool worker itself can't start one, selectors built there weight in the same process by default.
+
+Public interface
+TiledMappingShotSelector
+close()
+
+TilePool
+defaultWorkers()
+weightTile(states, boardDimensions, tile, ships)
+tilePlacements(boardDimensions, tile, ships)
+"""
+
+"""Default number of rows and columns of a tile."""
+TILE_SIZE = 128
+
+def defaultWorkers():
+    """Returns the number of worker processes a selector has by default, one per core, or one, meaning none, in a
+    daemonic process like a pool worker, which can't have children.
+    """
+    return 1 if multiprocessing.current_process().daemon else os.cpu_count()
+
+"""Pool of tile weighting processes, started the first time it's used.  Copies of a selector share its pool."""
+class TilePool:
+    def __init__(self, workers):
+        """Constructor.
+
+        Arguments
+        workers - the number of worker processes.
+        """
+        self.workers = workers
+        self.pool = None
+
+    def map(self, function, tasks):
+        if self.pool is None:
+            # Workers have to share this process's resource tracker, one of their own would unlink the boards they
+            # attach to when they exit.
+            resource_tracker.ensure_running()
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self.pool = context.Pool(self.workers)
+        return self.pool.map(function, tasks)
+
+    def close(self):
+        """Stops the worker processes, if they were started."""
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            pool.close()
+            pool.join()
+
+    def __deepcopy__(self, memo):
+        return self
+
+"""Shared memory boards a worker has attached to, most recently used last."""
+attachedBoards = OrderedDict()
+
+"""Most boards a worker stays attached to, boards of games that are over are let go."""
+ATTACHED_BOARDS = 16
+
+def attachBoard(name):
+    """Returns the states of a shared memory board, attaching to it the first time it's asked for."""
+    if name in attachedBoards:
+        attachedBoards.move_to_end(name)
+        return attachedBoards[name][1]
+    sharedMemory = SharedMemory(name)
+    attachedBoards[name] = (sharedMemory, sharedMemory.buf.cast("b"))
+    if len(attachedBoards) > ATTACHED_BOARDS:
+        sharedMemory, states = attachedBoards.popitem(last = False)[1]
+        states.release()
+        sharedMemory.close()
+    return attachedBoards[name][1]
+
+def lineWeights(states, size, weight):
+    """Weights every position of a ship along a row or column, like FlatMappingShotSelector.weightLine, but adds up
+    the weight of the positions covering each set of coordinates with a running sum rather than position by position.
+
+    Arguments
+    states - The states along the row or column.
+    size - The size of the ship.
+    weight - The weight to apply to the open coordinates of every position the ship can be placed in.
+
+    Returns
+    The weight of each set of coordinates along the row or column.
+    """
+    length = len(states)
+    # Weight added where a position starts and taken off where it ends.
+    steps = [0] * (length + 1)
+    blocked = 0
+    hits = 0
+    for k, state in enumerate(states):
+        if state < BoardState.HIT:
+            blocked += 1
+        elif state == BoardState.HIT:
+            hits += 1
+        if k >= size:
+            state = states[k - size]
+            if state < BoardState.HIT:
+                blocked -= 1
+            elif state == BoardState.HIT:
+                hits -= 1
+        if k >= size - 1 and blocked == 0:
+            positionWeight = weight + 10 * hits
+            steps[k - size + 1] += positionWeight
+            steps[k + 1] -= positionWeight
+    weights = [0] * length
+    running = 0
+    for k, state in enumerate(states):
+        running += steps[k]
+        if state == BoardState.OPEN:
+            weights[k] = running
+    return weights
+
+def weightTile(states, boardDimensions, tile, ships):
+    """Weights the coordinates of a tile by placing the ships afloat in every position covering it.
+
+    Arguments
+    states - The states of the whole board, indexed by x * boardDimensions + y.
+    boardDimensions - dimensions of the (square) enemy board.
+    tile - The first row, the row past the last, the first column and the column past the last of the tile.
+    ships - The size and count of each ship afloat.
+
+    Returns
+    bestWeight - The most weight of any coordinates of the tile, 0 if none of them have any.
+    bestIndexes - The indexes of the coordinates with the most weight, in order.
+    weightedCells - The number of coordinates of the tile that have any weight.
+    """
+    top, bottom, left, right = tile
+    width = right - left
+    weights = [0] * ((bottom - top) * width)
+    for size, count in ships:
+        if size > boardDimensions:
+            continue
+        halo = size - 1
+        # Rows of the tile, from halo columns to the left of it to halo columns to the right of it.
+        start = max(left - halo, 0)
+        end = min(right + halo, boardDimensions)
+        for x in range(top, bottom):
+            rowWeights = lineWeights(states[x * boardDimensions + start:x * boardDimensions + end].tolist(), size, count)
+            base = (x - top) * width - left
+            for y in range(left, right):
+                weights[base + y] += rowWeights[y - start]
+        # Columns of the tile, from halo rows above it to halo rows below it.
+        start = max(top - halo, 0)
+        end = min(bottom + halo, boardDimensions)
+        for y in range(left, right):
+            columnWeights = lineWeights(states[start * boardDimensions + y:end * boardDimensions:boardDimensions].tolist(),
+                                        size, count)
+            for x in range(top, bottom):
+                weights[(x - top) * width + y - left] += columnWeights[x - start]
+    bestWeight = max(weights)
+    if bestWeight <= BoardState.OPEN:
+        return 0, [], 0
+    bestIndexes = [(top + k // width) * boardDimensions + left + k % width
+                   for k, weight in enumerate(weights) if weight == bestWeight]
+    return bestWeight, bestIndexes, len(weights) - weights.count(0)
+
+def tilePlacements(boardDimensions, tile, ships):
+    """Returns the number of ship positions weightTile tests for a tile, which includes the positions in its halo.
+
+    Arguments
+    boardDimensions - dimensions of the (square) enemy board.
+    tile - The first row, the row past the last, the first column and the column past the last of the tile.
+    ships - The size and count of each ship afloat.
+    """
+    top, bottom, left, right = tile
+    placements = 0
+    for size, count in ships:
+        if size > boardDimensions:
+            continue
+        halo = size - 1
+        columns = min(right + halo, boardDimensions) - max(left - halo, 0)
+        rows = min(bottom + halo, boardDimensions) - max(top - halo, 0)
+        placements += (bottom - top) * (columns - halo) + (right - left) * (rows - halo)
+    return placements
+
+def weightSharedTile(task):
+    name, boardDimensions, tile, ships = task
+    return weightTile(attachBoard(name), boardDimensions, tile, ships)
+
+def releaseBoard(sharedMemory, views):
+    # The memory can't be closed while there are views of it.
+    for view in views:
+        view.release()
+    sharedMemory.close()
+    sharedMemory.unlink()
+
+"""The states of the enemy board in shared memory, with the same interface as the states of a FlatBoard.  There are no
+weights, they're only ever kept per tile.  The shared memory is unlinked once the board is no longer used.
+"""
+class SharedBoard:
+    def __init__(self, boardDimensions):
+        """Builds an empty board.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        """
+        self.boardDimensions = boardDimensions
+        self.sharedMemory = SharedMemory(create = True, size = boardDimensions ** 2)
+        self.sharedMemory.buf[:] = bytes(boardDimensions ** 2)
+        self.name = self.sharedMemory.name
+        # BoardState of every set of coordinates, all OPEN to start with.
+        self.states = self.sharedMemory.buf.cast("b")
+        # Every view handed out, released along with the memory.
+        self.views = [self.states]
+        self.finalizer = weakref.finalize(self, releaseBoard, self.sharedMemory, self.views)
+
+    def rows(self):
+        """Returns a view of every row of the states, reading and writing a view reads and writes the states."""
+        rows = [self.states[i * self.boardDimensions:(i + 1) * self.boardDimensions] for i in range(self.boardDimensions)]
+        self.views.extend(rows)
+        return rows
+
+    def close(self):
+        self.finalizer()
+
+    def __deepcopy__(self, memo):
+        board = SharedBoard(self.boardDimensions)
+        board.states[:] = self.states
+        return board
+
+"""Implements the mapping strategy for large boards, weighting the board tile by tile on a pool of worker processes.
+With a single worker the tiles are weighted in this process, on the same shared board.
+"""
+class TiledMappingShotSelector(FlatMappingShotSelector):
+    def __init__(self, boardDimensions, shipsAfloat, workers = None, tileSize = TILE_SIZE):
+        """Builds the enemy board and keeps tracks of the remaining shots.
+
+        Arguments
+        boardDimensions - dimensions of the (square) enemy board.
+        shipsAfloat - the size and counts of the initial enemy fleet.
+        workers - the number of worker processes, by default defaultWorkers().
+        tileSize - the number of rows and columns of a tile.
+        """
+        # The flat board's weights would take 16 bytes per set of coordinates, don't build one.
+        MappingShotSelector.__init__(self, boardDimensions, shipsAfloat)
+        self.workers = defaultWorkers() if workers is None else workers
+        self.pool = TilePool(self.workers)
+        self.board = SharedBoard(boardDimensions)
+        self.enemyBoard = self.board.rows()
+        self.tiles = [(top, min(top + tileSize, boardDimensions), left, min(left + tileSize, boardDimensions))
+                      for top in range(0, boardDimensions, tileSize) for left in range(0, boardDimensions, tileSize)]
+        # The best weight, the coordinates with it and the number of weighted coordinates of each tile.
+        self.tileWeights = []
+
+    def close(self):
+        """Stops the worker processes and releases the shared memory board."""
+        self.pool.close()
+        self.enemyBoard = []
+        self.board.close()
+
+    def weightBoard(self):
+        """ Weights every tile of the board and keeps the best coordinates of each.
+        """
+        ships = tuple((int(size), count) for size, count in self.shipsAfloat.items())
+        if metrics.enabled:
+            metrics.count("selector.placementsTested",
+                          sum(tilePlacements(self.boardDimensions, tile, ships) for tile in self.tiles))
+        if self.workers == 1 or len(self.tiles) == 1:
+            self.tileWeights = [weightTile(self.board.states, self.boardDimensions, tile, ships) for tile in self.tiles]
+        else:
+            tasks = [(self.board.name, self.boardDimensions, tile, ships) for tile in self.tiles]
+            self.tileWeights = self.pool.map(weightSharedTile, tasks)
+
+    def bestIndexes(self):
+        """Merges the best coordinates of the tiles.
+
+        Returns
+        The indexes of the coordinates with the most weight on the board, in order, empty if none have any weight.
+        """
+        bestWeight = max(weight for weight, indexes, weightedCells in self.tileWeights)
+        if bestWeight <= BoardState.OPEN:
+            return []
+        return sorted(index for weight, indexes, weightedCells in self.tileWeights if weight == bestWeight
+                      for index in indexes)
+
+    def selectBestCoordinates(self):
+        """ Selects the coordinates with the most weight, ties are broken randomly.
+
+        Return
+        bestCoordinates - The highest weighted coordinates.
+        """
+        bestIndexes = self.bestIndexes()
+        if not bestIndexes:
+            return self.selectOpenCoordinates()
+        # The same choice selectIndex makes over the whole board.
+        bestIndex = bestIndexes[self.rng.randrange(len(bestIndexes))]
+        return Coordinates(bestIndex // self.boardDimensions, bestIndex % self.boardDimensions)
+
+    def selectBestCandidates(self):
+        return tuple(Coordinates(index // self.boardDimensions, index % self.boardDimensions) for index in self.bestIndexes())
+
+    def weightedCells(self):
+        return sum(weightedCells for weight, indexes, weightedCells in self.tileWeights)
@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import multiprocessing
+from collections import Counter
+from histogram import Histogram
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from selector_factory import createShotSelector
+from bounded_cache import weightCache
+
+"""Plays shot selection strategies against each other over many headless games.  Every game places a random fleet
+and each strategy shoots at the same board until the whole fleet is sunk, so the strategies are compared on the same
+boards.  Games are spread over a process pool, every worker builds its own selectors and boards.  Results of each game
+are streamed to disk as they come in and only the distributions are kept in memory.  Games are seeded from the
+tournament seed and the game number so a run can be reproduced with any number of workers.
+
+Public interface
+main(argv)
+playHeadlessGame(shotSelector, board)
+"""
+
+def parseStrategy(spec):
+    """Splits a strategy of the form strategy[:engine] into the strategy and the engine."""
+    strategy, _, engine = spec.partition(":")
+    return strategy, engine or "python"
+
+def playHeadlessGame(shotSelector, board):
+    """Fires shots at a board until every ship on it is sunk.
+
+    Arguments
+    shotSelector - Shot selector to select the shots.
+    board - LocalBoard to fire at.
+
+    Returns
+    shots - The number of shots it took.
+    selectTimes - Histogram of the number of seconds each shot took to select.
+    """
+    selectTimes = Histogram()
+    shots = 0
+    while not board.allSunk():
+        startTime = time.perf_counter()
+        shot = shotSelector.selectShot()
+        selectTimes.add(time.perf_counter() - startTime)
+        hit, sunk = board.fire(shot)
+        shotSelector.shotResult(shot, hit, sunk)
+        shots += 1
+    return shots, selectTimes
+
+"""Settings of the tournament, set in every worker when the pool starts."""
+settings = {}
+
+def setup(boardDimensions, fleet, strategies, seed, weightCacheBudget):
+    settings.update(boardDimensions = boardDimensions, fleet = fleet, strategies = strategies, seed = seed,
+                    weightCacheBudget = weightCacheBudget)
+
+def playGame(game):
+    """Plays one game with every strategy.
+
+    Arguments
+    game - The number of the game.
+
+    Returns
+    The results of each strategy.
+    """
+    gameSeed = "%s-%d" % (settings["seed"], game)
+    board = randomBoard(settings["boardDimensions"], settings["fleet"], random.Random(gameSeed))
+    results = []
+    for spec in settings["strategies"]:
+        # Selectors break ties with the random module, seed it so the game can be replayed.
+        random.seed(gameSeed + spec)
+        strategy, engine = parseStrategy(spec)
+        # Games are already spread over the workers, the tiled engine weights in the same process.
+        shotSelector = createShotSelector(strategy, engine, settings["boardDimensions"], Counter(settings["fleet"]),
+                                          workers = 1)
+        cache = None
+        if settings["weightCacheBudget"] is not None and strategy == "mapping":
+            # Every worker has its own cache, shared by the games it plays.
+            cache = weightCache(settings["weightCacheBudget"])
+            hits, misses = cache.hits, cache.misses
+            shotSelector.weightCache = cache
+        shots, selectTimes = playHeadlessGame(shotSelector, LocalBoard(board))
+        shotSelector.close()
+        result = {"game" : game, "strategy" : spec, "shots" : shots, "selectSeconds" : selectTimes.total,
+                  "selectTimes" : selectTimes}
+        if cache is not None:
+            result.update(cacheHits = cache.hits - hits, cacheMisses = cache.misses - misses)
+        results.append(result)
+    return results
+
+def runTournament(boardDimensions, fleet, strategies, games, workers, seed, output = None, weightCacheBudget = None):
+    """Plays the tournament.
+
+    Arguments
+    boardDimensions - dimensions of the (square) boards.
+    fleet - the size and counts of the fleet placed on every board.
+    strategies - the strategies to play, of the form strategy[:engine].
+    games - the number of games to play.
+    workers - the number of worker processes, 1 plays every game in this process.
+    seed - seed the games are generated from.
+    output - file to write the results of each game to as json lines, None not to write them.
+    weightCacheBudget - megabytes of weighted boards the mapping strategy keeps in each worker, None not to keep any.
+
+    Returns
+    The shots to win and per-shot selection time histograms of each strategy, and the weight cache hits and misses
+    of the strategies that used it.
+    """
+    shotHistograms = dict((spec, Histogram(None)) for spec in strategies)
+    timeHistograms = dict((spec, Histogram()) for spec in strategies)
+    cacheCounts = dict((spec, Counter()) for spec in strategies)
+    arguments = (boardDimensions, dict(fleet), list(strategies), seed, weightCacheBudget)
+    if workers == 1:
+        setup(*arguments)
+        pool = None
+        gameResults = map(playGame, range(games))
+    else:
+        pool = multiprocessing.Pool(workers, setup, arguments)
+        # Large chunks keep the cost of handing out games low, but not so large that the workers finish unevenly.
+        gameResults = pool.imap_unordered(playGame, range(games), chunksize = max(1, games // (workers * 16)))
+    try:
+        for results in gameResults:
+            for result in results:
+                shotHistograms[result["strategy"]].add(result["shots"])
+                timeHistograms[result["strategy"]].merge(result.pop("selectTimes"))
+                if "cacheHits" in result:
+                    cacheCounts[result["strategy"]].update(hits = result["cacheHits"], misses = result["cacheMisses"])
+                if output is not None:
+                    output.write(json.dumps(result) + "\n")
+    finally:
+        if pool is not None:
+            pool.terminate()
+    summary = dict((spec, {"shots" : shotHistograms[spec].toDict(), "selectSeconds" : timeHistograms[spec].toDict()})
+                   for spec in strategies)
+    for spec in strategies:
+        if cacheCounts[spec]:
+            summary[spec]["weightCache"] = {"hits" : cacheCounts[spec]["hits"], "misses" : cacheCounts[spec]["misses"]}
+    return summary
+
+def main(argv = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = argparse.ArgumentParser(description = "plays shot selection strategies against each other")
+    parser.add_argument("fleet", help = "json file containing the number and size of the fleet of ships")
+    parser.add_argument("--dimensions", type = int, default = 10, help = "dimensions of the (square) boards (default is 10)")
+    parser.add_argument("--games", type = int, default = 1000, help = "number of games to play (default is 1000)")
+    parser.add_argument("--strategies", nargs = "+", default = ["random", "mapping"],
+                        help = "strategies to play, of the form strategy[:engine] (default is random mapping)")
+    parser.add_argument("--workers", type = int, default = os.cpu_count(),
+                        help = "number of worker processes (default is the number of cores)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed the games are generated from (default is 0)")
+    parser.add_argument("--output", help = "json lines file to stream the result of each game to")
+    parser.add_argument("--summary", help = "json file to write the summary to")
+    parser.add_argument("--weightcache", type = int,
+                        help = "megabytes of weighted boards the mapping strategy keeps in each worker (default is not to keep any)")
+    try:
+        args = parser.parse_args(argv)
+        fleet = json.load(open(args.fleet))["fleet"]
+        output = open(args.output, "w") if args.output else None
+        startTime = time.perf_counter()
+        try:
+            summary = runTournament(args.dimensions, fleet, args.strategies, args.games, args.workers, args.seed, output,
+                                    args.weightcache)
+        finally:
+            if output is not None:
+                output.close()
+        print("%d games in %.1f seconds" % (args.games, time.perf_counter() - startTime))
+        for spec, stats in summary.items():
+            shots = stats["shots"]
+            selectSeconds = stats["selectSeconds"]
+            print("%-20s shots mean %.2f stdev %.2f min %d p50 %d p90 %d max %d, select ms mean %.3f p50 %.3f p99 %.3f" %
+                  (spec, shots["mean"], shots["stdev"], shots["min"], shots["p50"], shots["p90"], shots["max"],
+                   selectSeconds["mean"] * 1000, selectSeconds["p50"] * 1000, selectSeconds["p99"] * 1000))
+            if "weightCache" in stats:
+                print("%-20s weight cache hits %d misses %d" % (spec, stats["weightCache"]["hits"], stats["weightCache"]["misses"]))
+        if args.summary:
+            with open(args.summary, "w") as summaryFile:
+                json.dump(summary, summaryFile, indent = 2)
+    except SystemExit:
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
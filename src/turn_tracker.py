@@ -0,0 +1,47 @@
+"""Works out whose turn it is from the result of my last shot, so status polls whose answer is already known can be
+skipped.  What a shot says about the next turn depends on the rules the server plays by:
+alternate - players always take turns, after firing it's the enemy's turn.
+hitagain - a player that hits fires again, after a hit it's still my turn, after a miss it's the enemy's.
+unknown - nothing is assumed, every turn is polled for.
+Whatever the rules, the game may be over once the last ship afloat is sunk, so that's always polled for.
+
+Public interface
+fired(hit, sunk, shipsAfloat)
+polled()
+knownTurn
+"""
+
+"""Rules the tracker knows how to follow."""
+TURN_RULES = ["alternate", "hitagain", "unknown"]
+
+class TurnTracker:
+    def __init__(self, rules = "unknown"):
+        """Constructor.
+
+        Arguments
+        rules - the turn rules the server plays by, one of TURN_RULES.
+        """
+        if rules not in TURN_RULES:
+            raise ValueError("Invalid turn rules: %s" % rules)
+        self.rules = rules
+        # True if it's known to be my turn, False if it's known to be the enemy's, None if it has to be polled for.
+        self.knownTurn = None
+
+    def fired(self, hit, sunk, shipsAfloat):
+        """Works out whose turn it is after firing a shot.
+
+        Arguments
+        hit - True, if the shot was a hit.
+        sunk - Size of the sunk ship, if the shot sunk it.
+        shipsAfloat - True if the enemy has ships afloat after the shot.
+        """
+        if self.rules == "unknown" or not shipsAfloat:
+            self.knownTurn = None
+        elif self.rules == "hitagain" and hit:
+            self.knownTurn = True
+        else:
+            self.knownTurn = False
+
+    def polled(self):
+        """Forgets whose turn it is, the status of the game was polled and is the one to go by."""
+        self.knownTurn = None
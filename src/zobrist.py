@@ -0,0 +1,46 @@
+import random
+
+"""Zobrist hashing of enemy boards.  Every state of every set of coordinates, and every count of every ship size, has
+a random 64 bit key, and a board hashes to the XOR of the keys of its states and of the ships afloat.  Changing a state
+or a count only takes two XORs to update the hash.  OPEN coordinates and no ships of a size have a key of 0, so an
+empty board hashes to the keys of its fleet.  Keys are generated from fixed seeds so every selector in every process
+hashes the same board the same way.
+
+Public interface
+stateKeys(boardDimensions)
+fleetKey(size, count)
+fleetHash(shipsAfloat)
+"""
+
+"""Number of states a set of coordinates can be in, BoardState.OPEN to BoardState.MISS."""
+STATES = 5
+
+"""Cached state keys, keyed by board dimensions."""
+stateKeyTables = {}
+"""Cached fleet keys, keyed by size and count."""
+fleetKeys = {}
+
+def stateKeys(boardDimensions):
+    """Returns the state keys of a board, the key of state at flat index cell is at cell * STATES - state."""
+    if boardDimensions not in stateKeyTables:
+        rng = random.Random("zobrist-%d" % boardDimensions)
+        keys = [rng.getrandbits(64) for i in range(boardDimensions ** 2 * STATES)]
+        for cell in range(boardDimensions ** 2):
+            keys[cell * STATES] = 0
+        stateKeyTables[boardDimensions] = keys
+    return stateKeyTables[boardDimensions]
+
+def fleetKey(size, count):
+    """Returns the key of count ships of a size afloat."""
+    if count == 0:
+        return 0
+    if (size, count) not in fleetKeys:
+        fleetKeys[(size, count)] = random.Random("zobrist-fleet-%s-%d" % (size, count)).getrandbits(64)
+    return fleetKeys[(size, count)]
+
+def fleetHash(shipsAfloat):
+    """Returns the hash of the ships afloat."""
+    boardHash = 0
+    for size, count in shipsAfloat.items():
+        boardHash ^= fleetKey(str(size), count)
+    return boardHash
@@ -0,0 +1,192 @@
+import os
+import sys
+import copy
+import json
+import time
+import random
+import argparse
+import platform
+from collections import Counter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"))
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from selector_factory import MAPPING_ENGINES
+from shot_selector import BoardState
+from shot_selector import Coordinates
+from shot_selector import MappingShotSelector
+
+"""Times the shot selector hot paths: weightBoard, selectBestCoordinates, sinkShips and a whole selectShot/shotResult
+cycle, for every mapping engine on boards of increasing size.  Boards are timed empty, in the middle of a game and at
+the end of a game, with the shots taken so far fired at random at a seeded random fleet.
+
+Results are written as json so runs can be compared, --compare reports the ratio of every timing to a previous run and
+fails if any got slower than the threshold.
+
+python ./test/benchmark/benchmark_shot_selector.py --output bench.json
+python ./test/benchmark/benchmark_shot_selector.py --compare bench.json
+
+The recursive engine is the mapping strategy with the recursive placement search it used to have, kept as a reference
+for the iterative search that replaced it.
+"""
+
+"""MappingShotSelector with the recursive placement search, one level of recursion per ship coordinates."""
+class RecursiveMappingShotSelector(MappingShotSelector):
+    def weightShipSearch(self, coordinates, size, weight, direction, hitWeight):
+        if size == 0:
+            return True, hitWeight
+        if coordinates.x < 0 or coordinates.y < 0 or coordinates.x == self.boardDimensions or coordinates.y == self.boardDimensions:
+            return False, 0
+        if self.enemyBoard[coordinates.x][coordinates.y] < BoardState.HIT:
+            return False, 0
+        if self.enemyBoard[coordinates.x][coordinates.y] == BoardState.HIT:
+            hitWeight += 10
+        result, hitWeight = self.weightShipSearch(Coordinates(coordinates.x + direction.x, coordinates.y + direction.y),
+                                                  size - 1, weight, direction, hitWeight)
+        if result:
+            if self.enemyBoard[coordinates.x][coordinates.y] >= BoardState.OPEN:
+                self.enemyBoard[coordinates.x][coordinates.y] += (weight + hitWeight)
+        return result, hitWeight
+
+"""Engines to benchmark, the mapping engines and the recursive reference."""
+ENGINES = dict(MAPPING_ENGINES, recursive = RecursiveMappingShotSelector)
+
+"""Fraction of the board that has been shot in each board state."""
+BOARD_STATES = {"empty" : 0.0, "mid-game" : 0.3, "end-game" : 0.7}
+
+def buildSelector(engine, boardDimensions, fleet, shotFraction, seed):
+    """Builds a selector and fires shotFraction of the board at random at a random fleet.
+
+    Returns
+    shotSelector - The selector.
+    board - LocalBoard the shots were fired at.
+    """
+    rng = random.Random(seed)
+    board = LocalBoard(randomBoard(boardDimensions, fleet, rng))
+    shotSelector = ENGINES[engine](boardDimensions, Counter(fleet))
+    cells = [(i, j) for i in range(boardDimensions) for j in range(boardDimensions)]
+    rng.shuffle(cells)
+    for i, j in cells[:int(shotFraction * len(cells))]:
+        shot = shotSelector.mapToShot(Coordinates(i, j))
+        hit, sunk = board.fire(shot)
+        if board.allSunk():
+            # Keep at least one ship afloat so there's something left to select.
+            break
+        shotSelector.shotResult(shot, hit, sunk)
+    return shotSelector, board
+
+def timeCalls(call, prepare, minTime, maxRepetitions):
+    """Times a call until it has run for at least minTime seconds.
+
+    Arguments
+    call - Function to time, passed the result of prepare.
+    prepare - Function that's called before every call to set up its argument, not timed.
+    minTime - Minimum total number of seconds to time the call for.
+    maxRepetitions - Maximum number of times to make the call.
+
+    Returns
+    seconds - The median number of seconds a call took.
+    repetitions - The number of calls timed.
+    """
+    times = []
+    while len(times) < maxRepetitions and sum(times) < minTime:
+        argument = prepare()
+        startTime = time.perf_counter()
+        call(argument)
+        times.append(time.perf_counter() - startTime)
+    times.sort()
+    return times[len(times) // 2], len(times)
+
+def benchmark(engine, boardDimensions, fleet, state, minTime, maxRepetitions, seed):
+    """Times the hot paths of an engine on one board.
+
+    Returns
+    The seconds per call of each operation.
+    """
+    shotSelector, board = buildSelector(engine, boardDimensions, fleet, BOARD_STATES[state], seed)
+    results = {}
+    copySelector = lambda: copy.deepcopy(shotSelector)
+    results["weightBoard"] = timeCalls(lambda selector: selector.weightBoard(), copySelector, minTime, maxRepetitions)
+
+    def weightedSelector():
+        selector = copySelector()
+        selector.weightBoard()
+        return selector
+    results["selectBestCoordinates"] = timeCalls(lambda selector: selector.selectBestCoordinates(), weightedSelector,
+                                                 minTime, maxRepetitions)
+    results["sinkShips"] = timeCalls(lambda selector: selector.sinkShips(), copySelector, minTime, maxRepetitions)
+
+    def shotCycle(selectorAndBoard):
+        selector, enemyBoard = selectorAndBoard
+        shot = selector.selectShot()
+        hit, sunk = enemyBoard.fire(shot)
+        selector.shotResult(shot, hit, sunk)
+    # Every cycle takes the next shot of the same game, not the shot after the last cycle's.
+    results["shotCycle"] = timeCalls(shotCycle, lambda: copy.deepcopy((shotSelector, board)), minTime, maxRepetitions)
+    return results
+
+def compare(results, baseline, threshold):
+    """Prints the ratio of every timing to the baseline.
+
+    Returns
+    True if none of the timings are slower than the baseline by more than threshold.
+    """
+    baselineSeconds = dict(((result["engine"], result["size"], result["state"], result["operation"]), result["seconds"])
+                           for result in baseline["results"])
+    passed = True
+    for result in results:
+        key = (result["engine"], result["size"], result["state"], result["operation"])
+        if key in baselineSeconds and baselineSeconds[key] > 0:
+            ratio = result["seconds"] / baselineSeconds[key]
+            regressed = ratio > threshold
+            passed = passed and not regressed
+            print("%-12s %4d %-9s %-22s %6.2fx%s" % (key + (ratio, " REGRESSION" if regressed else "")))
+    return passed
+
+def main(argv = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = argparse.ArgumentParser(description = "benchmarks the shot selector hot paths")
+    parser.add_argument("--fleet", default = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "fleet.json"),
+                        help = "json file containing the number and size of the fleet of ships")
+    parser.add_argument("--engines", nargs = "+", choices = sorted(ENGINES), default = sorted(ENGINES),
+                        help = "mapping engines to benchmark (default is all of them)")
+    parser.add_argument("--sizes", nargs = "+", type = int, default = [10, 25, 50, 100, 200, 300],
+                        help = "board dimensions to benchmark")
+    parser.add_argument("--states", nargs = "+", choices = sorted(BOARD_STATES), default = ["empty", "mid-game", "end-game"],
+                        help = "board states to benchmark")
+    parser.add_argument("--min-time", type = float, default = 0.2, help = "minimum seconds to time each operation for")
+    parser.add_argument("--max-repetitions", type = int, default = 50, help = "maximum times to time each operation")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed the boards are generated from")
+    parser.add_argument("--output", help = "json file to write the results to")
+    parser.add_argument("--compare", help = "json file of a previous run to compare the results to")
+    parser.add_argument("--threshold", type = float, default = 1.25,
+                        help = "ratio to the previous run above which a timing is a regression (default is 1.25)")
+    try:
+        args = parser.parse_args(argv)
+        fleet = json.load(open(args.fleet))["fleet"]
+        results = []
+        for size in args.sizes:
+            for state in args.states:
+                for engine in args.engines:
+                    try:
+                        timings = benchmark(engine, size, fleet, state, args.min_time, args.max_repetitions, args.seed)
+                    except ImportError as e:
+                        print("skipping %s: %s" % (engine, e))
+                        continue
+                    for operation, (seconds, repetitions) in sorted(timings.items()):
+                        results.append({"engine" : engine, "size" : size, "state" : state, "operation" : operation,
+                                        "seconds" : seconds, "repetitions" : repetitions})
+                        print("%-12s %4d %-9s %-22s %12.6f s" % (engine, size, state, operation, seconds))
+        report = {"python" : platform.python_version(), "machine" : platform.machine(), "fleet" : fleet, "results" : results}
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(report, output, indent = 2)
+        if args.compare:
+            if not compare(results, json.load(open(args.compare)), args.threshold):
+                return 1
+        return 0
+    except SystemExit:
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+import os
+import json
+import tempfile
+import unittest
+from benchmark_shot_selector import main
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_main(self):
+        # At the end of a game there are fewer open coordinates left than shot cycles timed.
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "bench.json")
+            args = ["--engines", "python", "flat", "--sizes", "10", "--min-time", "1", "--max-repetitions", "50",
+                    "--output", output]
+            assert(main(args) == 0)
+            report = json.load(open(output))
+            assert(len(report["results"]) == 2 * 3 * 4)
+            for result in report["results"]:
+                assert(result["repetitions"] == 50)
+            assert(main(args[:-2] + ["--compare", output, "--threshold", "1000"]) == 0)
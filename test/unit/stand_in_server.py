@@ -0,0 +1,126 @@
+import json
+import time
+import socket
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+from http.server import HTTPServer
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from local_command_driver import LocalGameServer
+
+"""Local stand-in for the gameplay server used by the tests.  Games are played on a LocalGameServer and the
+server counts the connections it accepts and the requests it gets for each command, in total and by player.
+Status polls with a wait argument are held until it's the player's turn.  The server can be told to drop
+connections, either between requests or instead of answering a request it has carried out.
+
+Public interface
+StandInServer
+start()
+stop()
+"""
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.standIn.count("connections")
+        self.requests = 0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = dict((key, values[0]) for key, values in parse_qs(url.query).items())
+        self.runCommand(url.path, query)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.runCommand(urlparse(self.path).path, json.loads(body.decode("UTF-8")))
+
+    def runCommand(self, path, arguments):
+        standIn = self.server.standIn
+        standIn.count(path)
+        standIn.count((path, arguments["player"]))
+        games = standIn.games
+        with standIn.lock:
+            drop = standIn.dropResponse == path
+            if drop:
+                standIn.dropResponse = None
+            if path == "/games/start":
+                response = {"game_id" : games.start(arguments["player"], arguments["board"])}
+            elif path == "/games/join":
+                response = {"game_id" : games.join(arguments["player"], int(arguments["game_id"]), arguments["board"])}
+                standIn.lock.notify_all()
+            elif path == "/games/status":
+                deadline = time.monotonic() + float(arguments.get("wait", 0))
+                while True:
+                    state, myTurn = games.status(arguments["player"], int(arguments["game_id"]))
+                    remaining = deadline - time.monotonic()
+                    if myTurn or state == "won" or state == "lost" or remaining <= 0:
+                        break
+                    standIn.lock.wait(remaining)
+                response = {"state" : state, "my_turn" : myTurn}
+            else:
+                hit, sunk = games.fire(arguments["player"], int(arguments["game_id"]), arguments["shot"])
+                response = {"hit" : hit, "sunk" : sunk}
+                standIn.lock.notify_all()
+        if drop:
+            # Carried out, but the client never finds out.
+            self.close_connection = True
+            return
+        body = json.dumps(response).encode("UTF-8")
+        self.requests += 1
+        if standIn.closeAfter is not None and self.requests >= standIn.closeAfter:
+            # Send the whole response in one write so it goes out with the end of the connection, before the client
+            # can send another request on it, then drop the connection without telling the client, like a server
+            # timing out an idle connection.
+            self.wfile.write(("%s 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n" %
+                              (self.protocol_version, len(body))).encode("ISO-8859-1") + body)
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_WR)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class StandInServer:
+    def __init__(self, closeAfter = None, games = None):
+        """Constructor.
+
+        Arguments
+        closeAfter - number of requests after which the server drops a connection, None to keep it open.
+        games - LocalGameServer to play the games on, by default a new one.
+        """
+        self.closeAfter = closeAfter
+        # Path of the next request to carry out and drop the connection instead of answering.
+        self.dropResponse = None
+        self.games = LocalGameServer() if games is None else games
+        self.counts = Counter()
+        self.lock = threading.Condition()
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def start(self):
+        """Starts serving on a free local port and returns the port."""
+        self.httpServer = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        self.httpServer.standIn = self
+        self.thread = threading.Thread(target = self.httpServer.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self.httpServer.server_address[1]
+
+    def stop(self):
+        self.httpServer.shutdown()
+        self.httpServer.server_close()
@@ -0,0 +1,85 @@
+import json
+import os
+import asyncio
+import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from async_command_driver import AsyncHttpCommandDriver
+from async_player import AsyncPlayer
+from async_player import playGames
+from shot_selector import RandomShotSelector
+from shot_selector import MappingShotSelector
+from stand_in_server import StandInServer
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+def loadBoard(name):
+    return json.load(open(os.path.join(DATA, name)))["board"]
+
+class AsyncPlayerTestCase(unittest.TestCase):
+    async def playConcurrentGames(self, port, games, executor):
+        fleet = json.load(open(os.path.join(DATA, "fleet.json")))["fleet"]
+        players = []
+        for i in range(games):
+            starter = AsyncPlayer(loadBoard("player_1_board.json"), AsyncHttpCommandDriver("127.0.0.1", port, "one"),
+                                  MappingShotSelector(10, Counter(fleet)), 0.001, executor)
+            joiner = AsyncPlayer(loadBoard("player_2_board.json"), AsyncHttpCommandDriver("127.0.0.1", port, "two"),
+                                 RandomShotSelector(10, Counter(fleet)), 0.001)
+            await joiner.join(await starter.start())
+            players.extend((starter, joiner))
+        gameStates = await playGames(players)
+        for player in players:
+            await player.commandDriver.close()
+        return gameStates
+
+    def test_playGames(self):
+        server = StandInServer()
+        port = server.start()
+        executor = ThreadPoolExecutor(2)
+        try:
+            gameStates = asyncio.run(self.playConcurrentGames(port, 10, executor))
+            for i in range(0, len(gameStates), 2):
+                assert(sorted(gameStates[i:i + 2]) == ["lost", "won"])
+            # Each driver keeps its connection open for the whole game.
+            assert(server.counts["connections"] == 20)
+        finally:
+            executor.shutdown()
+            server.stop()
+
+    def test_reconnect(self):
+        server = StandInServer(closeAfter = 5)
+        port = server.start()
+        try:
+            gameStates = asyncio.run(self.playConcurrentGames(port, 2, None))
+            assert(sorted(gameStates) == ["lost", "lost", "won", "won"])
+        finally:
+            server.stop()
+
+    async def dropResponses(self, server, port):
+        player1 = AsyncHttpCommandDriver("127.0.0.1", port, "one")
+        player2 = AsyncHttpCommandDriver("127.0.0.1", port, "two")
+        gameId = await player1.start(loadBoard("player_1_board.json"))
+        await player2.join(loadBoard("player_2_board.json"), gameId)
+        # A status poll is sent again.
+        server.dropResponse = "/games/status"
+        assert(await player1.status(gameId) == ("playing", True))
+        assert(server.counts["/games/status"] == 2)
+        # A shot the server fired isn't fired again.
+        server.dropResponse = "/games/fire"
+        with self.assertRaises((ConnectionError, asyncio.IncompleteReadError)):
+            await player1.fire(gameId, "A-1")
+        assert(server.counts["/games/fire"] == 1)
+        # The next command goes out on a new connection.
+        assert(await player2.status(gameId) == ("playing", True))
+        await player2.fire(gameId, "A-1")
+        assert(server.counts["/games/fire"] == 2)
+        await player1.close()
+        await player2.close()
+
+    def test_droppedResponse(self):
+        server = StandInServer()
+        port = server.start()
+        try:
+            asyncio.run(self.dropResponses(server, port))
+        finally:
+            server.stop()
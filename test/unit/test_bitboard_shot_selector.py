@@ -0,0 +1,74 @@
+import random
+import unittest
+from bitboard_shot_selector import BitboardMappingShotSelector
+from bitboard_shot_selector import BitBoard
+from shot_selector import MappingShotSelector
+from shot_selector import Coordinates
+from shot_selector import SinkingShip
+from shot_selector import BoardState
+from collections import Counter
+
+class BitboardMappingTestCase(unittest.TestCase):
+    def test_fits(self):
+        bitBoard = BitBoard(3)
+        bitBoard.setState(Coordinates(1, 1), BoardState.MISS)
+        # East: two positions on the top and bottom rows, none through the middle.
+        assert(bitBoard.fits(2, 1) == 0b011000011)
+        # South: two positions on the left and right columns.
+        assert(bitBoard.fits(2, 3) == 0b000101101)
+        bitBoard.setState(Coordinates(1, 1), BoardState.OPEN)
+        assert(bitBoard.fits(3, 1) == 0b001001001)
+
+    def test_weightBoard(self):
+        fleet = Counter({"2" : 1})
+        bss = BitboardMappingShotSelector(3, fleet)
+        bss.weightBoard()
+        assert(bss.weights == [2, 3, 2, 3, 4, 3, 2, 3, 2])
+        bss = BitboardMappingShotSelector(3, fleet)
+        bss.setState(Coordinates(1, 1), BoardState.HIT)
+        bss.weightBoard()
+        assert(bss.weights == [2, 13, 2, 13, 0, 13, 2, 13, 2])
+        coordinates = bss.selectBestCoordinates()
+        assert(coordinates in (Coordinates(0, 1), Coordinates(1, 0), Coordinates(1, 2), Coordinates(2, 1)))
+        assert(bss.weights == [0] * 9)
+
+    def test_matchesMappingShotSelector(self):
+        states = [BoardState.OPEN] * 6 + [BoardState.HIT, BoardState.BULLSEYE, BoardState.SUNK, BoardState.MISS]
+        rng = random.Random(1)
+        for i in range(20):
+            fleet = Counter({"2" : 1, "3" : 2, "4" : 1, "5" : 1})
+            mss = MappingShotSelector(10, Counter(fleet))
+            bss = BitboardMappingShotSelector(10, Counter(fleet))
+            for x in range(10):
+                for y in range(10):
+                    state = rng.choice(states)
+                    mss.enemyBoard[x][y] = state
+                    bss.setState(Coordinates(x, y), state)
+            mss.weightBoard()
+            bss.weightBoard()
+            for x in range(10):
+                for y in range(10):
+                    expected = mss.enemyBoard[x][y] if mss.enemyBoard[x][y] > BoardState.OPEN else 0
+                    assert(bss.weights[x * 10 + y] == expected)
+
+    def testSinkShips(self):
+        fleet = Counter({"2" : 1, "3" : 1})
+        bss = BitboardMappingShotSelector(3, fleet)
+        bss.shipsToSink.append(SinkingShip(Coordinates(0, 0), 3))
+        bss.shipsToSink.append(SinkingShip(Coordinates(2, 1), 2))
+        # Add two ships that can't be sunk yet.
+        for coordinates in (Coordinates(0, 1), Coordinates(0, 2), Coordinates(1, 0), Coordinates(2, 0), Coordinates(2, 2)):
+            bss.setState(coordinates, BoardState.HIT)
+        bss.setState(Coordinates(0, 0), BoardState.BULLSEYE)
+        bss.setState(Coordinates(2, 1), BoardState.BULLSEYE)
+        bss.sinkShips()
+        assert(len(bss.shipsToSink) == 2)
+        # Add another ship that will cause all three ships to be sunk.
+        bss.shipsToSink.append(SinkingShip(Coordinates(0, 2), 2))
+        bss.setState(Coordinates(0, 2), BoardState.BULLSEYE)
+        bss.sinkShips()
+        assert(len(bss.shipsToSink) == 0)
+        assert(bss.bitBoard.hit == 0)
+        assert(bss.bitBoard.open == 0b000110000)
+        for x, y in ((0, 0), (0, 1), (0, 2), (1, 0), (2, 0), (2, 1), (2, 2)):
+            assert(bss.enemyBoard[x][y] == BoardState.SUNK)
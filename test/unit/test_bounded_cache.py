@@ -0,0 +1,79 @@
+import random
+import unittest
+from collections import Counter
+from bounded_cache import BoundedCache
+from bounded_cache import ENTRY_BYTES
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from shot_selector import MappingShotSelector
+from bitboard_shot_selector import BitboardMappingShotSelector
+from tournament import playHeadlessGame
+from zobrist import STATES
+from zobrist import stateKeys
+from zobrist import fleetHash
+
+FLEET = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+
+class BoundedCacheTestCase(unittest.TestCase):
+    def boardHash(self, shotSelector):
+        """Hashes the board from scratch."""
+        keys = stateKeys(shotSelector.boardDimensions)
+        boardHash = fleetHash(shotSelector.shipsAfloat)
+        for i, row in enumerate(shotSelector.enemyBoard):
+            for j, state in enumerate(row):
+                boardHash ^= keys[(i * shotSelector.boardDimensions + j) * STATES - min(state, 0)]
+        return boardHash
+
+    def test_boardHash(self):
+        random.seed(0)
+        board = LocalBoard(randomBoard(10, FLEET, random.Random(0)))
+        shotSelector = MappingShotSelector(10, Counter(FLEET))
+        emptyHash = shotSelector.boardHash
+        shots = []
+        while not board.allSunk():
+            shot = shotSelector.selectShot()
+            hit, sunk = board.fire(shot)
+            shotSelector.shotResult(shot, hit, sunk)
+            shots.append((shot, hit, sunk))
+            assert(shotSelector.boardHash == self.boardHash(shotSelector))
+        assert(shotSelector.boardHash != emptyHash)
+        # The same misses in a different order hash the same.
+        misses = [shot for shot, hit, sunk in shots if not hit]
+        shotSelector = MappingShotSelector(10, Counter(FLEET))
+        otherSelector = MappingShotSelector(10, Counter(FLEET))
+        for shot in misses:
+            shotSelector.shotResult(shot, False, 0)
+        for shot in reversed(misses):
+            otherSelector.shotResult(shot, False, 0)
+        assert(shotSelector.boardHash == otherSelector.boardHash)
+
+    def test_weightCache(self):
+        cache = BoundedCache(2 ** 20)
+        for engine in (MappingShotSelector, BitboardMappingShotSelector):
+            playerBoard = randomBoard(10, FLEET, random.Random(1))
+            random.seed(2)
+            shotSelector = engine(10, Counter(FLEET))
+            shotSelector.weightCache = cache
+            startMisses = cache.misses
+            shots, selectTimes = playHeadlessGame(shotSelector, LocalBoard(playerBoard))
+            misses = cache.misses
+            # Boards weighted by another engine aren't reused.
+            assert(misses > startMisses)
+            # The same game again finds every board in the cache.
+            random.seed(2)
+            shotSelector = engine(10, Counter(FLEET))
+            shotSelector.weightCache = cache
+            assert(playHeadlessGame(shotSelector, LocalBoard(playerBoard))[0] == shots)
+            assert(cache.misses == misses)
+        assert(cache.hits >= shots)
+
+    def test_put(self):
+        cache = BoundedCache(2 * ENTRY_BYTES + 100)
+        cache.put("a", 1, 50)
+        cache.put("b", 2, 50)
+        assert(cache.get("a") == 1)
+        cache.put("c", 3, 50)
+        # b was used least recently.
+        assert(cache.get("b") is None)
+        assert(cache.get("a") == 1 and cache.get("c") == 3)
+        assert(cache.hits == 3 and cache.misses == 1)
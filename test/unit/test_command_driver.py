@@ -0,0 +1,95 @@
+import json
+import os
+import unittest
+from http.client import HTTPException
+from command_driver import HttpCommandDriver
+from command_driver import HttpConnectionPool
+from stand_in_server import StandInServer
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+def loadBoard(name):
+    return json.load(open(os.path.join(DATA, name)))["board"]
+
+class HttpCommandDriverTestCase(unittest.TestCase):
+    def play(self, server, player1, player2):
+        """Starts a game and fires a few shots from each player."""
+        gameId = player1.start(loadBoard("player_1_board.json"))
+        player2.join(loadBoard("player_2_board.json"), gameId)
+        assert(player1.status(gameId) == ("playing", True))
+        assert(player1.fire(gameId, "A-1") == (False, 0))
+        assert(player2.status(gameId) == ("playing", True))
+        assert(player2.fire(gameId, "D-2") == (True, 0))
+        for i in range(5):
+            assert(player1.status(gameId) == ("playing", True))
+            player1.fire(gameId, "B-%d" % (i + 1))
+            assert(player2.status(gameId) == ("playing", True))
+            player2.fire(gameId, "C-%d" % (i + 1))
+        return gameId
+
+    def test_keepAlive(self):
+        server = StandInServer()
+        port = server.start()
+        try:
+            player1 = HttpCommandDriver("127.0.0.1", port, "one")
+            player2 = HttpCommandDriver("127.0.0.1", port, "two")
+            self.play(server, player1, player2)
+            assert(server.counts["/games/fire"] == 12)
+            # One connection for each driver no matter how many commands it sends.
+            assert(server.counts["connections"] == 2)
+            player1.close()
+            player2.close()
+        finally:
+            server.stop()
+
+    def test_sharedPool(self):
+        server = StandInServer()
+        port = server.start()
+        try:
+            pool = HttpConnectionPool("127.0.0.1", port)
+            self.play(server, HttpCommandDriver("127.0.0.1", port, "one", pool),
+                      HttpCommandDriver("127.0.0.1", port, "two", pool))
+            # The drivers take turns so they share a single connection.
+            assert(server.counts["connections"] == 1)
+            pool.close()
+        finally:
+            server.stop()
+
+    def test_reconnect(self):
+        server = StandInServer(closeAfter = 3)
+        port = server.start()
+        try:
+            player1 = HttpCommandDriver("127.0.0.1", port, "one")
+            player2 = HttpCommandDriver("127.0.0.1", port, "two")
+            self.play(server, player1, player2)
+            # Every command still went through exactly once, on a new connection every 3 commands.
+            assert(server.counts["/games/fire"] == 12)
+            assert(server.counts["/games/status"] == 12)
+            assert(server.counts["connections"] == 10)
+        finally:
+            server.stop()
+
+    def test_droppedResponse(self):
+        server = StandInServer()
+        port = server.start()
+        try:
+            player1 = HttpCommandDriver("127.0.0.1", port, "one")
+            player2 = HttpCommandDriver("127.0.0.1", port, "two")
+            gameId = self.play(server, player1, player2)
+            # A status poll is sent again.
+            server.dropResponse = "/games/status"
+            assert(player1.status(gameId) == ("playing", True))
+            assert(server.counts["/games/status"] == 14)
+            # A shot the server fired isn't fired again.
+            server.dropResponse = "/games/fire"
+            with self.assertRaises((ConnectionError, HTTPException)):
+                player1.fire(gameId, "J-10")
+            assert(server.counts["/games/fire"] == 13)
+            # The next command goes out on a new connection.
+            assert(player2.status(gameId) == ("playing", True))
+            player2.fire(gameId, "J-10")
+            assert(server.counts["/games/fire"] == 14)
+            player1.close()
+            player2.close()
+        finally:
+            server.stop()
@@ -0,0 +1,68 @@
+import random
+import itertools
+import unittest
+from collections import Counter
+from exact_shot_selector import ExactShotSelector
+from exact_shot_selector import TranspositionTable
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from tournament import playHeadlessGame
+
+FLEET = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+
+class ExactShotSelectorTestCase(unittest.TestCase):
+    def countByEnumerating(self, shotSelector):
+        """Counts the layouts agreeing with the board by trying every combination of placements."""
+        table = shotSelector.placementTable
+        hits = set(i * shotSelector.boardDimensions + j for i in range(shotSelector.boardDimensions)
+                   for j in range(shotSelector.boardDimensions) if shotSelector.enemyBoard[i][j] == -1)
+        counts = [0] * (shotSelector.boardDimensions ** 2)
+        for layout in itertools.product(*shotSelector.shipPlacements()):
+            covered = set()
+            for placement in layout:
+                if not covered.isdisjoint(table.placements[placement]):
+                    break
+                covered.update(table.placements[placement])
+            else:
+                if hits <= covered:
+                    for cell in covered:
+                        counts[cell] += 1
+        return counts
+
+    def test_countLayouts(self):
+        fleet = {"2" : 2, "3" : 1}
+        for seed in range(10):
+            rng = random.Random(seed)
+            board = LocalBoard(randomBoard(5, fleet, rng))
+            shotSelector = ExactShotSelector(5, Counter(fleet), 1)
+            shots = [chr(ord("A") + i) + "-" + str(j + 1) for i in range(5) for j in range(5)]
+            rng.shuffle(shots)
+            for shot in shots[:rng.randrange(15)]:
+                hit, sunk = board.fire(shot)
+                if board.allSunk():
+                    break
+                shotSelector.shotResult(shot, hit, sunk)
+            counts = shotSelector.countLayouts()
+            expectedCounts = self.countByEnumerating(shotSelector)
+            assert(counts == expectedCounts or (counts is None and not any(expectedCounts)))
+
+    def test_memoryBudget(self):
+        # An empty board has far too many layouts to count, they're sampled instead.
+        shotSelector = ExactShotSelector(10, Counter(FLEET), 1, None, 100)
+        assert(shotSelector.countLayouts() is None)
+        shotSelector.selectShot()
+        table = TranspositionTable(3000)
+        assert(table.capacity(10) == 1)
+        table.put((10, 1, 0, ()), (1, None), 1600)
+        table.put((10, 2, 0, ()), (1, None), 1600)
+        assert(table.get((10, 1, 0, ())) is None)
+        assert(table.get((10, 2, 0, ())) == (1, None))
+        assert(table.hits == 1 and table.misses == 1)
+
+    def test_selectShot(self):
+        for seed in range(2):
+            random.seed(seed)
+            shotSelector = ExactShotSelector(10, Counter(FLEET), 4, None, 500)
+            shots, selectTimes = playHeadlessGame(shotSelector, LocalBoard(randomBoard(10, FLEET, random.Random(seed))))
+            assert(17 <= shots <= 100)
+            assert(shotSelector.shipsAfloat == Counter())
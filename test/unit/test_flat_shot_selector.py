@@ -0,0 +1,77 @@
+import copy
+import random
+import unittest
+from collections import Counter
+from flat_shot_selector import FlatMappingShotSelector
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from shot_selector import MappingShotSelector
+from shot_selector import Coordinates
+from shot_selector import SinkingShip
+from shot_selector import BoardState
+from tournament import playHeadlessGame
+
+class FlatMappingTestCase(unittest.TestCase):
+    def test_weightBoard(self):
+        fleet = Counter({"2" : 1})
+        fss = FlatMappingShotSelector(3, fleet)
+        fss.setState(Coordinates(1, 1), BoardState.HIT)
+        assert(fss.board.states[4] == BoardState.HIT)
+        fss.weightBoard()
+        assert(list(fss.board.weights) == [2, 13, 2, 13, 0, 13, 2, 13, 2])
+        coordinates = fss.selectBestCoordinates()
+        assert(coordinates in (Coordinates(0, 1), Coordinates(1, 0), Coordinates(1, 2), Coordinates(2, 1)))
+        assert(list(fss.board.weights) == [0] * 9)
+        assert(fss.enemyBoard[1][1] == BoardState.HIT)
+
+    def test_matchesMappingShotSelector(self):
+        states = [BoardState.OPEN] * 6 + [BoardState.HIT, BoardState.BULLSEYE, BoardState.SUNK, BoardState.MISS]
+        rng = random.Random(1)
+        for i in range(20):
+            fleet = Counter({"2" : 1, "3" : 2, "4" : 1, "5" : 1})
+            mss = MappingShotSelector(10, Counter(fleet))
+            fss = FlatMappingShotSelector(10, Counter(fleet))
+            for x in range(10):
+                for y in range(10):
+                    state = rng.choice(states)
+                    mss.enemyBoard[x][y] = state
+                    fss.setState(Coordinates(x, y), state)
+            mss.weightBoard()
+            fss.weightBoard()
+            for x in range(10):
+                for y in range(10):
+                    expected = mss.enemyBoard[x][y] if mss.enemyBoard[x][y] > BoardState.OPEN else 0
+                    assert(fss.board.weights[x * 10 + y] == expected)
+
+    def testSinkShips(self):
+        fleet = Counter({"2" : 1, "3" : 1})
+        fss = FlatMappingShotSelector(3, fleet)
+        fss.shipsToSink.append(SinkingShip(Coordinates(0, 0), 3))
+        fss.shipsToSink.append(SinkingShip(Coordinates(2, 1), 2))
+        # Add two ships that can't be sunk yet.
+        for coordinates in (Coordinates(0, 1), Coordinates(0, 2), Coordinates(1, 0), Coordinates(2, 0), Coordinates(2, 2)):
+            fss.setState(coordinates, BoardState.HIT)
+        fss.setState(Coordinates(0, 0), BoardState.BULLSEYE)
+        fss.setState(Coordinates(2, 1), BoardState.BULLSEYE)
+        fss.sinkShips()
+        assert(len(fss.shipsToSink) == 2)
+        # Add another ship that will cause all three ships to be sunk.
+        fss.shipsToSink.append(SinkingShip(Coordinates(0, 2), 2))
+        fss.setState(Coordinates(0, 2), BoardState.BULLSEYE)
+        fss.sinkShips()
+        assert(len(fss.shipsToSink) == 0)
+        for x, y in ((0, 0), (0, 1), (0, 2), (1, 0), (2, 0), (2, 1), (2, 2)):
+            assert(fss.board.states[x * 3 + y] == BoardState.SUNK)
+
+    def test_copy(self):
+        fleet = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+        random.seed(0)
+        fss = FlatMappingShotSelector(10, Counter(fleet))
+        fss.shotResult("E-5", True, 0)
+        copied = copy.deepcopy(fss)
+        copied.shotResult("E-6", False, 0)
+        # The copy's views are of its own board.
+        assert(copied.enemyBoard[4][4] == BoardState.HIT and copied.enemyBoard[4][5] == BoardState.MISS)
+        assert(fss.enemyBoard[4][5] == BoardState.OPEN)
+        shots, selectTimes = playHeadlessGame(copied, LocalBoard(randomBoard(10, fleet, random.Random(0))))
+        assert(copied.shipsAfloat == Counter())
@@ -0,0 +1,113 @@
+import io
+import os
+import json
+import time
+import socket
+import shutil
+import tempfile
+import threading
+import unittest
+from game_daemon import GameDaemon
+from battleship_player import loadJson
+from battleship_player import traceRecorders
+from game_trace import readTraces
+from stand_in_server import StandInServer
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+class GameDaemonTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer()
+        self.port = self.server.start()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def job(self, jobId, player, board, *options):
+        return {"id" : jobId, "args" : ["127.0.0.1", self.port, player, os.path.join(DATA, board), os.path.join(DATA, "fleet.json"),
+                                        "--pause", "0.01", "--pollinitial", "0.001"] + list(options)}
+
+    def waitForGame(self, gameId):
+        """Waits for a game to be started on the stand-in server."""
+        deadline = time.monotonic() + 10
+        while gameId not in self.server.games.games:
+            assert(time.monotonic() < deadline)
+            time.sleep(0.01)
+
+    def checkResults(self, results, first, second):
+        """Checks the two players of a game got a result each."""
+        results = dict((result["id"], result) for result in results)
+        assert(sorted([results[first]["result"], results[second]["result"]]) == ["lost", "won"])
+        assert(results[first]["gameId"] == results[second]["gameId"])
+        winner = results[first] if results[first]["result"] == "won" else results[second]
+        assert(17 <= winner["shots"] <= 100)
+
+    def test_serveStream(self):
+        tracePath = os.path.join(self.directory, "traces.jsonl.gz")
+        daemon = GameDaemon(2, ["--strategy", "mapping", "--trace", tracePath])
+        input = io.StringIO("\n".join(json.dumps(job) for job in (
+            self.job("a", "one", "player_1_board.json"),
+            self.job("b", "two", "player_2_board.json", "--join", "1", "--strategy", "random"),
+            self.job("c", "three", "player_1_board.json", "--engine", "nosuchengine"))) + "\nnot json\n")
+        output = io.StringIO()
+        thread = threading.Thread(target = daemon.serveStream, args = (input, output))
+        try:
+            # The first job starts the game the second one joins, so let the workers get going before reading it.
+            daemon.slots.acquire()
+            thread.start()
+            self.waitForGame(1)
+            daemon.slots.release()
+            thread.join()
+        finally:
+            daemon.close()
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert(len(results) == 4)
+        self.checkResults(results, "a", "b")
+        errors = [result for result in results if "error" in result]
+        assert(sorted(str(result["id"]) for result in errors) == ["None", "c"])
+        # Both games shared a connection pool and read the fleet file once.
+        assert(len(daemon.pools) == 1)
+        assert(loadJson(os.path.join(DATA, "fleet.json")) is loadJson(os.path.join(DATA, "fleet.json")))
+        # Both players recorded through one recorder, closed with the daemon.
+        assert(sorted(trace["result"] for number, trace in readTraces(tracePath)) == ["lost", "won"])
+        assert(not traceRecorders)
+
+    def test_rejectedOptions(self):
+        daemon = GameDaemon(1)
+        try:
+            result = daemon.play(self.job("a", "one", "player_1_board.json", "--metrics", os.path.join(self.directory, "metrics.json")))
+        finally:
+            daemon.close()
+        assert("--metrics" in result["error"])
+        assert(not self.server.games.games)
+        assert(not os.path.exists(os.path.join(self.directory, "metrics.json")))
+
+    def test_serveSocket(self):
+        daemon = GameDaemon(2)
+        path = os.path.join(self.directory, "jobs.sock")
+        server = daemon.serveSocket(path)
+        thread = threading.Thread(target = server.serve_forever)
+        thread.start()
+        try:
+            clients = []
+            for job in (self.job(1, "one", "player_1_board.json"), self.job(2, "two", "player_2_board.json", "--join", "1")):
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                client.connect(path)
+                client.sendall((json.dumps(job) + "\n").encode("UTF-8"))
+                client.shutdown(socket.SHUT_WR)
+                clients.append(client)
+                self.waitForGame(1)
+            # Every result goes back on the connection its job came in on.
+            results = []
+            for client in clients:
+                lines = client.makefile("r").read().splitlines()
+                assert(len(lines) == 1)
+                results.append(json.loads(lines[0]))
+                client.close()
+            self.checkResults(results, 1, 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+            daemon.close()
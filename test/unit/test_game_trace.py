@@ -0,0 +1,136 @@
+import io
+import os
+import sys
+import gzip
+import json
+import random
+import shutil
+import tempfile
+import unittest
+import subprocess
+import game_trace
+from collections import Counter
+from local_command_driver import LocalGameServer
+from local_command_driver import LocalCommandDriver
+from local_command_driver import randomBoard
+from player import Player
+from shot_selector import MappingShotSelector
+from shot_selector import RandomShotSelector
+from game_trace import TraceRecorder
+from game_trace import decodeShots
+from game_trace import encodeShots
+from game_trace import enemyBoard
+from game_trace import readTraces
+from replay import replayTraces
+
+FLEET = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+
+def shipCells(board):
+    """Returns the coordinates covered by ships and the size of each ship on a player board."""
+    ships = Counter(ship for row in board for ship in row if ship)
+    cells = set((x, y) for x, row in enumerate(board) for y, ship in enumerate(row) if ship)
+    return cells, sorted(ships.values())
+
+class GameTraceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def recordGames(self, path, games):
+        """Plays games between a mapping and a random player, both recording to path.
+
+        Returns
+        The board of each player of each game, keyed by game id and whether the player started it.
+        """
+        recorder = TraceRecorder(path, 10, FLEET)
+        boards = {}
+        server = LocalGameServer()
+        for game in range(games):
+            rng = random.Random(game)
+            board1, board2 = randomBoard(10, FLEET, rng), randomBoard(10, FLEET, rng)
+            player1 = Player(board1, LocalCommandDriver(server, "one"), MappingShotSelector(10, Counter(FLEET)), 0,
+                             False, recorder = recorder)
+            player2 = Player(board2, LocalCommandDriver(server, "two"), RandomShotSelector(10, Counter(FLEET)), 0,
+                             False, recorder = recorder)
+            gameId = player1.start()
+            player2.join(gameId)
+            boards[gameId] = (board1, board2)
+            gameStates = [None, None]
+            while None in gameStates:
+                for i, player in enumerate((player1, player2)):
+                    if gameStates[i] is None:
+                        gameStates[i] = player.playTurn()
+        recorder.close()
+        return boards
+
+    def test_encodeShots(self):
+        shots = [("A-1", False, 0), ("B-1", True, 0), ("B-2", True, 2), ("J-10", False, 0)]
+        assert(encodeShots(shots) == "A-1 B-1x B-2x2 J-10")
+        assert(decodeShots(encodeShots(shots)) == shots)
+        assert(decodeShots("") == [])
+
+    def test_enemyBoard(self):
+        path = os.path.join(self.directory, "traces.jsonl.gz")
+        boards = self.recordGames(path, 3)
+        traces = [trace for number, trace in readTraces(path)]
+        assert(len(traces) == 6)
+        for trace in traces:
+            assert(trace["dimensions"] == 10 and trace["fleet"] == FLEET)
+            board = enemyBoard(trace)
+            if trace["result"] == "lost":
+                assert(board is None)
+                continue
+            # Only the winner hit every ship, whoever it was the ships are where they were placed.  Ships side by side
+            # can be fitted to the hits more than one way, so only the coordinates and sizes are compared.
+            enemy = [b for b in boards[trace["game"]] if shipCells(b) == shipCells(board)]
+            assert(len(enemy) == 1)
+            assert(sum(hit for shot, hit, sunk in trace["shots"]) == 17)
+
+    def test_killedRecorder(self):
+        path = os.path.join(self.directory, "traces.jsonl.gz")
+        # The player is killed without closing its recorder.
+        script = ("import os, sys\nfrom game_trace import TraceRecorder\nrecorder = TraceRecorder(sys.argv[1], 10, %r)\n"
+                  "recorder.record(1, [('A-1', False, 0)], 'lost')\nrecorder.record(2, [('B-1', True, 0)], 'lost')\n"
+                  "os._exit(1)\n" % (FLEET))
+        environment = dict(os.environ, PYTHONPATH = os.path.dirname(game_trace.__file__))
+        assert(subprocess.call([sys.executable, "-c", script, path], env = environment) == 1)
+        assert([trace["game"] for number, trace in readTraces(path)] == [1, 2])
+        # Then killed part way through appending a game.
+        with open(path, "ab") as traceFile:
+            member = gzip.compress(json.dumps({"version" : 1, "game" : 3, "shots" : "A-1 " * 50}).encode() + b"\n")
+            traceFile.write(member[:len(member) // 2])
+        assert([trace["game"] for number, trace in readTraces(path)] == [1, 2])
+
+    def test_sharedFile(self):
+        path = os.path.join(self.directory, "traces.jsonl.gz")
+        recorders = [TraceRecorder(path, 10, FLEET), TraceRecorder(path, 10, FLEET)]
+        for game in range(6):
+            recorders[game % 2].record(game, [("A-%d" % (game + 1), False, 0)], "lost")
+        for recorder in recorders:
+            recorder.close()
+        traces = list(readTraces(path))
+        assert([(number, trace["game"]) for number, trace in traces] == [(game + 1, game) for game in range(6)])
+        assert(traces[5][1]["shots"] == [("A-6", False, 0)])
+
+    def test_replayTraces(self):
+        path = os.path.join(self.directory, "traces.jsonl")
+        self.recordGames(path, 4)
+        # Appending keeps the games recorded before.
+        self.recordGames(path, 2)
+        results = {}
+        for workers in (1, 2):
+            output = io.StringIO()
+            summary = replayTraces(readTraces(path), ["mapping", "random"], workers, 0, output)
+            assert(summary["games"] == {"replayed" : 6, "skipped" : 6})
+            assert(summary["recorded"]["shots"]["count"] == 6)
+            assert(summary["mapping"]["shots"]["count"] == 6)
+            assert(summary["mapping"]["selectSeconds"]["count"] ==
+                   summary["mapping"]["shots"]["mean"] * 6)
+            results[workers] = sorted((result["line"], result["strategy"], result["shots"])
+                                      for result in map(json.loads, output.getvalue().splitlines()))
+            for line, strategy, shots in results[workers]:
+                assert(17 <= shots <= 100)
+        # The same seed replays the same games no matter how many workers there are.
+        assert(results[1] == results[2])
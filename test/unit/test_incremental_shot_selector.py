@@ -0,0 +1,56 @@
+import unittest
+from incremental_shot_selector import IncrementalMappingShotSelector
+from shot_selector import MappingShotSelector
+from shot_selector import Coordinates
+from shot_selector import BoardState
+from collections import Counter
+
+BOARD = [
+    ["", "", "", "", "", "", "", "", "", ""],
+    ["", "", "", "", "", "", "", "", "", ""],
+    ["", "", "", "", "", "", "", "", "", ""],
+    ["", "D-4", "D-4", "D-4", "D-4", "", "", "", "", ""],
+    ["", "A-5", "A-5", "A-5", "A-5", "A-5", "", "", "", ""],
+    ["", "B-3", "B-3", "B-3", "", "", "", "", "", ""],
+    ["", "E-3", "E-3", "E-3", "", "", "", "", "", ""],
+    ["", "", "", "", "", "", "", "", "", ""],
+    ["", "", "", "", "", "", "", "", "", "C-2"],
+    ["", "", "", "", "", "", "", "", "", "C-2"]]
+
+class IncrementalMappingTestCase(unittest.TestCase):
+    def expectedWeights(self, ims):
+        """Weights the same board from scratch with MappingShotSelector."""
+        mss = MappingShotSelector(ims.boardDimensions, Counter(ims.shipsAfloat))
+        mss.enemyBoard = [list(row) for row in ims.enemyBoard]
+        mss.weightBoard()
+        return [max(weight, 0) for row in mss.enemyBoard for weight in row]
+
+    def test_weightBoard(self):
+        fleet = Counter({"2" : 1})
+        ims = IncrementalMappingShotSelector(3, fleet)
+        assert(ims.weights == [2, 3, 2, 3, 4, 3, 2, 3, 2])
+        ims.setState(Coordinates(1, 1), BoardState.HIT)
+        assert(ims.weights == [2, 13, 2, 13, 0, 13, 2, 13, 2])
+        ims.setState(Coordinates(1, 1), BoardState.MISS)
+        assert(ims.weights == [2, 2, 2, 2, 0, 2, 2, 2, 2])
+        coordinates = ims.selectBestCoordinates()
+        assert(coordinates != Coordinates(1, 1))
+        # The weights are kept for the next turn.
+        assert(ims.weights == [2, 2, 2, 2, 0, 2, 2, 2, 2])
+
+    def test_game(self):
+        # Play a whole game and make sure the weights always match weighting the board from scratch.
+        ims = IncrementalMappingShotSelector(10, Counter({"2" : 1, "3" : 2, "4" : 1, "5" : 1}))
+        hitsLeft = Counter(cell for row in BOARD for cell in row if cell)
+        while ims.shipsAfloat:
+            shot = ims.selectShot()
+            coordinates = ims.mapToCoordinates(shot)
+            ship = BOARD[coordinates.x][coordinates.y]
+            sunk = 0
+            if ship:
+                hitsLeft[ship] -= 1
+                if hitsLeft[ship] == 0:
+                    sunk = int(ship.split("-")[1])
+            ims.shotResult(shot, ship != "", sunk)
+            assert(ims.weights == self.expectedWeights(ims))
+        assert(sum(ims.weights) == 0)
@@ -0,0 +1,59 @@
+import json
+import os
+import random
+import unittest
+from local_command_driver import LocalBoard
+from local_command_driver import LocalGameServer
+from local_command_driver import LocalCommandDriver
+from local_command_driver import GameError
+from local_command_driver import playLocalGame
+from local_command_driver import randomBoard
+from shot_selector import RandomShotSelector
+from shot_selector import MappingShotSelector
+from collections import Counter
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+def loadBoard(name):
+    return json.load(open(os.path.join(DATA, name)))["board"]
+
+class LocalCommandDriverTestCase(unittest.TestCase):
+    def test_localBoard(self):
+        board = LocalBoard(loadBoard("player_1_board.json"))
+        assert(board.fire("A-1") == (False, 0))
+        assert(board.fire("I-10") == (True, 0))
+        # Hitting the same coordinates again doesn't sink the ship.
+        assert(board.fire("I-10") == (True, 0))
+        assert(board.fire("J-10") == (True, 2))
+        assert(not board.allSunk())
+        self.assertRaises(GameError, board.fire, "K-1")
+
+    def test_game(self):
+        server = LocalGameServer()
+        player1 = LocalCommandDriver(server, "one")
+        player2 = LocalCommandDriver(server, "two")
+        gameId = player1.start(loadBoard("player_1_board.json"))
+        assert(player1.status(gameId) == ("waiting", False))
+        assert(player2.join(loadBoard("player_2_board.json"), gameId) == gameId)
+        assert(player1.status(gameId) == ("playing", True))
+        assert(player2.status(gameId) == ("playing", False))
+        self.assertRaises(GameError, player2.fire, gameId, "A-1")
+        player1.fire(gameId, "A-1")
+        assert(player1.status(gameId) == ("playing", False))
+        assert(player2.status(gameId) == ("playing", True))
+
+    def test_playLocalGame(self):
+        fleet = json.load(open(os.path.join(DATA, "fleet.json")))["fleet"]
+        gameStates = playLocalGame(loadBoard("player_1_board.json"), MappingShotSelector(10, Counter(fleet)),
+                                   loadBoard("player_2_board.json"), RandomShotSelector(10, Counter(fleet)))
+        assert(sorted(gameStates) == ["lost", "won"])
+
+    def test_randomBoard(self):
+        fleet = Counter({"2" : 1, "3" : 2, "4" : 1, "5" : 1})
+        board = randomBoard(10, fleet, random.Random(1))
+        ships = Counter(cell for row in board for cell in row if cell)
+        assert(len(ships) == 5)
+        assert(sorted(ships.values()) == [2, 3, 3, 4, 5])
+        for ship, size in ships.items():
+            assert(ship.endswith("-%d" % size))
+        assert(board == randomBoard(10, fleet, random.Random(1)))
@@ -3,6 +3,7 @@ from shot_selector import MappingShotSelector
 from shot_selector import Coordinates
 from shot_selector import SinkingShip
 from shot_selector import BoardState
+from shot_selector import Direction
 from collections import Counter
 from collections import namedtuple
 
@@ -53,6 +54,19 @@ class MappingTestCase(unittest.TestCase):
         assert(mss.enemyBoard[2][1] == 13)
         assert(mss.enemyBoard[2][2] == 2)
         
+    def test_largeShips(self):
+        # Ships longer than the recursion limit.
+        size = 1500
+        mss = MappingShotSelector(size + 10, Counter({str(size) : 1}))
+        mss.enemyBoard[5][20] = BoardState.HIT
+        mss.positionAndWeightShip(Coordinates(5, 0), size, 1, Direction.East)
+        assert(mss.enemyBoard[5][:size] == [11] * 20 + [BoardState.HIT] + [11] * (size - 21))
+        assert(mss.enemyBoard[5][size] == BoardState.OPEN)
+        for i in range(size):
+            mss.enemyBoard[i][7] = BoardState.HIT
+        assert(mss.sinkPlacements(SinkingShip(Coordinates(size, 7), size + 1)) == [tuple(Coordinates(i, 7) for i in range(size + 1))])
+        assert(mss.sinkPlacements(SinkingShip(Coordinates(size, 7), size + 2)) == [])
+
     def test_selectBestCoordinates(self):
         fleet = Counter({"2" : 1})
         # No obstacles.
@@ -85,22 +99,36 @@ class MappingTestCase(unittest.TestCase):
         assert(mss.enemyBoard[2][1] == BoardState.OPEN)
         assert(mss.enemyBoard[2][2] == BoardState.OPEN)
         
-    def testPositionAndSinkShip(self):
+    def test_selectBestCoordinatesTies(self):
+        # Ties are broken uniformly at random, wherever on the board they are.
+        fleet = Counter({"2" : 1})
+        mss = MappingShotSelector(3, fleet)
+        selections = Counter()
+        for i in range(4000):
+            mss.enemyBoard[0][1] = 5
+            mss.enemyBoard[1][0] = 5
+            mss.enemyBoard[1][2] = 5
+            mss.enemyBoard[2][0] = 4
+            mss.enemyBoard[2][1] = 5
+            selections[mss.selectBestCoordinates()] += 1
+        assert(len(selections) == 4)
+        for coordinates in (Coordinates(0, 1), Coordinates(1, 0), Coordinates(1, 2), Coordinates(2, 1)):
+            assert(850 < selections[coordinates] < 1150)
+        assert(mss.enemyBoard == [[BoardState.OPEN] * 3] * 3)
+        
+    def testSinkPlacements(self):
         fleet = Counter({"2" : 1})
         # Only one way to sink.
         mss = MappingShotSelector(3, fleet)
         mss.enemyBoard[0][0] = BoardState.BULLSEYE
         mss.enemyBoard[0][1] = BoardState.HIT
-        sunkShip, shipsCoordinates = mss.positionAndSinkShip(SinkingShip(Coordinates(0, 0), 2))
-        assert(sunkShip)
-        for shipCoordinates in shipsCoordinates:
-            assert((shipCoordinates.x == 0 and shipCoordinates.x == 0) or (shipCoordinates.x == 0 and shipCoordinates.y == 1))
+        placements = mss.sinkPlacements(SinkingShip(Coordinates(0, 0), 2))
+        assert(placements == [(Coordinates(0, 0), Coordinates(0, 1))])
         assert(mss.enemyBoard[0][0] == BoardState.BULLSEYE)
         assert(mss.enemyBoard[0][1] == BoardState.HIT)
-        # Add a second way to sink, shouldn't be able to sink it.
+        # Add a second way to sink.
         mss.enemyBoard[1][0] = BoardState.HIT
-        sunkShip, shipsCoordinates = mss.positionAndSinkShip(SinkingShip(Coordinates(0, 0), 2))
-        assert(not sunkShip)
+        assert(len(mss.sinkPlacements(SinkingShip(Coordinates(0, 0), 2))) == 2)
         # Add an extra coordinate, but still a way to sink a ship of size 3.
         fleet = Counter({"3" : 1})
         mss = MappingShotSelector(3, fleet)
@@ -108,8 +136,24 @@ class MappingTestCase(unittest.TestCase):
         mss.enemyBoard[0][1] = BoardState.HIT
         mss.enemyBoard[0][2] = BoardState.HIT
         mss.enemyBoard[1][0] = BoardState.HIT
-        sunkShip, shipsCoordinates = mss.positionAndSinkShip(SinkingShip(Coordinates(0, 0), 3))
-        assert(sunkShip)
+        assert(len(mss.sinkPlacements(SinkingShip(Coordinates(0, 0), 3))) == 1)
+        # The bullseye can be anywhere along the ship.
+        mss = MappingShotSelector(3, fleet)
+        mss.enemyBoard[1][0] = BoardState.HIT
+        mss.enemyBoard[1][1] = BoardState.BULLSEYE
+        mss.enemyBoard[1][2] = BoardState.HIT
+        assert(mss.sinkPlacements(SinkingShip(Coordinates(1, 1), 3)) == [(Coordinates(1, 0), Coordinates(1, 1), Coordinates(1, 2))])
+
+    def testSinkPlacementsHitOrder(self):
+        # Hits that came after the bullseye can't be part of its ship.
+        mss = MappingShotSelector(3, Counter({"2" : 2}))
+        mss.shotResult("A-1", True, 0)
+        mss.shotResult("B-2", True, 0)
+        mss.shotResult("A-2", True, 2)
+        mss.shotResult("A-3", True, 0)
+        placements = mss.sinkPlacements(SinkingShip(Coordinates(0, 1), 2))
+        assert(placements == [(Coordinates(0, 1), Coordinates(1, 1)), (Coordinates(0, 0), Coordinates(0, 1))])
+        assert(mss.afloatHits() == [Coordinates(0, 2)])
 
     def testSinkShips(self):
         fleet = Counter({"2" : 1, "3" : 1})
@@ -143,5 +187,31 @@ class MappingTestCase(unittest.TestCase):
         assert(mss.enemyBoard[2][0] == BoardState.SUNK)
         assert(mss.enemyBoard[2][1] == BoardState.SUNK)
         assert(mss.enemyBoard[2][2] == BoardState.SUNK)
-        assert(len(mss.shipsToSink) == 0)     
-        
\ No newline at end of file
+        assert(len(mss.shipsToSink) == 0)
+
+    def testSinkShipsForced(self):
+        # The middle hit is part of the sinking ship whichever end of the hits it's at, so it's SUNK even though the
+        # ship can't be sunk yet.
+        fleet = Counter({"2" : 1, "3" : 1})
+        mss = MappingShotSelector(5, fleet)
+        mss.enemyBoard[2][0] = BoardState.HIT
+        mss.enemyBoard[2][1] = BoardState.BULLSEYE
+        mss.enemyBoard[2][2] = BoardState.HIT
+        mss.enemyBoard[2][3] = BoardState.HIT
+        mss.enemyBoard[4][4] = BoardState.HIT
+        mss.shipsToSink.append(SinkingShip(Coordinates(2, 1), 3))
+        mss.sinkShips()
+        assert(len(mss.shipsToSink) == 1)
+        assert(mss.enemyBoard[2] == [BoardState.HIT, BoardState.BULLSEYE, BoardState.SUNK, BoardState.HIT, BoardState.OPEN])
+        assert(mss.sinkingCells == set([Coordinates(2, 2)]))
+        assert(mss.afloatHits() == [Coordinates(4, 4)])
+        # Sinking a ship over one end of the hits sinks the other ship over the other end.
+        mss.enemyBoard[1][0] = BoardState.BULLSEYE
+        mss.shipsToSink.append(SinkingShip(Coordinates(1, 0), 2))
+        mss.sinkShips()
+        assert(len(mss.shipsToSink) == 0)
+        assert(mss.enemyBoard[1][0] == BoardState.SUNK)
+        assert(mss.enemyBoard[2] == [BoardState.SUNK] * 4 + [BoardState.OPEN])
+        assert(mss.enemyBoard[4][4] == BoardState.HIT)
+        assert(mss.sinkingCells == set())
+        assert(mss.afloatHits() == [Coordinates(4, 4)])
@@ -0,0 +1,121 @@
+import json
+import os
+import logging
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from command_driver import HttpCommandDriver
+from metrics import metrics
+from metrics import MetricsRegistry
+from player import Player
+from poll_scheduler import PollScheduler
+from shot_selector import MappingShotSelector
+from shot_selector import RandomShotSelector
+from selector_factory import MAPPING_ENGINES
+from selector_factory import createShotSelector
+from numpy_shot_selector import available
+from stand_in_server import StandInServer
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+def loadBoard(name):
+    return json.load(open(os.path.join(DATA, name)))["board"]
+
+def loadFleet():
+    return Counter(json.load(open(os.path.join(DATA, "fleet.json")))["fleet"])
+
+"""Raises if it's ever turned into a string."""
+class Unprintable:
+    def __str__(self):
+        raise AssertionError("built a string while debug logging is off")
+
+class MetricsTestCase(unittest.TestCase):
+    def tearDown(self):
+        metrics.enable(False)
+        metrics.reset()
+
+    def test_registry(self):
+        registry = MetricsRegistry()
+        registry.count("disabled")
+        with registry.timer("disabled"):
+            pass
+        assert(registry.toDict() == {"counters" : {}, "histograms" : {}})
+        registry.enable()
+        registry.count("shots", 2)
+        registry.count("shots")
+        with registry.timer("select"):
+            pass
+        registry.observe("select", 0.5)
+        path = os.path.join(tempfile.mkdtemp(), "metrics.json")
+        registry.dump(path)
+        dumped = json.load(open(path))
+        assert(dumped["counters"] == {"shots" : 3})
+        assert(dumped["histograms"]["select"]["count"] == 2)
+        assert(dumped["histograms"]["select"]["max"] == 0.5)
+
+    def test_player(self):
+        metrics.enable()
+        server = StandInServer()
+        port = server.start()
+        try:
+            player1 = Player(loadBoard("player_1_board.json"), HttpCommandDriver("127.0.0.1", port, "one"),
+                             MappingShotSelector(10, loadFleet()), 0.01, False, PollScheduler(0.001, 0.01))
+            player2 = Player(loadBoard("player_2_board.json"), HttpCommandDriver("127.0.0.1", port, "two"),
+                             RandomShotSelector(10, loadFleet()), 0.01, False, PollScheduler(0.001, 0.01))
+            player2.join(player1.start())
+            thread = threading.Thread(target = player2.play)
+            thread.start()
+            player1.play()
+            thread.join()
+        finally:
+            server.stop()
+        recorded = metrics.toDict()
+        counters = recorded["counters"]
+        histograms = recorded["histograms"]
+        turns = counters["player.turns"]
+        assert(turns >= 33)
+        assert(histograms["player.select"]["count"] == turns)
+        assert(histograms["http.fire"]["count"] == turns)
+        assert(histograms["http.status"]["count"] == histograms["player.status"]["count"])
+        # Only the mapping player weights the board.
+        assert(histograms["selector.weightBoard"]["count"] <= turns)
+        assert(counters["selector.cellsWeighted"] > 0)
+        assert(counters["selector.placementsTested"] > 0)
+
+    def test_placementsTested(self):
+        metrics.enable()
+        for engine in MAPPING_ENGINES:
+            if engine == "numpy" and not available():
+                continue
+            metrics.reset()
+            shotSelector = createShotSelector("mapping", engine, 10, loadFleet(), workers = 1)
+            try:
+                shotSelector.shotResult(shotSelector.selectShot(), False, 0)
+                shotSelector.selectShot()
+            finally:
+                shotSelector.close()
+            # Every engine tests at least the positions of the fleet on an empty board.
+            assert(metrics.toDict()["counters"]["selector.placementsTested"] >= shotSelector.boardPlacements()), engine
+
+    def test_weightedLog(self):
+        for strategy, engine in [("mapping", engine) for engine in MAPPING_ENGINES] + [("parity", None)]:
+            if engine == "numpy" and not available():
+                continue
+            shotSelector = createShotSelector(strategy, engine, 10, loadFleet(), workers = 1)
+            try:
+                with self.assertLogs(level = logging.DEBUG) as logs:
+                    shotSelector.selectShot()
+            finally:
+                shotSelector.close()
+            weighted = [record for record in logs.records if record.getMessage().startswith("weighted ")]
+            # The incremental engine keeps its weights up to date rather than weighting the board.
+            assert(len(weighted) == (engine != "incremental")), engine
+
+    def test_printBoard(self):
+        logging.getLogger().setLevel(logging.INFO)
+        mss = MappingShotSelector(1, Counter({"1" : 1}))
+        mss.enemyBoard = [[Unprintable()]]
+        mss.shipsAfloat = Counter({Unprintable() : 1})
+        mss.printBoard()
+        mss.printShipsAfloat()
@@ -0,0 +1,51 @@
+import time
+import random
+import unittest
+from collections import Counter
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from monte_carlo_shot_selector import MonteCarloShotSelector
+from shot_selector import BoardState
+from shot_selector import Coordinates
+from tournament import playHeadlessGame
+
+FLEET = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+
+class MonteCarloShotSelectorTestCase(unittest.TestCase):
+    def test_selectShot(self):
+        for seed in range(3):
+            random.seed(seed)
+            shotSelector = MonteCarloShotSelector(10, Counter(FLEET), None, 500)
+            shots, selectTimes = playHeadlessGame(shotSelector, LocalBoard(randomBoard(10, FLEET, random.Random(seed))))
+            assert(17 <= shots <= 100)
+            assert(shotSelector.shipsAfloat == Counter())
+
+    def test_selectShotNextToHit(self):
+        random.seed(0)
+        shotSelector = MonteCarloShotSelector(10, Counter(FLEET), None, 2000)
+        shotSelector.shotResult("E-5", True, 0)
+        shot = shotSelector.selectShot()
+        assert(shot in ("D-5", "F-5", "E-4", "E-6"))
+
+    def test_sampleLayouts(self):
+        random.seed(0)
+        shotSelector = MonteCarloShotSelector(4, Counter({"3" : 1}), None, 1000)
+        # Only the bottom row is left and the ship has to cover the hit.
+        for i in range(3):
+            for j in range(4):
+                shotSelector.shotResult(shotSelector.mapToShot(Coordinates(i, j)), False, 0)
+        shotSelector.shotResult("D-2", True, 0)
+        counts = shotSelector.sampleLayouts()
+        assert(counts[12] > 0 and counts[15] > 0)
+        assert(counts[13] == counts[14] == counts[12] + counts[15])
+        # A fleet that can't fit falls back to the placement weights.
+        shotSelector.shipsAfloat["5"] = 1
+        assert(shotSelector.sampleLayouts() is None)
+        assert(shotSelector.selectShot() in ("D-1", "D-3", "D-4"))
+
+    def test_timeBudget(self):
+        shotSelector = MonteCarloShotSelector(50, Counter(FLEET), 0.05, None)
+        startTime = time.perf_counter()
+        shotSelector.selectShot()
+        assert(time.perf_counter() - startTime < 1.0)
+        assert(shotSelector.enemyBoard[0] == [BoardState.OPEN] * 50)
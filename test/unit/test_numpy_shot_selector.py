@@ -0,0 +1,50 @@
+import random
+import unittest
+import numpy_shot_selector
+from numpy_shot_selector import NumpyMappingShotSelector
+from shot_selector import MappingShotSelector
+from shot_selector import BoardState
+from collections import Counter
+
+@unittest.skipIf(not numpy_shot_selector.available(), "NumPy is not installed")
+class NumpyMappingTestCase(unittest.TestCase):
+    def obstacles(self, state):
+        fleet = Counter({"2" : 1})
+        mss = NumpyMappingShotSelector(3, fleet)
+        mss.enemyBoard[1][1] = state
+        mss.weightBoard()
+        assert(mss.enemyBoard == [[2, 2, 2], [2, state, 2], [2, 2, 2]])
+
+    def test_weightBoard(self):
+        fleet = Counter({"2" : 1})
+        # No obstacles.
+        mss = NumpyMappingShotSelector(3, fleet)
+        mss.weightBoard()
+        assert(mss.enemyBoard == [[2, 3, 2], [3, 4, 3], [2, 3, 2]])
+        # Obstacles.
+        self.obstacles(BoardState.BULLSEYE)
+        self.obstacles(BoardState.MISS)
+        self.obstacles(BoardState.SUNK)
+        # Add a hit and make sure that affects the weighting.
+        mss = NumpyMappingShotSelector(3, fleet)
+        mss.enemyBoard[1][1] = BoardState.HIT
+        mss.weightBoard()
+        assert(mss.enemyBoard == [[2, 13, 2], [13, BoardState.HIT, 13], [2, 13, 2]])
+
+    def test_matchesMappingShotSelector(self):
+        states = [BoardState.OPEN] * 6 + [BoardState.HIT, BoardState.BULLSEYE, BoardState.SUNK, BoardState.MISS]
+        rng = random.Random(1)
+        for i in range(20):
+            fleet = Counter({"2" : 1, "3" : 2, "4" : 1, "5" : 1})
+            mss = MappingShotSelector(10, Counter(fleet))
+            nmss = NumpyMappingShotSelector(10, Counter(fleet))
+            for x in range(10):
+                for y in range(10):
+                    state = rng.choice(states)
+                    mss.enemyBoard[x][y] = state
+                    nmss.enemyBoard[x][y] = state
+            mss.weightBoard()
+            nmss.weightBoard()
+            assert(mss.enemyBoard == nmss.enemyBoard)
+            coordinates = nmss.selectBestCoordinates()
+            assert(nmss.enemyBoard[coordinates.x][coordinates.y] == BoardState.OPEN)
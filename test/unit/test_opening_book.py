@@ -0,0 +1,78 @@
+import os
+import copy
+import dbm
+import random
+import shutil
+import logging
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from opening_book import BOOK_VERSION
+from opening_book import bookPath
+from opening_book import bestShots
+from opening_book import openingBook
+from opening_book import OpeningBookShotSelector
+from shot_selector import MappingShotSelector
+from battleship_player import cachedOpeningBook
+
+FLEET = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+
+class OpeningBookTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_selectShot(self):
+        book = openingBook(self.directory, 10, Counter(FLEET), 3, 2)
+        for seed in range(5):
+            random.seed(seed)
+            board = LocalBoard(randomBoard(10, FLEET, random.Random(seed)))
+            shotSelector = OpeningBookShotSelector(MappingShotSelector(10, Counter(FLEET)), book)
+            bookShots = 0
+            while not board.allSunk():
+                if shotSelector.results is not None and book.lookup(shotSelector.results) is not None:
+                    bookShots += 1
+                # The book's shots are the shots the mapping strategy would select.
+                expectedShots = bestShots(copy.deepcopy(shotSelector.shotSelector))
+                shot = shotSelector.selectShot()
+                assert(shot in expectedShots)
+                hit, sunk = board.fire(shot)
+                shotSelector.shotResult(shot, hit, sunk)
+            assert(bookShots >= 3)
+            assert(shotSelector.results is None)
+        book.close()
+
+    def test_openingBook(self):
+        openingBook(self.directory, 6, Counter(FLEET), 2, 0).close()
+        path = bookPath(self.directory, 6, FLEET)
+        with dbm.open(path, "w") as book:
+            book["version"] = str(BOOK_VERSION - 1)
+            del book[""]
+        # An out of date book is rebuilt.
+        book = openingBook(self.directory, 6, Counter(FLEET), 2, 0)
+        assert(book.lookup(()) is not None)
+        assert(book.lookup((("A-1", True), ("A-2", False))) is None)
+        book.close()
+        assert(bookPath(self.directory, 6, {"2" : 1}) != path)
+        # The book was built under another name and renamed, nothing is left behind.
+        assert(all(name.startswith(os.path.basename(path)) and ".tmp" not in name for name in os.listdir(self.directory)))
+
+    def test_cachedOpeningBook(self):
+        books = []
+        threads = [threading.Thread(target = lambda: books.append(cachedOpeningBook(self.directory, 6, Counter(FLEET))))
+                   for i in range(4)]
+        with self.assertLogs(level = logging.INFO) as logs:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        # Every thread got the same book, built once.
+        assert(len(books) == 4 and all(book is books[0] for book in books))
+        assert(len([record for record in logs.records if record.getMessage().startswith("building opening book")]) == 1)
+        assert(books[0].lookup(()) is not None)
+        books[0].close()
@@ -0,0 +1,89 @@
+import random
+import unittest
+from collections import Counter
+from parity_shot_selector import ParityShotSelector
+from shot_selector import MappingShotSelector
+from shot_selector import Coordinates
+from shot_selector import BoardState
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from tournament import playHeadlessGame
+
+FLEET = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+
+class ParityTestCase(unittest.TestCase):
+    def selectors(self, states, rng):
+        """Builds a mapping and a parity selector with the same board."""
+        mss = MappingShotSelector(10, Counter(FLEET))
+        pss = ParityShotSelector(10, Counter(FLEET))
+        for x in range(10):
+            for y in range(10):
+                state = rng.choice(states)
+                mss.enemyBoard[x][y] = state
+                pss.setState(Coordinates(x, y), state)
+        mss.weightBoard()
+        pss.weightBoard()
+        return mss, pss
+
+    def test_hunt(self):
+        rng = random.Random(1)
+        for i in range(20):
+            mss, pss = self.selectors([BoardState.OPEN] * 6 + [BoardState.SUNK, BoardState.MISS], rng)
+            assert(pss.mode() == "hunt")
+            # The smallest ship is 2 long, every other coordinates are on the lattice.
+            assert(pss.spacing == 2)
+            for coordinates, weight in pss.weights.items():
+                assert((coordinates.x + coordinates.y) % 2 == pss.offset)
+                assert(weight == mss.enemyBoard[coordinates.x][coordinates.y])
+            assert(pss.selectBestCoordinates() in pss.weights)
+
+    def test_spacing(self):
+        random.seed(0)
+        pss = ParityShotSelector(10, Counter(FLEET))
+        pss.weightBoard()
+        assert(pss.spacing == 2 and len(pss.weights) == 50)
+        pss.removeFromFleet("2")
+        pss.weightBoard()
+        assert(pss.spacing == 3 and len(pss.weights) in (33, 34))
+        assert(all((x + y) % 3 == pss.offset for x, y in pss.weights))
+
+    def test_target(self):
+        rng = random.Random(2)
+        for i in range(20):
+            mss, pss = self.selectors([BoardState.OPEN] * 12 + [BoardState.HIT, BoardState.SUNK, BoardState.MISS], rng)
+            if pss.mode() == "hunt" or pss.weights is None:
+                continue
+            assert(pss.liveHits == set(Coordinates(x, y) for x in range(10) for y in range(10)
+                                       if pss.enemyBoard[x][y] == BoardState.HIT))
+            for coordinates, weight in pss.weights.items():
+                # Only coordinates in line with a hit and within reach of the longest ship are weighted.
+                assert(any((coordinates.x == x and abs(coordinates.y - y) < 5) or
+                           (coordinates.y == y and abs(coordinates.x - x) < 5) for x, y in pss.liveHits))
+                assert(weight == mss.enemyBoard[coordinates.x][coordinates.y])
+
+    def test_ambiguousSink(self):
+        random.seed(4)
+        pss = ParityShotSelector(10, Counter(FLEET))
+        pss.shotResult("F-5", True, 0)
+        pss.shotResult("F-7", True, 0)
+        pss.shotResult("F-6", True, 2)
+        # The ship sunk on one side of the bullseye or the other, neither hit is live.
+        assert(len(pss.shipsToSink) == 1)
+        assert(pss.liveHits == set())
+        pss.weightBoard()
+        assert(pss.mode() == "hunt")
+        # A stray hit next to them can't be part of the sunk ship, only it's targeted.
+        pss.shotResult("G-5", True, 0)
+        assert(pss.liveHits == set([Coordinates(6, 4)]))
+        pss.weightBoard()
+        assert(pss.mode() == "target")
+        for coordinates in pss.weights:
+            assert(coordinates.x == 6 or coordinates.y == 4)
+        assert(pss.afloatHits() == [Coordinates(6, 4)])
+
+    def test_game(self):
+        random.seed(3)
+        pss = ParityShotSelector(10, Counter(FLEET))
+        shots, selectTimes = playHeadlessGame(pss, LocalBoard(randomBoard(10, FLEET, random.Random(3))))
+        assert(17 <= shots <= 100)
+        assert(pss.shipsAfloat == Counter())
@@ -0,0 +1,54 @@
+import random
+import unittest
+from placement_table import PlacementMappingShotSelector
+from placement_table import placementTable
+from shot_selector import MappingShotSelector
+from shot_selector import Coordinates
+from shot_selector import BoardState
+from collections import Counter
+
+class PlacementTableTestCase(unittest.TestCase):
+    def test_placementTable(self):
+        table = placementTable(3, Counter({"2" : 1, "3" : 1}))
+        # 6 East and 6 South placements of size 2, 3 of each of size 3.
+        assert(len(table.placements) == 18)
+        assert(table.sizes.count("2") == 12)
+        # The center is covered by 4 placements of size 2 and 2 of size 3.
+        assert(len(table.cellPlacements[4]) == 6)
+        for placement in table.cellPlacements[4]:
+            assert(4 in table.placements[placement])
+        # Tables are cached by dimensions and sizes, not counts.
+        assert(placementTable(3, Counter({"3" : 2, "2" : 5})) is table)
+        assert(placementTable(4, Counter({"2" : 1, "3" : 1})) is not table)
+
+    def test_weightBoard(self):
+        fleet = Counter({"2" : 1})
+        pss = PlacementMappingShotSelector(3, fleet)
+        pss.weightBoard()
+        assert(pss.enemyBoard == [[2, 3, 2], [3, 4, 3], [2, 3, 2]])
+        pss.selectBestCoordinates()
+        pss.setState(Coordinates(1, 1), BoardState.HIT)
+        pss.weightBoard()
+        assert(pss.enemyBoard == [[2, 13, 2], [13, BoardState.HIT, 13], [2, 13, 2]])
+        pss.selectBestCoordinates()
+        pss.setState(Coordinates(1, 1), BoardState.MISS)
+        pss.weightBoard()
+        assert(pss.enemyBoard == [[2, 2, 2], [2, BoardState.MISS, 2], [2, 2, 2]])
+
+    def test_matchesMappingShotSelector(self):
+        states = [BoardState.OPEN] * 6 + [BoardState.HIT, BoardState.BULLSEYE, BoardState.SUNK, BoardState.MISS]
+        rng = random.Random(1)
+        for i in range(20):
+            fleet = Counter({"2" : 1, "3" : 2, "4" : 1, "5" : 1})
+            mss = MappingShotSelector(10, Counter(fleet))
+            pss = PlacementMappingShotSelector(10, Counter(fleet))
+            del(pss.shipsAfloat["4"])
+            del(mss.shipsAfloat["4"])
+            for x in range(10):
+                for y in range(10):
+                    state = rng.choice(states)
+                    mss.enemyBoard[x][y] = state
+                    pss.setState(Coordinates(x, y), state)
+            mss.weightBoard()
+            pss.weightBoard()
+            assert(mss.enemyBoard == pss.enemyBoard)
@@ -0,0 +1,165 @@
+import json
+import os
+import random
+import threading
+import unittest
+from collections import Counter
+from command_driver import HttpCommandDriver
+from local_command_driver import LocalGameServer
+from local_command_driver import LocalCommandDriver
+from local_command_driver import randomBoard
+from player import Player
+from poll_scheduler import PollScheduler
+from shot_selector import RandomShotSelector
+from stand_in_server import StandInServer
+from turn_tracker import TurnTracker
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+def loadBoard(name):
+    return json.load(open(os.path.join(DATA, name)))["board"]
+
+def loadFleet():
+    return Counter(json.load(open(os.path.join(DATA, "fleet.json")))["fleet"])
+
+"""Player that notes when it waits for the enemy."""
+class LockstepPlayer(Player):
+    def wait(self, pollTime, polled = True):
+        Player.wait(self, pollTime, polled)
+        self.waited = True
+
+class PlayerTestCase(unittest.TestCase):
+    def playThreaded(self, player1, player2):
+        """Plays a game with each player on its own thread."""
+        gameStates = {}
+        player2.join(player1.start())
+        threads = [threading.Thread(target = lambda player = player: gameStates.update({player : player.play()}))
+                   for player in (player1, player2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert(sorted(gameStates.values()) == ["lost", "won"])
+
+    def test_pollScheduler(self):
+        scheduler = PollScheduler(0.05, 0.3, jitter = 0)
+        assert([scheduler.nextDelay() for i in range(5)] == [0.05, 0.1, 0.2, 0.3, 0.3])
+        assert(scheduler.turnStarted() == 6)
+        # The back off starts over with the next turn.
+        assert(scheduler.nextDelay() == 0.05)
+        assert(scheduler.turnStarted() == 2)
+        assert(scheduler.turnStarted() == 1)
+        assert(scheduler.pollsPerTurn == [6, 2, 1])
+        # A skipped poll is waited for but doesn't count or back off.
+        assert(scheduler.skippedDelay() == 0.05)
+        assert(scheduler.nextDelay() == 0.05)
+        assert(scheduler.turnStarted() == 2)
+        # A turn known to be mine without a poll isn't counted.
+        assert(scheduler.turnStarted(False) == 0)
+        assert(scheduler.nextDelay() == 0.05)
+        assert(scheduler.pollsPerTurn == [6, 2, 1, 2])
+        scheduler = PollScheduler(0.1, 1, jitter = 0.2)
+        for i in range(100):
+            assert(0.08 <= scheduler.nextDelay() <= 1)
+        scheduler = PollScheduler.fixed(0.5)
+        assert([scheduler.nextDelay() for i in range(3)] == [0.5, 0.5, 0.5])
+
+    def test_adaptivePolling(self):
+        server = LocalGameServer()
+        player1 = Player(loadBoard("player_1_board.json"), LocalCommandDriver(server, "one"),
+                         RandomShotSelector(10, loadFleet()), 0.01, False, PollScheduler(0.0001, 0.01))
+        player2 = Player(loadBoard("player_2_board.json"), LocalCommandDriver(server, "two"),
+                         RandomShotSelector(10, loadFleet()), 0.01, False, PollScheduler(0.0001, 0.01))
+        self.playThreaded(player1, player2)
+        for player in (player1, player2):
+            assert(len(player.pollScheduler.pollsPerTurn) >= 17)
+            assert(min(player.pollScheduler.pollsPerTurn) >= 1)
+
+    def test_longPoll(self):
+        server = StandInServer()
+        port = server.start()
+        try:
+            player1 = Player(loadBoard("player_1_board.json"), HttpCommandDriver("127.0.0.1", port, "one"),
+                             RandomShotSelector(10, loadFleet()), 1, False, PollScheduler(0.5, 1), 5)
+            player2 = Player(loadBoard("player_2_board.json"), HttpCommandDriver("127.0.0.1", port, "two"),
+                             RandomShotSelector(10, loadFleet()), 1, False, PollScheduler(0.5, 1), 5)
+            self.playThreaded(player1, player2)
+            for player in (player1, player2):
+                # Each poll is held until the turn comes around, so one poll right after firing finds it's
+                # the enemy's turn and the next one returns when it's mine.
+                assert(max(player.pollScheduler.pollsPerTurn) <= 2)
+                turns = len(player.pollScheduler.pollsPerTurn)
+                assert(server.counts[("/games/status", player.commandDriver.player)] <= 2 * turns + 2)
+        finally:
+            server.stop()
+
+    def playLockstep(self, hitAgain, rules):
+        """Plays a game between two random players on a stand-in server.  Each player plays until it finds out it's
+        the enemy's turn and waits, then the enemy does, so a player that polls right after firing always finds it's
+        still the enemy's turn.
+
+        Returns
+        The shots each player fired, the number of status polls each of them made, the final game state of each and
+        their polls per turn.
+        """
+        server = StandInServer(games = LocalGameServer(hitAgain))
+        port = server.start()
+        try:
+            players = []
+            for i, name in enumerate(("one", "two")):
+                fleet = loadFleet()
+                random.seed(i)
+                shotSelector = RandomShotSelector(10, fleet)
+                players.append(LockstepPlayer(randomBoard(10, fleet, random.Random(i)), HttpCommandDriver("127.0.0.1", port, name),
+                                              shotSelector, 0, False, PollScheduler.fixed(0),
+                                              turnTracker = TurnTracker(rules)))
+            players[1].join(players[0].start())
+            gameStates = [None, None]
+            i = 0
+            while None in gameStates:
+                players[i].waited = False
+                while gameStates[i] is None and not players[i].waited:
+                    gameStates[i] = players[i].playTurn()
+                i = 1 - i
+            assert(sorted(gameStates) == ["lost", "won"])
+            shots = [player.shots for player in players]
+            statusPolls = [server.counts[("/games/status", player.commandDriver.player)] for player in players]
+            return shots, statusPolls, gameStates, [player.pollScheduler.pollsPerTurn for player in players]
+        finally:
+            server.stop()
+
+    def test_turnTracker(self):
+        tracker = TurnTracker("hitagain")
+        tracker.fired(True, 0, True)
+        assert(tracker.knownTurn is True)
+        tracker.polled()
+        assert(tracker.knownTurn is None)
+        tracker.fired(False, 0, True)
+        assert(tracker.knownTurn is False)
+        # The last ship afloat was sunk, the game may be over.
+        tracker.fired(True, 5, False)
+        assert(tracker.knownTurn is None)
+        tracker = TurnTracker("alternate")
+        tracker.fired(True, 0, True)
+        assert(tracker.knownTurn is False)
+        tracker = TurnTracker()
+        tracker.fired(True, 0, True)
+        assert(tracker.knownTurn is None)
+        self.assertRaises(ValueError, TurnTracker, "sometimes")
+
+    def test_skipStatus(self):
+        for hitAgain, rules in ((False, "alternate"), (True, "hitagain")):
+            shots, statusPolls, gameStates, pollsPerTurn = self.playLockstep(hitAgain, "unknown")
+            trackedShots, trackedStatusPolls, trackedGameStates, trackedPollsPerTurn = self.playLockstep(hitAgain, rules)
+            assert(trackedShots == shots and trackedGameStates == gameStates)
+            for playerShots, gameState, polls, trackedPolls in zip(shots, gameStates, statusPolls, trackedStatusPolls):
+                # Only the poll after the shot that wins the game is still needed, the rest are skipped.
+                assert(polls - trackedPolls == len(playerShots) - (gameState == "won"))
+            # Skipped polls aren't counted, every turn is found with the one poll that says it's my turn.  Turns taken
+            # again after a hit aren't found by a poll at all, so they aren't counted either.
+            for playerShots, playerPollsPerTurn in zip(trackedShots, trackedPollsPerTurn):
+                assert(set(playerPollsPerTurn) == set([1]))
+                knownTurns = sum(hit for shot, hit, sunk in playerShots[:-1]) if hitAgain else 0
+                assert(len(playerPollsPerTurn) == len(playerShots) - knownTurns)
+            for playerPollsPerTurn in pollsPerTurn:
+                assert(max(playerPollsPerTurn) == 2)
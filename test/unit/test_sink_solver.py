@@ -0,0 +1,27 @@
+import unittest
+from sink_solver import SinkSolver
+
+class SinkSolverTestCase(unittest.TestCase):
+    def test_possiblePlacements(self):
+        # Only one way of placing the ships doesn't overlap.
+        solver = SinkSolver([[(0, 1), (1, 2)], [(2, 3), (1, 3)]])
+        assert(solver.solvable())
+        assert(solver.possiblePlacements() == [[0], [0]])
+        solver = SinkSolver([[(0, 1), (1, 2)], [(2, 3), (3, 4)]])
+        assert(solver.possiblePlacements() == [[0, 1], [0, 1]])
+
+    def test_forced(self):
+        solver = SinkSolver([[(0, 1), (1, 2)], [(2, 3), (3, 4)]])
+        # Every way of placing the ships covers 1 and 3, by either ship.
+        assert([solver.forced(cell) for cell in range(5)] == [False, True, False, True, False])
+        solver = SinkSolver([[(0, 1, 2), (1, 2, 3)]])
+        assert(not solver.forced(0))
+        assert(solver.forced(1))
+        assert(solver.forced(2))
+
+    def test_unsolvable(self):
+        solver = SinkSolver([[(0, 1)], [(1, 2)]])
+        assert(not solver.solvable())
+        assert(solver.possiblePlacements() == [[], []])
+        assert(not SinkSolver([[(0, 1)], []]).solvable())
+        assert(SinkSolver([]).solvable())
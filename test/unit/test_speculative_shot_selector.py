@@ -0,0 +1,68 @@
+import copy
+import random
+import threading
+import unittest
+from collections import Counter
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from shot_selector import MappingShotSelector
+from speculative_shot_selector import SpeculativeShotSelector
+
+FLEET = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+
+"""MappingShotSelector that notes the threads it's copied on."""
+class CopyRecordingShotSelector(MappingShotSelector):
+    def __deepcopy__(self, memo):
+        self.copyThreads.append(threading.get_ident())
+        copied = MappingShotSelector.__new__(CopyRecordingShotSelector)
+        memo[id(self)] = copied
+        copied.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return copied
+
+class SpeculativeShotSelectorTestCase(unittest.TestCase):
+    def playGame(self, shotSelector, playerBoard):
+        board = LocalBoard(playerBoard)
+        shots = []
+        while not board.allSunk():
+            shot = shotSelector.selectShot()
+            hit, sunk = board.fire(shot)
+            shotSelector.shotResult(shot, hit, sunk)
+            shots.append(shot)
+        return shots
+
+    def test_selectShotNext(self):
+        playerBoard = randomBoard(10, FLEET, random.Random(1))
+        random.seed(2)
+        expectedShots = self.playGame(MappingShotSelector(10, Counter(FLEET)), playerBoard)
+        random.seed(2)
+        shotSelector = SpeculativeShotSelector(MappingShotSelector(10, Counter(FLEET)))
+        try:
+            shots = self.playGame(shotSelector, playerBoard)
+        finally:
+            shotSelector.close()
+        # The shots are only selected earlier, they're the same shots.
+        assert(shots == expectedShots)
+        assert(shotSelector.shipsAfloat == Counter())
+
+    def playBranches(self, playerBoard, seed):
+        random.seed(seed)
+        selector = CopyRecordingShotSelector(10, Counter(FLEET))
+        selector.copyThreads = []
+        shotSelector = SpeculativeShotSelector(selector, True)
+        try:
+            shots = self.playGame(shotSelector, playerBoard)
+        finally:
+            shotSelector.close()
+        assert(sum(shotSelector.shipsAfloat.values()) == 0)
+        return shots, selector.copyThreads
+
+    def test_selectShotBranches(self):
+        for seed in range(3):
+            playerBoard = randomBoard(10, FLEET, random.Random(seed))
+            shots, copyThreads = self.playBranches(playerBoard, seed)
+            assert(len(shots) == len(set(shots)))
+            assert(17 <= len(shots) <= 100)
+            # The copies are made in the background.
+            assert(copyThreads and threading.get_ident() not in copyThreads)
+            # Seeded games play the same every time.
+            assert(self.playBranches(playerBoard, seed)[0] == shots)
@@ -0,0 +1,79 @@
+import copy
+import random
+import unittest
+import multiprocessing
+from collections import Counter
+from flat_shot_selector import FlatMappingShotSelector
+from tiled_shot_selector import TiledMappingShotSelector
+from local_command_driver import LocalBoard
+from local_command_driver import randomBoard
+from shot_selector import Coordinates
+from shot_selector import BoardState
+
+FLEET = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+
+def workersInPool():
+    tss = TiledMappingShotSelector(10, Counter(FLEET))
+    tss.close()
+    return tss.workers
+
+class TiledMappingTestCase(unittest.TestCase):
+    def playGame(self, shotSelector, board):
+        """Returns every shot it takes to sink the fleet on board."""
+        shots = []
+        while not board.allSunk():
+            shot = shotSelector.selectShot()
+            hit, sunk = board.fire(shot)
+            shotSelector.shotResult(shot, hit, sunk)
+            shots.append(shot)
+        return shots
+
+    def test_matchesFlatShotSelector(self):
+        states = [BoardState.OPEN] * 6 + [BoardState.HIT, BoardState.BULLSEYE, BoardState.SUNK, BoardState.MISS]
+        rng = random.Random(1)
+        for i in range(10):
+            fss = FlatMappingShotSelector(17, Counter(FLEET))
+            tss = TiledMappingShotSelector(17, Counter(FLEET), 1, 5)
+            for x in range(17):
+                for y in range(17):
+                    state = rng.choice(states)
+                    fss.setState(Coordinates(x, y), state)
+                    tss.setState(Coordinates(x, y), state)
+            fss.weightBoard()
+            tss.weightBoard()
+            assert(tss.weightedCells() == fss.weightedCells())
+            assert(tss.selectBestCandidates() == fss.selectBestCandidates())
+
+    def test_games(self):
+        # Tiles smaller than the largest ship and boards that don't split evenly into tiles play the same games as the
+        # flat engine, in this process and on the worker pool.
+        for boardDimensions, workers, tileSize in ((10, 1, 3), (23, 2, 6)):
+            board = randomBoard(boardDimensions, FLEET, random.Random(boardDimensions))
+            random.seed(0)
+            expected = self.playGame(FlatMappingShotSelector(boardDimensions, Counter(FLEET)), LocalBoard(board))
+            random.seed(0)
+            tss = TiledMappingShotSelector(boardDimensions, Counter(FLEET), workers, tileSize)
+            assert(self.playGame(tss, LocalBoard(board)) == expected)
+            tss.close()
+            # Closing the selector stops its workers.
+            assert(tss.pool.pool is None)
+
+    def test_defaultWorkers(self):
+        # A pool worker can't start a pool of its own, so it weights the board itself.
+        with multiprocessing.Pool(1) as pool:
+            assert(pool.apply(workersInPool) == 1)
+        tss = TiledMappingShotSelector(10, Counter(FLEET))
+        assert(tss.workers == multiprocessing.cpu_count())
+        tss.close()
+
+    def test_copy(self):
+        tss = TiledMappingShotSelector(10, Counter(FLEET), 1, 4)
+        tss.shotResult("E-5", True, 0)
+        copied = copy.deepcopy(tss)
+        copied.shotResult("E-6", False, 0)
+        # The copy has its own shared memory board.
+        assert(copied.board.name != tss.board.name)
+        assert(copied.enemyBoard[4][4] == BoardState.HIT and copied.enemyBoard[4][5] == BoardState.MISS)
+        assert(tss.enemyBoard[4][5] == BoardState.OPEN)
+        self.playGame(copied, LocalBoard(randomBoard(10, FLEET, random.Random(0))))
+        assert(copied.shipsAfloat == Counter())
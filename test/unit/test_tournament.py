@@ -0,0 +1,46 @@
+import io
+import json
+import unittest
+from tournament import runTournament
+from histogram import Histogram
+
+FLEET = {"2" : 1, "3" : 2, "4" : 1, "5" : 1}
+
+class TournamentTestCase(unittest.TestCase):
+    def results(self, workers):
+        output = io.StringIO()
+        summary = runTournament(10, FLEET, ["random", "mapping:bitboard"], 8, workers, 3, output)
+        results = sorted((result["game"], result["strategy"], result["shots"])
+                         for result in map(json.loads, output.getvalue().splitlines()))
+        return summary, results
+
+    def test_runTournament(self):
+        summary, results = self.results(1)
+        assert(len(results) == 16)
+        for game, strategy, shots in results:
+            # Every ship coordinates have to be hit, at most every coordinates can be shot.
+            assert(17 <= shots <= 100)
+        assert(summary["random"]["shots"]["count"] == 8)
+        assert(summary["mapping:bitboard"]["selectSeconds"]["count"] ==
+               sum(shots for game, strategy, shots in results if strategy == "mapping:bitboard"))
+        # The same seed plays the same games no matter how many workers there are.
+        assert(self.results(2)[1] == results)
+
+    def test_histogram(self):
+        histogram = Histogram(None)
+        for shots in range(1, 101):
+            histogram.add(shots)
+        assert(histogram.percentile(0.5) == 50)
+        assert(histogram.percentile(0.9) == 90)
+        assert(histogram.mean() == 50.5)
+        timeHistogram = Histogram()
+        for i in range(100):
+            timeHistogram.add(0.001)
+        timeHistogram.add(1.0)
+        other = Histogram()
+        other.add(0)
+        timeHistogram.merge(other)
+        assert(timeHistogram.count == 102)
+        assert(timeHistogram.minimum == 0)
+        assert(0.0008 < timeHistogram.percentile(0.5) < 0.0012)
+        assert(timeHistogram.percentile(1.0) == 1.0)